@@ -5,7 +5,11 @@ also reloads modules and submodules
 """
 # Generic Library Load
 import numpy as _np
-import MDSplus as _mds
+try:
+    import MDSplus as _mds
+except ImportError:
+    # only needed to read the live tree.  see _getHBTData.setBackend
+    _mds=None
 from copy import copy as _copy
 import sys as _sys
 import _socket
@@ -88,7 +88,7 @@ class calibanData:
                 self.bpData=_hbt.get.bpData(shotno)
             elif self.comparisonDiagnostic == 'mModeData':
                 self.mModeData=_hbt.get.mModeData(shotno)
-                self.mModeData.time *= 1e3 #convert to ms
+                self.mModeData.time = self.mModeData.time*1e3 #convert to ms
                 
             self._cpci=True
         elif self.cpciShotno!=None:
@@ -98,7 +98,7 @@ class calibanData:
                 self.bpData=_hbt.get.bpData(shotno)
             elif self.comparisonDiagnostic == 'mModeData':
                 self.mModeData=_hbt.get.mModeData(shotno)
-                self.mModeData.time *= 1e3 #convert to ms
+                self.mModeData.time = self.mModeData.time*1e3 #convert to ms
             self._cpci=True
         else:
             self._cpci=False
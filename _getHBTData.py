@@ -22,13 +22,24 @@ provided shotnos.
 
 # common libraries 
 import numpy as _np
-import MDSplus as _mds
 from copy import copy as _copy
 import sys as _sys
 import _socket
 import matplotlib.pyplot as _plt
 import time as _time
 import pandas as _pd
+import threading as _threading
+import warnings as _warnings
+from contextlib import contextmanager as _contextmanager
+import os as _os
+import hashlib as _hashlib
+import abc as _abc
+try:
+    import MDSplus as _mds
+except ImportError:
+    # MDSplus is only needed to read the live tree.  The archive and 
+    # synthetic backends work without it (see setBackend)
+    _mds=None
 
 # hbtepLib libraries
 import _processData as _process
@@ -55,9 +66,6 @@ else:
 _TSTART = 0*1e-3;
 _TSTOP  = 10*1e-3;
 
-# list of known bad sensors.   likely VERY outdated.  also note that the code does not YET do anything with this info...
-_SENSORBLACKLIST = ['PA1_S29R', 'PA1_S16P', 'PA2_S13R', 'PA2_S14P', 'PA2_S27P', 'FB03_S4R', 'FB04_S4R', 'FB08_S3P', 'FB10_S1P', 'FB04_S3P', 'FB06_S2P', 'FB08_S4P', 'TA07_S1P', 'TA02_S1P', 'TA02_S2P'];
-
 # directory where unprocessed or minimally processed data is written locally.   
 #_FILEDIR='/home/john/shotData/'
 
@@ -74,16 +82,75 @@ def _prepShotno(func,debug=False):
     ----------
     https://stackoverflow.com/questions/2536307/decorators-in-the-python-standard-lib-deprecated-specifically/30253848#30253848
     
+    Two optional keywords are consumed by the decorator and are not passed
+    on to the wrapped function.  They only matter when a list of shot 
+    numbers is provided.
+    
+    parallel : bool or str
+        False (default) - shots are loaded one after another
+        True or 'thread' - shots are loaded in a pool of threads.  Data 
+            classes that load on first use (e.g. paData) are loaded in 
+            the pool too (see load())
+        'process' - shots are loaded in a pool of processes.  The results
+            must be picklable, so this works with the *_df functions but 
+            not with the data classes (e.g. paData).  Use threads for those.
+            The workers are spawned, i.e. they import this module afresh 
+            (so scripts need an `if __name__=='__main__':` guard).  The 
+            backend, float precision and shot cache are copied to them.
+    numWorkers : int
+        number of threads/processes in the pool.  Default is 4.  Note that
+        remote threads share the MDSplus connection pool, so workers beyond
+        its size simply wait for a free connection.
+        
+    In parallel mode, the returned list is a shotList which keeps the input
+    order.  A shot that raises an exception does not abort the batch.  
+    Instead, its entry is None, the exception is stored in 
+    shotList.errors[shotno] and a warning is issued.
+    
+    Two more optional keywords reduce the sample rate of every signal that 
+    the wrapped function loads.  See mdsData.
+    
+    decimate : int
+        keep 1 of every decimate samples.  default None (full resolution)
+    decimateMode : str
+        'stride', 'mean' or 'minmax'.  default 'stride'
+
+    And one more sets the floating point precision of every signal that the
+    wrapped function loads.  See setFloatPrecision.
+
+    dtype : str or numpy.dtype
+        e.g. 'float32'.  default None (the global setting)
+
     Notes
     -----
     # TODO(John) Add a try/except error handling for bad shot numbers or 
     # missing data
+    
+    Example
+    -------
+    ::
+        
+        dfs=ipData_df([96530,96531,96532],parallel=True,numWorkers=3)
+        print(dfs.errors)
     """ 
     from functools import wraps
     
     @wraps(func) # allows doc-string to be visible through the decorator function
     def inner1(*args, **kwargs):
         
+        # pop the parallel and decimation options so that they aren't 
+        # passed to func
+        parallel=kwargs.pop('parallel',False)
+        numWorkers=kwargs.pop('numWorkers',4)
+        decimate=kwargs.pop('decimate',None)
+        decimateMode=kwargs.pop('decimateMode','stride')
+        dtype=kwargs.pop('dtype',None)
+        target=func
+        if decimate is not None:
+            target=_withDecimation(target,decimate,decimateMode)
+        if dtype is not None:
+            target=_withPrecision(target,dtype)
+        
         # check to see if shotno is an arg or kwarg.  if kwarg, effectively
         # move it to be an arg and delete the redundant kwarg key
         if len(args)>0:
@@ -107,14 +174,14 @@ def _prepShotno(func,debug=False):
             if shotno<0:
                 args=(latestShotNumber()+shotno+1,)+args[1:]
                 waitUntilLatestShotNumber(args[0]) 
-                return func(*args, **kwargs)
+                return target(*args, **kwargs)
             
             # if a standard shot number (default case)
             else:
                 # make sure the value is an integer
                 args=(int(shotno),)+args[1:]
                 waitUntilLatestShotNumber(int(shotno)) 
-                return func(*args, **kwargs)
+                return target(*args, **kwargs)
                 
 #        except ValueError:
 #            # it must be a string
@@ -127,6 +194,20 @@ def _prepShotno(func,debug=False):
                 # try if it has a length (ie, it's either an array or list)
             n=len(shotno)
             
+            # parallel mode
+            if parallel!=False:
+                latest=None
+                shotnos=[]
+                for i in range(n):
+                    if shotno[i]<0:
+                        if latest is None:
+                            latest=latestShotNumber()
+                        shotnos.append(int(latest+shotno[i]+1))
+                    else:
+                        shotnos.append(int(shotno[i]))
+                return _runParallel(target,shotnos,args[1:],kwargs,
+                                    parallel=parallel,numWorkers=numWorkers)
+            
             out=[]
             for i in range(n):
                 
@@ -134,13 +215,13 @@ def _prepShotno(func,debug=False):
                 if shotno[i]<0:
                     arg=(latestShotNumber()+shotno[i]+1,)+args[1:]
                     waitUntilLatestShotNumber(int(arg[0])) 
-                    out.append(func(*arg, **kwargs))
+                    out.append(target(*arg, **kwargs))
                     
                 # if a standard shot number
                 else:
                     arg=(shotno[i],)+args[1:]
                     waitUntilLatestShotNumber(int(arg[0])) 
-                    out.append(func(*arg, **kwargs))
+                    out.append(target(*arg, **kwargs))
             return out
             
 #            except TypeError:
@@ -148,12 +229,351 @@ def _prepShotno(func,debug=False):
 #                
 #                args=(latestShotNumber(),)+args[1:]
 #                waitUntilLatestShotNumber(int(shotno)) 
-#                return func(*args, **kwargs)
+#                return target(*args, **kwargs)
         
         
     return inner1
 
 
+class shotList(list):
+    """
+    List of results returned by a _prepShotno decorated function in 
+    parallel mode.  Results are in the same order as the input shot numbers.
+    
+    Attributes
+    ----------
+    shotno : list
+        shot numbers, in the same order as the results
+    errors : dict
+        exceptions raised while loading a shot, keyed by shot number.  The 
+        corresponding entries in the list are None.
+    """
+    def __init__(self,shotno=[],results=[],errors={}):
+        list.__init__(self,results)
+        self.shotno=list(shotno)
+        self.errors=dict(errors)
+        
+        
+def _callShot(funcName,shotno,args,kwargs):
+    """
+    Calls the named (decorated) function of this module for a single shot.
+    Used by the process pool in _runParallel, which can only pickle module
+    level functions.
+    """
+    return _loaded(globals()[funcName](shotno,*args,**kwargs))
+    
+    
+def _initProcessWorker(backend,floatDtype,cacheDirectory,cacheMaxSize):
+    """
+    Initializer of the worker processes of _runParallel.  The workers are 
+    spawned (not forked, which would share the parent's pooled MDSplus 
+    sockets and lock states), so they start from a fresh import.  This 
+    copies over the settings that the parent changed since its import.
+    """
+    global _FLOAT_DTYPE
+    if not isinstance(backend,mdsplusBackend):
+        setBackend(backend)
+    _FLOAT_DTYPE=floatDtype
+    if cacheDirectory is None:
+        disableShotCache()
+    else:
+        enableShotCache(cacheDirectory,cacheMaxSize)
+    
+
+def _runParallel(func,shotnos,args,kwargs,parallel=True,numWorkers=4):
+    """
+    Loads a list of shots with func in a pool of threads or processes.  
+    See _prepShotno.
+    
+    Returns
+    -------
+    out : shotList
+        results in the same order as shotnos
+    """
+    import concurrent.futures as _futures
+    
+    def loadShot(shotno):
+        waitUntilLatestShotNumber(shotno)
+        return _loaded(func(shotno,*args,**kwargs))
+    
+    if parallel=='process':
+        import multiprocessing as _multiprocessing
+        cache=_SHOT_CACHE
+        executor=_futures.ProcessPoolExecutor(max_workers=numWorkers,
+                mp_context=_multiprocessing.get_context('spawn'),
+                initializer=_initProcessWorker,
+                initargs=(_BACKEND,_FLOAT_DTYPE,
+                          None if cache is None else cache.directory,
+                          None if cache is None else cache.maxSize))
+        kwargs=dict(kwargs,**getattr(func,'_decimation',{}))
+        kwargs.update(getattr(func,'_precision',{}))
+        futures=[executor.submit(_callShot,func.__name__,shotno,args,kwargs) 
+                 for shotno in shotnos]
+    elif parallel==True or parallel=='thread':
+        executor=_futures.ThreadPoolExecutor(max_workers=numWorkers)
+        futures=[executor.submit(loadShot,shotno) for shotno in shotnos]
+    else:
+        raise ValueError("parallel must be True, 'thread', or 'process'")
+        
+    out=shotList(shotno=shotnos)
+    try:
+        for shotno,future in zip(shotnos,futures):
+            try:
+                out.append(future.result())
+            except Exception as error:
+                _warnings.warn("shot %d failed: %s"%(shotno,error))
+                out.append(None)
+                out.errors[shotno]=error
+    finally:
+        executor.shutdown(wait=True)
+        
+    return out
+
+
+###############################################################################
+### fetch metrics
+
+# sinks that receive one record per mdsData (or probeNodes) call
+_METRICS_SINKS = []
+_METRICS_LOCAL = _threading.local()
+
+# numeric fields of a record.  these are summed by metricsAggregator
+_METRICS_FIELDS = ['nodes','bytes','roundTrips','requestTime','connectTime',
+                   'totalTime','cacheHits','cacheMisses','cacheBytes',
+                   'retries','connectionsOpened']
+
+class metricsAggregator:
+    """
+    Metrics sink that keeps every record in memory and summarizes them
+    
+    Attributes
+    ----------
+    records : list (of dict)
+        one record per call.  See addMetricsSink for the fields.
+        
+    Subfunctions
+    ------------
+    summary :
+        returns the totals per shot (or per any other field) as a DataFrame
+    report :
+        prints the summary
+    clear :
+        deletes all records
+        
+    Example
+    -------
+    ::
+        
+        metrics=addMetricsSink(metricsAggregator())
+        paData(96530); fbData(96530)
+        metrics.report()
+    """
+    def __init__(self):
+        self.records=[]
+        self._lock=_threading.Lock()
+        
+    def record(self,record):
+        with self._lock:
+            self.records.append(record)
+            
+    def clear(self):
+        with self._lock:
+            self.records=[]
+            
+    def summary(self,by='shotno'):
+        """
+        Parameters
+        ----------
+        by : str or None
+            field to group the records by, e.g. 'shotno' or 'function'.  
+            None returns the totals of the whole session.
+            
+        Returns
+        -------
+        df : pandas.core.frame.DataFrame
+            number of calls and the sum of each numeric field
+        """
+        with self._lock:
+            df=_pd.DataFrame(list(self.records),columns=['time','function','shotno','backend','error']+_METRICS_FIELDS)
+        df['calls']=1
+        df['errors']=df['error'].notnull().astype(int)
+        columns=['calls','errors']+_METRICS_FIELDS
+        if by is None:
+            return df[columns].sum().to_frame('session').T
+        return df.groupby(by)[columns].sum()
+        
+    def report(self,by='shotno'):
+        """ prints the summary """
+        print(self.summary(by).to_string())
+        
+        
+class jsonLinesSink:
+    """
+    Metrics sink that appends each record to a file as one line of JSON
+    
+    Parameters
+    ----------
+    fileName : str
+        file to append to
+    """
+    def __init__(self,fileName):
+        self.fileName=_os.path.expanduser(fileName)
+        self._lock=_threading.Lock()
+        
+    def record(self,record):
+        import json as _json
+        line=_json.dumps(record)
+        with self._lock:
+            with open(self.fileName,'a') as f:
+                f.write(line+'\n')
+                
+                
+class callbackSink:
+    """
+    Metrics sink that passes each record to a function
+    
+    Parameters
+    ----------
+    callback : function
+        called with the record (a dict) after every call
+    """
+    def __init__(self,callback):
+        self.callback=callback
+        
+    def record(self,record):
+        self.callback(record)
+        
+        
+def addMetricsSink(sink):
+    """
+    Starts sending fetch metrics to a sink
+    
+    Parameters
+    ----------
+    sink : metricsAggregator, jsonLinesSink, callbackSink, or function
+        any object with a record(record) method.  A plain function is 
+        wrapped in a callbackSink.
+        
+    Returns
+    -------
+    sink : 
+        the sink that was added
+        
+    Notes
+    -----
+    Each call to mdsData or probeNodes produces one record (a dict) with
+    
+    time : float
+        when the call started (seconds since the epoch)
+    function : str
+        'mdsData' or 'probeNodes'
+    shotno : int
+    backend : str
+        e.g. 'mdsplusBackend'
+    error : str or None
+        the exception raised, if any
+    nodes : int
+        number of nodes requested
+    bytes : int
+        bytes of data received from the tree
+    roundTrips : int
+        number of requests sent to the server
+    requestTime : float
+        seconds spent in requests to the tree.  mdsip does not separate the
+        time that the server spends evaluating a request from the time 
+        spent transferring the reply, so these are counted together
+    connectTime : float
+        seconds spent waiting for and opening connections
+    totalTime : float
+        seconds spent in the call
+    cacheHits, cacheMisses : int
+        nodes found and not found in the local shot cache
+    cacheBytes : int
+        bytes read from the local shot cache
+    retries : int
+        nodes that failed in a batch and were fetched again on their own
+    connectionsOpened : int
+        new connections (or trees) opened
+        
+    Metrics are only collected while at least one sink is added.
+    """
+    if not hasattr(sink,'record'):
+        sink=callbackSink(sink)
+    _METRICS_SINKS.append(sink)
+    return sink
+    
+    
+def removeMetricsSink(sink):
+    """ stops sending fetch metrics to a sink """
+    if sink in _METRICS_SINKS:
+        _METRICS_SINKS.remove(sink)
+        
+        
+def _metricsAdd(field,value):
+    """ adds value to a field of the record of the current call, if any """
+    record=getattr(_METRICS_LOCAL,'record',None)
+    if record is not None:
+        record[field]+=value
+        
+        
+def _nbytes(data):
+    """ bytes in an array, a number, a str, or a list of them """
+    if type(data) is list:
+        return sum([_nbytes(d) for d in data])
+    if isinstance(data,Exception) or data is None:
+        return 0
+    try:
+        return int(_np.asarray(data).nbytes)
+    except Exception:
+        return 0
+        
+        
+def _instrumented(func):
+    """
+    Records the metrics of each call of func and sends them to the metrics
+    sinks (see addMetricsSink).  Calls made while another call is being 
+    recorded on the same thread (e.g. mdsData reading through the shot cache)
+    are counted as part of the outer call.
+    """
+    from functools import wraps
+    import inspect as _inspect
+    
+    @wraps(func)
+    def inner(*args,**kwargs):
+        if len(_METRICS_SINKS)==0 or getattr(_METRICS_LOCAL,'record',None) is not None:
+            return func(*args,**kwargs)
+            
+        callArgs=_inspect.getcallargs(func,*args,**kwargs)
+        dataAddress=callArgs.get('dataAddress',[])
+        shotno=callArgs.get('shotno')
+        record=dict([[field,0] for field in _METRICS_FIELDS])
+        record.update({'time':_time.time(),
+                       'function':func.__name__,
+                       'shotno':None if shotno is None else int(shotno),
+                       'backend':type(_BACKEND).__name__,
+                       'error':None,
+                       'nodes':len(dataAddress) if type(dataAddress) is list else 1})
+        _METRICS_LOCAL.record=record
+        try:
+            out=func(*args,**kwargs)
+            if _liveBackend()==False:
+                record['bytes']=_nbytes(list(out) if type(out) is tuple else out)
+            return out
+        except Exception as error:
+            record['error']=repr(error)
+            raise
+        finally:
+            _METRICS_LOCAL.record=None
+            record['totalTime']=_time.time()-record['time']
+            for sink in list(_METRICS_SINKS):
+                try:
+                    sink.record(record)
+                except Exception as error:
+                    print("metrics sink failed: %s"%error)
+                    
+    return inner
+    
+    
 ###############################################################################
 ### MDSplus tree data collection and misc. related functions
 def _trimTime(time,data,tStart,tStop):
@@ -203,6 +623,199 @@ def _trimTime(time,data,tStart,tStop):
     return time, data
     
     
+# decimation used by mdsData when none is given.  set per thread by 
+# _withDecimation
+_DECIMATION_LOCAL = _threading.local()
+
+_DECIMATE_MODES = ['stride','mean','minmax']
+
+def _withDecimation(func,decimate,decimateMode='stride'):
+    """ 
+    Returns func wrapped so that every mdsData call made within it uses 
+    this decimation by default 
+    """
+    from functools import wraps
+    if decimateMode not in _DECIMATE_MODES:
+        raise ValueError("decimateMode must be one of %s"%_DECIMATE_MODES)
+        
+    @wraps(func)
+    def inner(*args,**kwargs):
+        previous=getattr(_DECIMATION_LOCAL,'setting',None)
+        _DECIMATION_LOCAL.setting=(decimate,decimateMode)
+        try:
+            return func(*args,**kwargs)
+        finally:
+            _DECIMATION_LOCAL.setting=previous
+            
+    inner._decimation={'decimate':decimate,'decimateMode':decimateMode}
+    return inner
+
+
+def _decimateSignal(y,factor,mode='stride'):
+    """
+    Reduces the sample rate of a signal by factor
+    
+    Parameters
+    ----------
+    y : numpy.ndarray
+        signal
+    factor : int
+        number of samples per block
+    mode : str
+        'stride' - the first sample of each block
+        'mean' - the (boxcar) mean of each block
+        'minmax' - the minimum and maximum of each block, interleaved
+        
+    Notes
+    -----
+    For 'mean' and 'minmax', a partial block at the end is dropped.  
+    """
+    if mode=='stride':
+        return y[::factor]
+    m=len(y)//factor
+    blocks=y[:m*factor].reshape(m,factor)
+    if mode=='mean':
+        return blocks.mean(axis=1)
+    out=_np.empty(2*m,dtype=y.dtype)
+    out[0::2]=blocks.min(axis=1)
+    out[1::2]=blocks.max(axis=1)
+    return out
+
+
+def _decimateTime(time,factor,mode='stride'):
+    """ 
+    The time that goes with _decimateSignal(y,factor,mode).  For 'mean' 
+    and 'minmax', this is the center of each block (repeated twice for 
+    'minmax').
+    """
+    if mode=='stride':
+        return time[::factor]
+    t=_decimateSignal(time,factor,'mean')
+    if mode=='minmax':
+        t=_np.repeat(t,2)
+    return t
+
+
+def _decimate(time,data,factor,mode='stride'):
+    """ decimates the time and every array in data on the client """
+    data=[_decimateSignal(d,factor,mode) if isinstance(d,_np.ndarray) and d.ndim==1 
+          else d for d in data]
+    return _decimateTime(time,factor,mode), data
+
+
+# floating point precision of the data returned by mdsData.  None keeps the
+# precision stored in the tree.  set globally with setFloatPrecision and per
+# thread by _withPrecision
+_FLOAT_DTYPE = None
+_PRECISION_LOCAL = _threading.local()
+
+def _floatDtype(dtype):
+    """ None, or dtype as a numpy floating point dtype """
+    if dtype is None:
+        return None
+    dtype=_np.dtype(dtype)
+    if dtype.kind!='f':
+        raise ValueError("dtype must be a floating point type, e.g. 'float32'")
+    return dtype
+
+
+def setFloatPrecision(dtype=None):
+    """
+    Sets the floating point precision of all data loaded by mdsData (and
+    therefore by every loader in this module)
+
+    Parameters
+    ----------
+    dtype : str or numpy.dtype
+        e.g. 'float32' or 'float64'.  None (default) keeps the precision
+        that the data is stored with in the tree
+
+    Returns
+    -------
+    previous : numpy.dtype or None
+        the precision that was replaced
+
+    Notes
+    -----
+    Only floating point data arrays are converted.  Time arrays are always
+    left as they are since float32 can't resolve 2 us steps near the end of
+    a long time base.  Integer and text nodes are also left alone.  A single
+    call (or loader) can override the setting with dtype=..., see mdsData
+    and _prepShotno.
+
+    Example
+    -------
+    ::
+
+        setFloatPrecision('float32')
+        dfData,dfRaw,dfMeta=paData_df(96530)   # float32 end to end
+        setFloatPrecision(None)
+    """
+    global _FLOAT_DTYPE
+    previous=_FLOAT_DTYPE
+    _FLOAT_DTYPE=_floatDtype(dtype)
+    return previous
+
+if getattr(_pref,'_FLOAT_DTYPE',None):
+    setFloatPrecision(_pref._FLOAT_DTYPE)
+
+
+def _withPrecision(func,dtype):
+    """
+    Returns func wrapped so that every mdsData call made within it returns
+    data with this precision by default
+    """
+    from functools import wraps
+    dtype=_floatDtype(dtype)
+
+    @wraps(func)
+    def inner(*args,**kwargs):
+        previous=getattr(_PRECISION_LOCAL,'dtype',None)
+        _PRECISION_LOCAL.dtype=dtype
+        try:
+            return func(*args,**kwargs)
+        finally:
+            _PRECISION_LOCAL.dtype=previous
+
+    inner._precision={'dtype':dtype}
+    return inner
+
+
+def _resolveDtype(dtype=None):
+    """ 
+    the precision of a call: dtype, else the caller's, else the global.  
+    dtype='native' is the precision stored in the tree, whatever the caller's
+    """
+    if isinstance(dtype,str) and dtype=='native':
+        return None
+    if dtype is not None:
+        return _floatDtype(dtype)
+    dtype=getattr(_PRECISION_LOCAL,'dtype',None)
+    if dtype is not None:
+        return dtype
+    return _FLOAT_DTYPE
+
+
+def _loadOptions():
+    """
+    The decimation and precision in effect for the calling thread (see 
+    _withDecimation and _withPrecision), as mdsData keywords.  Objects that
+    load data after their constructor returns (see _lazyProperty) keep these
+    so that the data is loaded the same way.
+    """
+    decimate,decimateMode=getattr(_DECIMATION_LOCAL,'setting',None) or (1,'stride')
+    return {'decimate':decimate,'decimateMode':decimateMode,'dtype':_resolveDtype()}
+
+
+def _castData(data,dtype):
+    """ converts the floating point arrays in data to dtype (without copying
+    the arrays that already have it) """
+    if dtype is None:
+        return data
+    return [d.astype(dtype,copy=False) if isinstance(d,_np.ndarray) and d.dtype.kind=='f'
+            else d for d in data]
+
+
 def _initRemoteMDSConnection(shotno):
     """
     Initiate remote connection with MDSplus HBT-EP tree
@@ -216,173 +829,3175 @@ def _initRemoteMDSConnection(shotno):
     conn : MDSplus.connection
         connection class to mdsplus tree
     """
+    _requireMDSplus()
     conn = _mds.Connection(_pref._HBT_SERVER_ADDRESS+':8003');
     conn.openTree('hbtep2', shotno);
     return conn
+
+
+###############################################################################
+### MDSplus connection pool
+
+class _TreeNODATA(Exception):
+    """ stand-in for MDSplus.TreeNODATA when MDSplus is not installed """
+    
+    
+class _TreeNNF(Exception):
+    """ stand-in for MDSplus.TreeNNF when MDSplus is not installed """
+    
+    
+if _mds is not None:
+    _TreeNODATA=getattr(_mds,'TreeNODATA',_TreeNODATA)
+    _TreeNNF=getattr(_mds,'TreeNNF',_TreeNNF)
+
+# tree-level errors (e.g. a node without data) leave the connection usable.
+# any other error discards the connection instead of returning it to the pool
+_MDS_TREE_ERRORS = (_TreeNODATA,_TreeNNF)
+
+
+def _requireMDSplus():
+    """ raises ImportError if MDSplus is not installed """
+    if _mds is None:
+        raise ImportError("MDSplus is needed to read the HBT-EP tree.  " +
+                          "Use setBackend() to read from an archive instead.")
+
+
+class mdsConnectionPool:
+    """
+    Pool of reusable remote MDSplus connections keyed by (server, tree, shotno)
+
+    Parameters
+    ----------
+    maxSize : int
+        maximum number of connections (idle plus checked out) held open at
+        once.  default is _pref._MDS_POOL_SIZE if it exists, otherwise 4
+    idleTimeout : float
+        connections left idle for longer than this (in seconds) are closed
+        default is 60 s
+    server : str
+        address of the mdsip server.  default is the HBT-EP server on port 8003
+
+    Subfunctions
+    ------------
+    connection :
+        context manager that checks out a connection with the tree opened
+        to the requested shot number
+    closeAll :
+        closes every idle connection in the pool
+
+    Notes
+    -----
+    An idle connection whose key matches the request is reused as is.  If the
+    pool is full, the least recently used idle connection is reused instead
+    by reopening the tree on the requested shot, which still saves the TCP
+    setup.  Idle connections are evicted lazily, i.e. the next time the pool
+    is used.
+
+    Using the pool in a with block makes it the active pool for mdsData,
+    latestShotNumber and waitUntilLatestShotNumber until the block exits.
+    All of its connections are closed on exit.  Outside of a with block, a
+    module level default pool is used.
+
+    Example
+    -------
+    ::
+
+        with mdsConnectionPool(maxSize=4) as pool:
+            fb=fbData(98170)
+            pa=paData(98170)
+    """
+    def __init__(self,maxSize=None,idleTimeout=60.,server=None):
+        if maxSize is None:
+            maxSize=getattr(_pref,'_MDS_POOL_SIZE',4)
+        if server is None:
+            server=_pref._HBT_SERVER_ADDRESS+':8003'
+        self.maxSize=maxSize
+        self.idleTimeout=idleTimeout
+        self.server=server
+
+        self._idle=[]   # [key, conn, lastUsed], least recently used first
+        self._keys={}   # id(conn) -> key, for every open connection
+        self._lock=_threading.Condition()
+
+    def __enter__(self):
+        _POOL_STACK.append(self)
+        return self
+
+    def __exit__(self,excType,excValue,traceback):
+        if self in _POOL_STACK:
+            _POOL_STACK.remove(self)
+        self.closeAll()
+        return False
+
+    def _open(self,conn,tree,shotno):
+        """ opens tree on conn.  conn=None creates a new connection """
+        _metricsAdd('connectionsOpened',1)
+        if conn is None:
+            _requireMDSplus()
+            conn=_mds.Connection(self.server)
+        if tree is not None:
+            conn.openTree(tree,shotno)
+        return conn
+
+    def _close(self,key,conn):
+        """ closes the tree (if any) and disconnects """
+        try:
+            if key[1] is not None:
+                conn.closeTree(key[1],key[2])
+            conn.disconnect()
+        except:
+            pass
+
+    def _evictIdle(self):
+        """ removes idle connections that have timed out.  call with lock held """
+        now=_time.time()
+        expired=[item for item in self._idle if now-item[2]>self.idleTimeout]
+        for item in expired:
+            self._idle.remove(item)
+            del self._keys[id(item[1])]
+        return expired
+
+    def acquire(self,shotno=None,tree='hbtep2'):
+        """
+        Checks a connection out of the pool.  Must be returned with release().
+
+        Parameters
+        ----------
+        shotno : int
+            shot number to open the tree to
+        tree : str or None
+            name of the tree.  None returns a connection with no tree opened
+
+        Returns
+        -------
+        conn : MDSplus.Connection
+        """
+        if tree is None or shotno is None:
+            tree,shotno=None,None
+        else:
+            shotno=int(shotno)
+        key=(self.server,tree,shotno)
+
+        reserved=object() # holds a slot in the pool while connecting
+        reuse=None
+        with self._lock:
+            while True:
+                expired=self._evictIdle()
+
+                # an idle connection to the same tree and shot
+                match=[item for item in self._idle if item[0]==key]
+                if len(match)>0:
+                    self._idle.remove(match[-1])
+                    conn=match[-1][1]
+                    break
+
+                # room for a new connection
+                if len(self._keys)<self.maxSize:
+                    conn=None
+                    self._keys[id(reserved)]=key
+                    break
+
+                # pool is full.  reuse the least recently used idle connection
+                if len(self._idle)>0:
+                    reuse=self._idle.pop(0)
+                    del self._keys[id(reuse[1])]
+                    conn=None
+                    self._keys[id(reserved)]=key
+                    break
+
+                # everything is checked out.  wait for a release
+                self._lock.wait()
+        for item in expired:
+            self._close(item[0],item[1])
+        if conn is not None:
+            return conn
+
+        # open outside of the lock since this goes over the network
+        try:
+            if reuse is not None:
+                if reuse[0][1] is not None:
+                    reuse[1].closeTree(reuse[0][1],reuse[0][2])
+                conn=self._open(reuse[1],tree,shotno)
+            else:
+                conn=self._open(None,tree,shotno)
+        except:
+            with self._lock:
+                del self._keys[id(reserved)]
+                self._lock.notify()
+            if reuse is not None:
+                self._close((None,None,None),reuse[1])
+            raise
+
+        with self._lock:
+            del self._keys[id(reserved)]
+            self._keys[id(conn)]=key
+        return conn
+
+    def release(self,conn,discard=False):
+        """
+        Returns a connection to the pool
+
+        Parameters
+        ----------
+        conn : MDSplus.Connection
+            connection from acquire()
+        discard : bool
+            closes the connection instead of keeping it for reuse
+        """
+        with self._lock:
+            key=self._keys.get(id(conn))
+            if discard==True:
+                self._keys.pop(id(conn),None)
+            else:
+                self._idle.append([key,conn,_time.time()])
+            expired=self._evictIdle()
+            self._lock.notify()
+        if discard==True:
+            self._close(key,conn)
+        for item in expired:
+            self._close(item[0],item[1])
+
+    @_contextmanager
+    def connection(self,shotno=None,tree='hbtep2'):
+        """
+        Context manager that checks out a connection and returns it to the
+        pool afterwards
+
+        Example
+        -------
+        ::
+
+            with pool.connection(98170) as conn:
+                ip=conn.get('\\HBTEP2::TOP.SENSORS.ROGOWSKIS:IP').data()
+        """
+        tStart=_time.time()
+        conn=self.acquire(shotno,tree)
+        _metricsAdd('connectTime',_time.time()-tStart)
+        
+        # inside _callWithTimeout, the caller may stop waiting and close 
+        # the connection (see _timedCall)
+        call=getattr(_TIMED_CALL,'call',None)
+        if call is not None:
+            call.add(self,conn)
+        discard=False
+        try:
+            yield conn
+        except _MDS_TREE_ERRORS:
+            raise
+        except:
+            discard=True
+            raise
+        finally:
+            if call is None:
+                self.release(conn,discard=discard)
+            elif call.remove(self,conn)==True:
+                self.release(conn,discard=discard or call.abandoned)
+
+    def closeAll(self):
+        """ closes all idle connections """
+        with self._lock:
+            idle=self._idle
+            self._idle=[]
+            for item in idle:
+                del self._keys[id(item[1])]
+        for item in idle:
+            self._close(item[0],item[1])
+
+
+# pools entered with a with-block.  the last one entered is the active pool
+_POOL_STACK = []
+_DEFAULT_POOL = None
+
+def _activePool():
+    """ returns the active mdsConnectionPool, creating the default if needed """
+    global _DEFAULT_POOL
+    if len(_POOL_STACK)>0:
+        return _POOL_STACK[-1]
+    if _DEFAULT_POOL is None:
+        _DEFAULT_POOL=mdsConnectionPool()
+    return _DEFAULT_POOL
+
+
+###############################################################################
+### local shot cache
+
+class shotCache:
+    """
+    Local, on-disk cache of tree data keyed by (tree, shotno, node path)
+    
+    Parameters
+    ----------
+    directory : str
+        directory in which the cache is stored
+    maxSize : float
+        maximum size of the cache in bytes.  The least recently used nodes 
+        are deleted once this is exceeded.  default is 10 GB
+        
+    Subfunctions
+    ------------
+    read :
+        returns the cached data of a node or None if it is not cached
+    write :
+        adds the data of a node to the cache
+    remove :
+        deletes every cached node of a shot
+    clear :
+        deletes everything in the cache
+        
+    Notes
+    -----
+    Each node is stored as its own .npy file in directory/tree/shotno/.  The 
+    file name is the sha1 hash of the node path, so the same node is always 
+    found under the same name.  The time base of a node is stored under the 
+    path 'dim_of(<node path>)'.  Arrays are memory-mapped (copy-on-write) 
+    when read, so trimming a cached record only reads the samples that are 
+    kept from disk.  
+    
+    The modification time of each file is updated on every read and is used 
+    to decide which nodes are least recently used.
+    """
+    def __init__(self,directory,maxSize=10e9):
+        self.directory=_os.path.expanduser(directory)
+        self.maxSize=maxSize
+        self._size=None # total size in bytes.  found on first write
+        self._lock=_threading.Lock()
+        
+    def __getstate__(self):
+        # the lock can't be pickled (e.g. to send an archiveBackend to a 
+        # worker process).  the size is found again on first write
+        return {'directory':self.directory,'maxSize':self.maxSize}
+    
+    def __setstate__(self,state):
+        self.__init__(state['directory'],state['maxSize'])
+        
+    def _fileName(self,tree,shotno,path):
+        """ returns the file name of a node """
+        key=path.strip().upper().encode('utf-8')
+        return _os.path.join(self.directory,tree.lower(),'%d'%shotno,
+                             _hashlib.sha1(key).hexdigest()+'.npy')
+        
+    def _allFiles(self):
+        """ returns [mtime, size, fileName] of every cached file """
+        out=[]
+        for root,dirs,files in _os.walk(self.directory):
+            for name in files:
+                if name.endswith('.npy'):
+                    fileName=_os.path.join(root,name)
+                    try:
+                        stat=_os.stat(fileName)
+                    except OSError:
+                        continue
+                    out.append([stat.st_mtime,stat.st_size,fileName])
+        return out
+        
+    def read(self,tree,shotno,path):
+        """
+        Returns the cached data of a node, or None if it is not cached
+        
+        Parameters
+        ----------
+        tree : str
+            name of the tree, e.g. 'hbtep2'
+        shotno : int
+            shot number
+        path : str
+            node path (or TDI expression) of the data
+        """
+        fileName=self._fileName(tree,shotno,path)
+        if _os.path.exists(fileName)==False:
+            return None
+        try:
+            try:
+                data=_np.load(fileName,mmap_mode='c')
+            except ValueError:
+                data=_np.load(fileName)
+            _os.utime(fileName,None)
+        except (IOError,OSError,ValueError):
+            return None
+        if data.ndim==0:
+            return data[()]
+        return data
+        
+    def write(self,tree,shotno,path,data):
+        """
+        Adds the data of a node to the cache
+        
+        Parameters
+        ----------
+        tree : str
+            name of the tree, e.g. 'hbtep2'
+        shotno : int
+            shot number
+        path : str
+            node path (or TDI expression) of the data
+        data : numpy.ndarray, str, or number
+            data to be cached.  Data that numpy can only store by pickling 
+            (e.g. lists of mixed types) is not cached.
+        """
+        data=_np.asarray(data)
+        if data.dtype.hasobject:
+            return
+        fileName=self._fileName(tree,shotno,path)
+        try:
+            if _os.path.isdir(_os.path.dirname(fileName))==False:
+                _os.makedirs(_os.path.dirname(fileName))
+        except OSError:
+            pass # created by another thread or process in the meantime
+            
+        # write to a temporary file first so that readers never see a 
+        # partially written file
+        tempName='%s.%d.%d.tmp'%(fileName,_os.getpid(),_threading.current_thread().ident)
+        with open(tempName,'wb') as f:
+            _np.save(f,data,allow_pickle=False)
+        oldSize=0
+        try:
+            if _os.path.exists(fileName):
+                oldSize=_os.path.getsize(fileName)
+                _os.remove(fileName)
+            _os.rename(tempName,fileName)
+        except OSError:
+            # another writer got there first.  its copy is identical
+            if _os.path.exists(tempName):
+                _os.remove(tempName)
+            return
+        
+        with self._lock:
+            if self._size is None:
+                self._size=sum([item[1] for item in self._allFiles()])
+            else:
+                self._size+=_os.path.getsize(fileName)-oldSize
+            if self._size>self.maxSize:
+                self._evict()
+                
+    def _evict(self):
+        """ deletes the least recently used files until the cache fits.  call with lock held """
+        files=sorted(self._allFiles())
+        self._size=sum([item[1] for item in files])
+        for mtime,size,fileName in files:
+            if self._size<=self.maxSize:
+                break
+            try:
+                _os.remove(fileName)
+                self._size-=size
+            except OSError:
+                pass
+                
+    def remove(self,shotno,tree='hbtep2'):
+        """ deletes every cached node of a shot """
+        import shutil
+        shutil.rmtree(_os.path.join(self.directory,tree.lower(),'%d'%shotno),
+                      ignore_errors=True)
+        with self._lock:
+            self._size=None
+        
+    def clear(self):
+        """ deletes everything in the cache """
+        import shutil
+        shutil.rmtree(self.directory,ignore_errors=True)
+        with self._lock:
+            self._size=None
+            
+            
+# the active shot cache.  None disables caching
+_SHOT_CACHE = None
+if getattr(_pref,'_SHOT_CACHE_DIR',''):
+    _SHOT_CACHE = shotCache(_pref._SHOT_CACHE_DIR,
+                            getattr(_pref,'_SHOT_CACHE_MAX_SIZE',10e9))
+    
+def enableShotCache(directory='~/.hbtepLib/shotCache',maxSize=10e9):
+    """
+    Turns on the local shot cache used by mdsData
+    
+    Parameters
+    ----------
+    directory : str
+        directory in which the cache is stored
+    maxSize : float
+        maximum size of the cache in bytes.  default is 10 GB
+        
+    Returns
+    -------
+    cache : shotCache
+        the active cache
+        
+    Notes
+    -----
+    The cache can also be turned on at import by setting _SHOT_CACHE_DIR 
+    (and optionally _SHOT_CACHE_MAX_SIZE) in _hbtPreferences.py
+    """
+    global _SHOT_CACHE
+    _SHOT_CACHE=shotCache(directory,maxSize)
+    return _SHOT_CACHE
+    
+def disableShotCache():
+    """ Turns off the local shot cache.  Nothing is deleted from disk. """
+    global _SHOT_CACHE
+    _SHOT_CACHE=None
+    
+    
+# latest shot number seen and when it was last read from the server.  shot 
+# numbers only increase, so every shot below the latest one seen has finished
+_LATEST_SHOT = {'shotno':None, 'time':0.}
+_LATEST_SHOT_LOCK = _threading.Lock()
+
+# seconds that a cached latest shot number is trusted by 
+# waitUntilLatestShotNumber
+_LATEST_SHOT_TTL = getattr(_pref,'_LATEST_SHOT_TTL',2.)
+
+# node used to decide whether the latest shot has finished recording
+_SHOT_DONE_NODE = '\HBTEP2::TOP.DEVICES.WEST_RACK:CPCI:INPUT_96'
+
+# polling policy of waitUntilLatestShotNumber.  units in seconds
+_WAIT_POLL_INTERVAL = 1.
+_WAIT_BACKOFF = 1.5
+_WAIT_MAX_INTERVAL = 10.
+    
+    
+def latestShotNumber(maxAge=0):
+    """
+    Gets the latest shot number from the tree
+    
+    Parameters
+    ----------
+    maxAge : float
+        default 0.  if the latest shot number was read from the server 
+        within the last maxAge seconds, the remembered value is returned 
+        without a round trip
+    
+    Returns
+    -------
+    shot_num : int
+        latest shot number
+    """
+    if _liveBackend()==False:
+        return _BACKEND.latestShotNumber()
+    with _LATEST_SHOT_LOCK:
+        if (maxAge>0 and _LATEST_SHOT['shotno'] is not None and 
+            _time.time()-_LATEST_SHOT['time']<maxAge):
+            return _LATEST_SHOT['shotno']
+            
+    with _activePool().connection() as conn:
+        shot_num = int(conn.get('current_shot("hbtep2")'))
+        
+    with _LATEST_SHOT_LOCK:
+        if _LATEST_SHOT['shotno'] is None or shot_num>=_LATEST_SHOT['shotno']:
+            _LATEST_SHOT['shotno']=shot_num
+        _LATEST_SHOT['time']=_time.time()
+    return shot_num
+
+
+def _shotDoneNodeLength(shotno):
+    """
+    Returns the length (in bytes) of the data stored in _SHOT_DONE_NODE.
+    Zero means that the shot has not finished recording.  
+    """
+    if _ON_HBTEP_SERVER==True:
+        # a tree opened while the shot was recording may not see new data
+        _LOCAL_TREES.remove(shotno)
+    return nodeInfo(shotno,_SHOT_DONE_NODE,timeBase=False)['length']
+    
+
+def _waitForShot(delay,deadline,shotno):
+    """
+    Pauses for up to delay seconds while waiting on shotno.  If 
+    _pref._MDS_SHOT_EVENT is set, the pause ends early when that MDSplus 
+    event is received.  Raises RuntimeError once the deadline has passed.
+    """
+    if deadline is not None:
+        remaining=deadline-_time.time()
+        if remaining<=0:
+            raise RuntimeError("Timed out waiting for shot %d"%shotno)
+        delay=min(delay,remaining)
+        
+    tStart=_time.time()
+    event=getattr(_pref,'_MDS_SHOT_EVENT',None)
+    if event is not None:
+        try:
+            _mds.Event.wfevent(event,timeout=delay)
+            return
+        except Exception:
+            # timed out, or events are not available from here
+            pass
+    remaining=delay-(_time.time()-tStart)
+    if remaining>0:
+        _time.sleep(remaining)
+
+
+def waitUntilLatestShotNumber(shotno,debug=False,timeout=None,
+                              pollInterval=None,backoff=None,maxInterval=None):
+    """
+    If the shotno that you are interested is the latest shotno,
+    this code checks to see if all of the data has finished recording.  
+    If not, the code pauses until it has.  Then it exits the code.
+    
+    This code is useful to include in anything where you want to make sure
+    you aren't trying to get data from a shot number that hasn't finished recording yet.
+    
+    Shots below the latest shot number already seen return immediately 
+    without contacting the server.  Otherwise, the latest shot number is 
+    trusted for _LATEST_SHOT_TTL seconds.  Whether the shot has finished is
+    decided from the length of _SHOT_DONE_NODE, so no data is downloaded.
+    
+    Parameters
+    ----------
+    shotno : int
+        shot number
+    debug : bool
+        default False.  
+        prints text to screen to help with debugging.  
+    timeout : float
+        default None (wait forever).  seconds to wait before raising a 
+        RuntimeError
+    pollInterval : float
+        seconds between the first checks.  default _WAIT_POLL_INTERVAL
+    backoff : float
+        the interval is multiplied by this after each check.  default 
+        _WAIT_BACKOFF
+    maxInterval : float
+        the longest interval between checks.  default _WAIT_MAX_INTERVAL
+        
+    Notes
+    -----
+    If _pref._MDS_SHOT_EVENT is set to the name of an MDSplus event that 
+    the server sends when a shot is stored, each pause ends as soon as the 
+    event arrives instead of waiting out the interval.
+    """
+    if pollInterval is None:
+        pollInterval=_WAIT_POLL_INTERVAL
+    if backoff is None:
+        backoff=_WAIT_BACKOFF
+    if maxInterval is None:
+        maxInterval=_WAIT_MAX_INTERVAL
+    deadline=None if timeout is None else _time.time()+timeout
+    
+    # shots from an archive or synthetic backend are always complete
+    if _liveBackend()==False:
+        return
+    
+    # archived shots don't need a round trip at all
+    with _LATEST_SHOT_LOCK:
+        seen=_LATEST_SHOT['shotno']
+    if seen is not None and shotno<seen:
+        return
+
+    latestShotno=latestShotNumber(maxAge=_LATEST_SHOT_TTL)
+    if shotno>latestShotno:
+        # the remembered value may be stale
+        latestShotno=latestShotNumber()
+    if debug==True:
+        print("latest shot number : %d"%latestShotno)
+        print("shot number in question : %d"%shotno)
+    
+    # if you haven't made it to the latest number yet
+    if shotno<latestShotno:
+        return
+    
+    # if you are trying to access a number that hasn't even been created yet
+    delay=pollInterval
+    if shotno>latestShotno:
+        print("This shot number hasn't even been created yet.  Waiting...")
+        while latestShotNumber()<shotno:
+            _waitForShot(delay,deadline,shotno)
+            delay=min(delay*backoff,maxInterval)
+        
+    # if you are trying to access a number that has been created but not finished        
+    if _shotDoneNodeLength(shotno)>0:
+        return
+    print("Shot number has not finished.  Waiting...")
+    delay=pollInterval
+    while True:
+        _waitForShot(delay,deadline,shotno)
+        delay=min(delay*backoff,maxInterval)
+        if _shotDoneNodeLength(shotno)>0:
+            # give the remaining nodes a moment to finish writing
+            _time.sleep(1)
+            return
+
+        
+###############################################################################
+### time base registry
+
+class timebaseRegistry:
+    """
+    Registry of the time bases of recent shots.  Each distinct time base 
+    (i.e. each digitizer clock) is stored once per shot as a single 
+    read-only array that is shared by every node recorded on it.
+    
+    Parameters
+    ----------
+    maxShots : int
+        number of shots to keep time bases for.  The least recently used 
+        shot is dropped first.  default is 16
+        
+    Subfunctions
+    ------------
+    lookup :
+        returns the time base of a node if its clock source is known
+    find :
+        returns the time base with a given fingerprint, if registered
+    register :
+        adds a node and its time base to the registry
+    clear :
+        empties the registry
+        
+    Notes
+    -----
+    A clock source is identified by the fingerprint (number of samples, 
+    first time, last time) of its time base.  The fingerprint is three 
+    numbers and can be requested from the server alongside the data, so a 
+    node on an already known digitizer never has its time base downloaded 
+    again.  
+    
+    The shared arrays are read-only.  Copy one before modifying it in place.
+    """
+    def __init__(self,maxShots=16):
+        self.maxShots=maxShots
+        self._shots=[]  # [tree, shotno] least recently used first
+        self._nodes={}  # (tree, shotno, PATH) -> fingerprint
+        self._times={}  # (tree, shotno, fingerprint) -> read-only time base
+        self._lock=_threading.Lock()
+        
+    def _touch(self,tree,shotno):
+        """ marks a shot as most recently used.  call with lock held """
+        key=[tree,shotno]
+        if key in self._shots:
+            self._shots.remove(key)
+        self._shots.append(key)
+        while len(self._shots)>self.maxShots:
+            oldTree,oldShotno=self._shots.pop(0)
+            for d in [self._nodes,self._times]:
+                for k in [k for k in d if k[0]==oldTree and k[1]==oldShotno]:
+                    del d[k]
+                    
+    def lookup(self,shotno,address,tree='hbtep2'):
+        """ returns the time base of a node, or None if it is not known """
+        with self._lock:
+            fingerprint=self._nodes.get((tree,shotno,address.strip().upper()))
+            if fingerprint is None:
+                return None
+            self._touch(tree,shotno)
+            return self._times.get((tree,shotno,fingerprint))
+        
+    def find(self,shotno,fingerprint,address=None,tree='hbtep2'):
+        """ 
+        returns the time base with this fingerprint, or None.  If found, 
+        address (optional) is linked to it so that future lookups skip the 
+        fingerprint.  
+        """
+        with self._lock:
+            time=self._times.get((tree,shotno,fingerprint))
+            if time is not None:
+                self._touch(tree,shotno)
+                if address is not None:
+                    self._nodes[(tree,shotno,address.strip().upper())]=fingerprint
+            return time
+        
+    def register(self,shotno,address,time,tree='hbtep2'):
+        """
+        Adds a node and its time base to the registry
+        
+        Returns
+        -------
+        time : numpy.ndarray
+            the shared, read-only time base.  If an identical time base is 
+            already registered, that array is returned instead.
+        """
+        fingerprint=_timebaseFingerprint(time)
+        with self._lock:
+            self._touch(tree,shotno)
+            self._nodes[(tree,shotno,address.strip().upper())]=fingerprint
+            shared=self._times.get((tree,shotno,fingerprint))
+            if shared is None:
+                shared=time.view()
+                shared.flags.writeable=False
+                self._times[(tree,shotno,fingerprint)]=shared
+        return shared
+    
+    def clear(self):
+        """ empties the registry """
+        with self._lock:
+            self._shots=[]
+            self._nodes={}
+            self._times={}
+            
+            
+_TIMEBASES = timebaseRegistry()
+
+def _timebaseFingerprint(time):
+    """ returns (number of samples, first time, last time) of a time base """
+    if len(time)==0:
+        return (0,None,None)
+    return (len(time),float(time[0]),float(time[-1]))
+    
+def _timebaseFingerprintExpressions(address):
+    """ TDI expressions for the fingerprint of the time base of a node """
+    return ['size(dim_of(%s))'%address,
+            'dim_of(%s)[0]'%address,
+            'dim_of(%s)[size(dim_of(%s))-1]'%(address,address)]
+    
+def _remoteTimebase(mdsConn,shotno,address,fingerprint=None):
+    """
+    Returns the shared time base of a node, downloading it only if its 
+    clock source has not been seen before for this shot.  
+    
+    Parameters
+    ----------
+    mdsConn : MDSplus.Connection
+        open connection to the tree
+    shotno : int
+        shot number
+    address : str
+        node address
+    fingerprint : list
+        the results of _timebaseFingerprintExpressions(address), if these 
+        were already fetched (e.g. within a batch).  None fetches them.
+    """
+    time=_TIMEBASES.lookup(shotno,address)
+    if time is not None:
+        return time
+    if fingerprint is None:
+        fingerprint=_getMany(mdsConn,_timebaseFingerprintExpressions(address))
+    try:
+        n,t0,t1=fingerprint
+        if int(n)==0:
+            key=(0,None,None)
+        else:
+            key=(int(n),float(t0),float(t1))
+    except (TypeError,ValueError):
+        key=None # at least one of the fingerprint expressions failed
+    if key is not None:
+        time=_TIMEBASES.find(shotno,key,address)
+        if time is not None:
+            return time
+    time=_get(mdsConn,'dim_of('+address+')')
+    return _TIMEBASES.register(shotno,address,time)
+    
+    
+###############################################################################
+### local tree cache
+
+class localTreeCache:
+    """
+    Cache of open MDSplus Tree objects and resolved TreeNode handles for 
+    use on the HBT-EP server (i.e. when _ON_HBTEP_SERVER is True).  
+    Repeated loads of a shot then skip opening the tree and resolving the 
+    node paths.
+    
+    Parameters
+    ----------
+    maxShots : int
+        number of trees to keep open.  The least recently used tree is 
+        closed first.  default is 8
+        
+    Subfunctions
+    ------------
+    tree :
+        returns the open tree of a shot
+    node :
+        returns the TreeNode of an address
+    remove :
+        closes the cached tree of a shot
+    clear :
+        closes all cached trees
+        
+    Notes
+    -----
+    The cache is shared by all threads of the process.
+    """
+    def __init__(self,maxShots=8):
+        self.maxShots=maxShots
+        self._trees=[]  # [tree, shotno, MDSplus.Tree, {PATH: TreeNode}] least recently used first
+        self._lock=_threading.Lock()
+        
+    def _entry(self,shotno,tree):
+        """ returns the cache entry of a shot, opening its tree if needed """
+        with self._lock:
+            for entry in self._trees:
+                if entry[0]==tree and entry[1]==shotno:
+                    self._trees.remove(entry)
+                    self._trees.append(entry)
+                    return entry
+        
+        # open outside of the lock.  if another thread opened the same tree 
+        # in the meantime, one of the two is simply dropped
+        _requireMDSplus()
+        entry=[tree,shotno,_mds.Tree(tree,shotno),{}]
+        with self._lock:
+            self._trees.append(entry)
+            old=[]
+            while len(self._trees)>self.maxShots:
+                old.append(self._trees.pop(0))
+        for item in old:
+            self._close(item[2])
+        return entry
+        
+    def _close(self,treeObj):
+        try:
+            treeObj.close()
+        except Exception:
+            pass
+        
+    def tree(self,shotno,tree='hbtep2'):
+        """ returns the open MDSplus.Tree of a shot """
+        return self._entry(shotno,tree)[2]
+        
+    def node(self,shotno,address,tree='hbtep2'):
+        """ returns the MDSplus.TreeNode of an address """
+        entry=self._entry(shotno,tree)
+        key=address.strip().upper()
+        node=entry[3].get(key)
+        if node is None:
+            node=entry[2].getNode(address)
+            entry[3][key]=node
+        return node
+        
+    def remove(self,shotno,tree='hbtep2'):
+        """ closes the cached tree of a shot, if any """
+        with self._lock:
+            old=[e for e in self._trees if e[0]==tree and e[1]==shotno]
+            for entry in old:
+                self._trees.remove(entry)
+        for item in old:
+            self._close(item[2])
+        
+    def clear(self):
+        """ closes all cached trees """
+        with self._lock:
+            old=self._trees
+            self._trees=[]
+        for item in old:
+            self._close(item[2])
+            
+            
+_LOCAL_TREES = localTreeCache()
+
+
+###############################################################################
+### remote batch fetching
+
+def _getMany(mdsConn,expressions):
+    """
+    Evaluates a list of TDI expressions on the server in a single round trip
+    
+    Parameters
+    ----------
+    mdsConn : MDSplus.Connection
+        open connection to the tree
+    expressions : list (of str)
+        TDI expressions to evaluate
+        
+    Returns
+    -------
+    results : list
+        one entry per expression.  Either the evaluated data (e.g. a 
+        numpy.ndarray) or the exception raised while evaluating it
+        
+    Notes
+    -----
+    Uses the server side GetManyExecute function (MDSplus.Connection.getMany).
+    If the batch as a whole fails (e.g. an older server without GetMany), 
+    every entry is returned as that exception so that the caller can fall 
+    back to fetching one expression at a time.
+    """
+    tStart=_time.time()
+    try:
+        getMany=mdsConn.getMany()
+        for i in range(0,len(expressions)):
+            getMany.append('n%d'%i,expressions[i])
+        _metricsAdd('roundTrips',1)
+        getMany.execute()
+    except Exception as error:
+        return [error]*len(expressions)
+    finally:
+        _metricsAdd('requestTime',_time.time()-tStart)
+        
+    results=[]
+    for i in range(0,len(expressions)):
+        try:
+            results.append(getMany.get('n%d'%i).data())
+        except Exception as error:
+            results.append(error)
+    _metricsAdd('bytes',_nbytes(results))
+    return results
+    
+    
+def _getManyLocal(tree,expressions):
+    """
+    Counterpart to _getMany for use on the HBT-EP server.  Evaluates a list
+    of TDI expressions in the context of an open MDSplus.Tree and returns 
+    the data, or the exception, of each.
+    """
+    results=[]
+    for expression in expressions:
+        try:
+            results.append(tree.tdiExecute(expression).data())
+        except Exception as error:
+            results.append(error)
+    return results
+    
+    
+def _get(mdsConn,expression):
+    """ evaluates a single TDI expression on the server and returns the data """
+    tStart=_time.time()
+    _metricsAdd('roundTrips',1)
+    try:
+        data=mdsConn.get(expression).data()
+    finally:
+        _metricsAdd('requestTime',_time.time()-tStart)
+    _metricsAdd('bytes',_nbytes(data))
+    return data
+    
+    
+def _batchFetchRemote(mdsConn,shotno,dataAddress):
+    """
+    Fetches every node in dataAddress, plus the time associated with the 
+    first node, in a single round trip
+    
+    Parameters
+    ----------
+    mdsConn : MDSplus.Connection
+        open connection to the tree
+    shotno : int
+        shot number that the tree is open to
+    dataAddress : list (of strings)
+        address of desired data on MDSplus tree
+        
+    Returns
+    -------
+    data : list (of numpy.ndarray)
+        requested data
+    time : numpy.ndarray or list
+        time associated with data array.  empty list if the data is not an 
+        array
+        
+    Notes
+    -----
+    Nodes that fail within the batch are fetched again one at a time so that
+    a missing node raises the same error as an unbatched fetch would.
+    
+    Instead of the time itself, the batch includes the fingerprint of the 
+    time base (see timebaseRegistry).  The time is only downloaded if it 
+    does not match a time base already registered for this shot.
+    """
+    n=len(dataAddress)
+    if _TIMEBASES.lookup(shotno,dataAddress[0]) is None:
+        extra=_timebaseFingerprintExpressions(dataAddress[0])
+    else:
+        extra=[]
+    results=_getMany(mdsConn,dataAddress+extra)
+    
+    data=[]
+    for i in range(0,n):
+        if isinstance(results[i],Exception):
+            _metricsAdd('retries',1)
+            data.append(_get(mdsConn,dataAddress[i]))
+        else:
+            data.append(results[i])
+    
+    # if data is an array, also get time
+    time=[]
+    if type(data[0]) is _np.ndarray:
+        time=_remoteTimebase(mdsConn,shotno,dataAddress[0],
+                             fingerprint=results[n:] if len(extra)>0 else None)
+            
+    return data,time
+        
+    
+def _remoteWindow(mdsConn,shotno,dataAddress,tStart,tStop):
+    """
+    Windowed fetch (see _windowedFetchRemote) for a node whose time base has
+    not been downloaded.  Only the fingerprint of the time base (its size, 
+    first and last time) is fetched to estimate the indices of the window, 
+    assuming even sampling.  The data and the time of the window (plus one 
+    sample on each side) are then fetched in one batch.  The extra samples 
+    confirm that the indices are the ones _process.findNearest would find.  
+    
+    Returns (data, time), or None if the window can not be found this way 
+    (not a signal, unevenly sampled, an empty window or a time base that is 
+    already registered), in which case the caller falls back to the full 
+    time base.
+    """
+    address=dataAddress[0]
+    fingerprint=_getMany(mdsConn,_timebaseFingerprintExpressions(address))
+    try:
+        n=int(fingerprint[0])
+        t0=float(fingerprint[1])
+        t1=float(fingerprint[2])
+    except (TypeError,ValueError):
+        return None # not a signal, or a fingerprint expression failed
+    if n<2 or t1<=t0 or _TIMEBASES.find(shotno,(n,t0,t1),address) is not None:
+        return None
+    
+    # nearest sample, assuming even sampling.  argmin returns the first of 
+    # two equally near samples
+    dt=(t1-t0)/(n-1)
+    def nearest(t):
+        return int(min(max(_np.ceil((t-t0)/dt-0.5),0),n-1))
+    iStart=nearest(tStart)
+    iStop=nearest(tStop)
+    if iStop<=iStart:
+        return None
+    a=max(iStart-1,0)
+    b=min(iStop+1,n-1)
+    
+    # TDI ranges include their upper bound
+    results=_getMany(mdsConn,['data(%s)[%d : %d]'%(node,iStart,iStop-1) 
+                              for node in dataAddress]+
+                             ['dim_of(%s)[%d : %d]'%(address,a,b)])
+    time=results[-1]
+    if isinstance(time,Exception) or len(time)!=b-a+1:
+        return None
+    # the distance to tStart (tStop) only has one minimum along a sorted 
+    # time base, so a local minimum at the estimate is the global one
+    if (a+_process.findNearest(time,tStart)!=iStart or
+        a+_process.findNearest(time,tStop)!=iStop):
+        return None
+    
+    data=[]
+    for i in range(0,len(dataAddress)):
+        if isinstance(results[i],Exception):
+            _metricsAdd('retries',1)
+            data.append(_get(mdsConn,dataAddress[i])[iStart:iStop])
+        else:
+            data.append(results[i])
+    return data,time[iStart-a:iStop-a]
+    
+    
+def _windowedFetchRemote(mdsConn,shotno,dataAddress,tStart,tStop):
+    """
+    Fetches only the samples between tStart and tStop for every node in 
+    dataAddress.  The window is applied on the server with a TDI subscript, 
+    so only the samples that are kept are transferred.
+    
+    Parameters
+    ----------
+    mdsConn : MDSplus.Connection
+        open connection to the tree
+    shotno : int
+        shot number that the tree is open to
+    dataAddress : list (of strings)
+        address of desired data on MDSplus tree
+    tStart : float
+        trims data before this time
+    tStop : float
+        trims data after this time
+        
+    Returns
+    -------
+    data : list (of numpy.ndarray)
+        requested data, trimmed
+    time : numpy.ndarray or list
+        trimmed time associated with data array.  empty list if the first 
+        node has no time base, in which case data is returned untrimmed
+        
+    Notes
+    -----
+    The indices are found from the time base of the first node exactly as 
+    _trimTime does, so the results are identical to downloading everything 
+    and trimming afterwards.  Any node whose windowed fetch fails (e.g. a
+    node with a shorter record) is downloaded in full and trimmed locally.
+    
+    If the time base has not been downloaded yet, the indices are first 
+    estimated from its fingerprint (see _remoteWindow), so that only the 
+    kept part of the time base is transferred too.  The full time base is
+    only downloaded if it turns out not to be evenly sampled.
+    """
+    if _TIMEBASES.lookup(shotno,dataAddress[0]) is None:
+        out=_remoteWindow(mdsConn,shotno,dataAddress,tStart,tStop)
+        if out is not None:
+            return out
+    
+    try:
+        time=_remoteTimebase(mdsConn,shotno,dataAddress[0])
+    except _MDS_TREE_ERRORS:
+        raise
+    except Exception:
+        # not a signal (e.g. a scalar or string node).  nothing to trim
+        return _batchFetchRemote(mdsConn,shotno,dataAddress)
+        
+    iStart=_process.findNearest(time,tStart)
+    iStop=_process.findNearest(time,tStop)
+    if iStop<=iStart:
+        data,time=_batchFetchRemote(mdsConn,shotno,dataAddress)
+        time,data=_trimTime(time,data,tStart,tStop)
+        return data,time
+    
+    # TDI ranges include their upper bound
+    results=_getMany(mdsConn,['data(%s)[%d : %d]'%(address,iStart,iStop-1) 
+                              for address in dataAddress])
+    
+    data=[]
+    for i in range(0,len(dataAddress)):
+        if isinstance(results[i],Exception):
+            _metricsAdd('retries',1)
+            data.append(_get(mdsConn,dataAddress[i])[iStart:iStop])
+        else:
+            data.append(results[i])
+            
+    return data,time[iStart:iStop]
+    
+    
+def _decimatedFetchRemote(mdsConn,shotno,dataAddress,tStart,tStop,factor,mode):
+    """
+    Fetches every node in dataAddress at a reduced sample rate.  The 
+    decimation (and the time window, if any) is applied on the server so 
+    that only the reduced data is transferred.
+    
+    Parameters
+    ----------
+    mdsConn : MDSplus.Connection
+        open connection to the tree
+    shotno : int
+        shot number that the tree is open to
+    dataAddress : list (of strings)
+        address of desired data on MDSplus tree
+    tStart : float
+        trims data before this time.  [] or None for no trimming
+    tStop : float
+        trims data after this time.  [] for no trimming
+    factor : int
+        number of samples per block
+    mode : str
+        'stride', 'mean' or 'minmax'.  See _decimateSignal
+        
+    Returns
+    -------
+    data : list (of numpy.ndarray)
+        requested data, trimmed and decimated
+    time : numpy.ndarray or list
+        time associated with data array.  empty list if the first node has 
+        no time base, in which case data is returned as is
+        
+    Notes
+    -----
+    'stride' uses a TDI subscript with a step.  'mean' and 'minmax' reshape
+    the samples into blocks with SET_RANGE and reduce them with MEAN, MINVAL
+    and MAXVAL.  Any node whose reduced fetch fails or has an unexpected 
+    length is downloaded in full and decimated locally, which gives the 
+    same result.
+    """
+    try:
+        time=_remoteTimebase(mdsConn,shotno,dataAddress[0])
+    except _MDS_TREE_ERRORS:
+        raise
+    except Exception:
+        # not a signal (e.g. a scalar or string node).  nothing to decimate
+        return _batchFetchRemote(mdsConn,shotno,dataAddress)
+        
+    if type(tStop)!=list and tStart is not None:
+        iStart=_process.findNearest(time,tStart)
+        iStop=_process.findNearest(time,tStop)
+    else:
+        iStart=0
+        iStop=len(time)
+    m=(iStop-iStart)//factor
+    if m==0:
+        data,time=_batchFetchRemote(mdsConn,shotno,dataAddress)
+        if type(tStop)!=list:
+            time,data=_trimTime(time,data,tStart,tStop)
+        time,data=_decimate(time,data,factor,mode)
+        return data,time
+    
+    # TDI ranges include their upper bound
+    expressions=[]
+    for address in dataAddress:
+        if mode=='stride':
+            expressions.append('data(%s)[%d : %d : %d]'%(address,iStart,iStop-1,factor))
+        else:
+            block='set_range(%d,%d,data(%s)[%d : %d])'%(factor,m,address,iStart,iStart+m*factor-1)
+            if mode=='mean':
+                expressions.append('mean(%s,0)'%block)
+            else:
+                expressions+=['minval(%s,0)'%block,'maxval(%s,0)'%block]
+    step=2 if mode=='minmax' else 1
+    length=len(range(iStart,iStop,factor)) if mode=='stride' else m
+    results=_getMany(mdsConn,expressions)
+    
+    data=[]
+    for i in range(0,len(dataAddress)):
+        values=results[i*step:(i+1)*step]
+        ok=True
+        for value in values:
+            if not isinstance(value,_np.ndarray) or value.shape!=(length,):
+                ok=False
+        if ok==False:
+            _metricsAdd('retries',1)
+            data.append(_decimateSignal(_get(mdsConn,dataAddress[i])[iStart:iStop],factor,mode))
+        elif mode=='minmax':
+            out=_np.empty(2*m,dtype=values[0].dtype)
+            out[0::2]=values[0]
+            out[1::2]=values[1]
+            data.append(out)
+        else:
+            data.append(values[0])
+            
+    return data,_decimateTime(time[iStart:iStop],factor,mode)
+    
+    
+def _cachedFetch(shotno,dataAddress,batch=True,refresh=False):
+    """
+    Reads nodes through the local shot cache.  Nodes that are not cached are
+    downloaded in full (untrimmed) and written to the cache.
+    
+    Parameters
+    ----------
+    shotno : int
+        shot number
+    dataAddress : list (of strings)
+        address of desired data on MDSplus tree
+    batch : bool
+        passed to mdsData for the nodes that are downloaded
+    refresh : bool
+        downloads every node again and overwrites the cached copies
+        
+    Returns
+    -------
+    data : list (of numpy.ndarray)
+        requested data, untrimmed
+    time : numpy.ndarray or list
+        time associated with data array.  empty list if the data is not an 
+        array
+    """
+    timeAddress='dim_of('+dataAddress[0]+')'
+    if refresh==True:
+        data=[None]*len(dataAddress)
+        time=None
+    else:
+        data=[_SHOT_CACHE.read('hbtep2',shotno,address) for address in dataAddress]
+        time=_SHOT_CACHE.read('hbtep2',shotno,timeAddress)
+    
+    # the time is only needed if the data is an array
+    missing=[i for i in range(0,len(dataAddress)) if data[i] is None]
+    _metricsAdd('cacheHits',len(dataAddress)-len(missing))
+    _metricsAdd('cacheMisses',len(missing))
+    _metricsAdd('cacheBytes',_nbytes([d for d in data if d is not None])+_nbytes(time))
+    if time is None and (data[0] is None or isinstance(data[0],_np.ndarray)):
+        if 0 not in missing:
+            missing=[0]+missing
+    if len(missing)==0:
+        return data, ([] if time is None else time)
+        
+    # download the missing nodes.  the first node is always downloaded with 
+    # its time, so that the time matches what an uncached call returns.  the
+    # cache holds the stored precision; mdsData casts what it returns
+    out=mdsData(shotno,[dataAddress[i] for i in missing],batch=batch,
+                useCache=False,decimate=1,dtype='native')
+    if type(out) is tuple:
+        newData,newTime=out
+    else:
+        newData,newTime=out,[]
+    for j in range(0,len(missing)):
+        data[missing[j]]=newData[j]
+        _SHOT_CACHE.write('hbtep2',shotno,dataAddress[missing[j]],newData[j])
+    if isinstance(newTime,_np.ndarray):
+        time=newTime
+        _SHOT_CACHE.write('hbtep2',shotno,timeAddress,newTime)
+        
+    return data, ([] if time is None else time)
+    
+    
+@_instrumented
+def mdsData(shotno=None,
+            dataAddress=['\HBTEP2::TOP.DEVICES.SOUTH_RACK:CPCI_10:INPUT_94',
+                         '\HBTEP2::TOP.DEVICES.SOUTH_RACK:CPCI_10:INPUT_95'],
+            tStart=[],tStop=[],batch=True,useCache=True,refreshCache=False,
+            decimate=None,decimateMode='stride',dtype=None):
+    """
+    Get data and optionally associated time from MDSplus tree
+    
+    Parameters
+    ----------
+    shotno : int
+        shotno of data.  when operating remotely, this function checks a 
+        connection to this shotno out of the active mdsConnectionPool
+    dataAddress : list (of strings)
+        address of desired data on MDSplus tree
+    tStart : float
+        trims data before this time
+    tStop : float
+        trims data after this time
+    batch : bool
+        default True.  when operating remotely, fetches all nodes (and the 
+        time) in a single round trip to the server.  Any node that fails in 
+        the batch is re-fetched on its own.  If tStart and tStop are given,
+        the time window is also applied on the server so that only the 
+        trimmed data is transferred.  False fetches one node at a time and 
+        trims locally.
+    useCache : bool
+        default True.  reads through (and writes through) the local shot 
+        cache if one is enabled.  see enableShotCache().  False bypasses the
+        cache.
+    refreshCache : bool
+        default False.  True downloads the data again and overwrites the 
+        cached copy
+    decimate : int
+        default None, which is 1 (full resolution) unless the call is made 
+        from a loader given decimate=...  Keeps 1 of every decimate samples.  
+        When operating remotely with batch=True, the decimation is done on 
+        the server so that only the reduced data is transferred.  Otherwise
+        it is done after the data is loaded.
+    decimateMode : str
+        'stride' (default) - every decimate-th sample
+        'mean' - boxcar mean of each block of decimate samples
+        'minmax' - minimum and maximum of each block, interleaved, with the
+            time of the block center repeated twice.  This keeps the 
+            envelope of the signal for plotting.
+    dtype : str or numpy.dtype
+        default None, which is the precision set by the calling loader or 
+        by setFloatPrecision, if any.  Floating point data is returned with
+        this precision (e.g. 'float32').  'native' returns the precision 
+        stored in the tree.  The time is not converted.
+    
+    Returns
+    -------
+    data : list (of numpy.ndarray)
+        requested data
+    time : numpy.ndarray
+        time associated with data array
+    """            
+        
+    # decimation set by the calling loader, if any
+    if decimate is None:
+        decimate,decimateMode=getattr(_DECIMATION_LOCAL,'setting',None) or (1,'stride')
+    if decimateMode not in _DECIMATE_MODES:
+        raise ValueError("decimateMode must be one of %s"%_DECIMATE_MODES)
+    dtype=_resolveDtype(dtype)
+        
+    # data from an archive or synthetic backend.  see setBackend
+    if _liveBackend()==False:
+        return _BACKEND.mdsData(shotno,dataAddress,tStart,tStop,
+                                decimate=decimate,decimateMode=decimateMode,
+                                dtype=dtype)
+        
+    # convert dataAddress to a list if it not one originally 
+    if type(dataAddress) is not list:
+        dataAddress=[dataAddress];
+    _checkCatalog(shotno,dataAddress)
+        
+#    # if shotno == -1, use the latest shot number
+#    if shotno==-1:
+#        shotno=latestShotNumber()
+        
+    # init arrays
+    time = []
+    data = []
+    trim = type(tStop)!=list
+    decimated = decimate<=1
+        
+    if _SHOT_CACHE is not None and useCache==True:
+        # read through the local shot cache.  cached records are full length
+        # and are trimmed below
+        data,time=_cachedFetch(shotno,dataAddress,batch,refreshCache)
+        if isinstance(time,_np.ndarray):
+            time=_TIMEBASES.register(shotno,dataAddress[0],time)
+        
+    # check if computer is located locally or remotely.  The way it connects to spitzer remotely can only use one method, but locally, either method can be used.  
+    elif _ON_HBTEP_SERVER==True: # if operating local to the tree
+        # converted from Ian's code
+        
+        for i in range(0,len(dataAddress)):
+
+            node = _LOCAL_TREES.node(shotno,dataAddress[i])   #Get the proper node    
+            tRead=_time.time()
+            data.append(node.data())                      #Get the data from this node 
+            _metricsAdd('requestTime',_time.time()-tRead)
+            _metricsAdd('bytes',_nbytes(data[-1]))
+        if type(data[0]) is _np.ndarray: # if node is an array, return data and time
+            time = _TIMEBASES.lookup(shotno,dataAddress[-1])
+            if time is None:
+                time = _TIMEBASES.register(shotno,dataAddress[-1],node.dim_of().data())
+
+    
+    else: # operaeting remotely
+
+        # check a connection to this shotno out of the active pool
+        with _activePool().connection(shotno) as mdsConn:
+
+            if batch==True and decimate>1:
+                # server side decimation (and trimming)
+                data,time=_decimatedFetchRemote(mdsConn,shotno,dataAddress,
+                                                tStart,tStop,decimate,decimateMode)
+                trim=False
+                decimated=True
+                
+            elif batch==True and trim==True and tStart is not None:
+                # server side trimming
+                data,time=_windowedFetchRemote(mdsConn,shotno,dataAddress,tStart,tStop)
+                trim=False
+
+            elif batch==True:
+                data,time=_batchFetchRemote(mdsConn,shotno,dataAddress)
+
+            else:
+                for i in range(0,len(dataAddress)):
+                    data.append(_get(mdsConn,dataAddress[i]))
+
+                # if data is an array, also get time
+                if type(data[0]) is _np.ndarray:
+
+                    time = _get(mdsConn,'dim_of('+dataAddress[0]+')');  # time assocated with data
+                    time = _TIMEBASES.register(shotno,dataAddress[0],time)
+
+    if isinstance(time,_np.ndarray) and trim==True:
+        # trim time and data
+        time,data= _trimTime(time,data,tStart,tStop)
+        
+    if isinstance(time,_np.ndarray) and decimated==False:
+        time,data=_decimate(time,data,decimate,decimateMode)
+        
+    data=_castData(data,dtype)
+        
+    if isinstance(time,_np.ndarray):
+        return data, time
+    else: 
+        return data
+    
+    
+@_instrumented
+def probeNodes(shotno=96530,
+               dataAddress=['\HBTEP2::TOP.SENSORS.ROGOWSKIS:IP',
+                            '\HBTEP2::TOP.SENSORS.LOOP_VOlTAGE'],
+               timeBase=True):
+    """
+    Checks which nodes exist and hold data, without downloading the data.
+    When operating remotely, all nodes are probed in a single round trip.
+    
+    Parameters
+    ----------
+    shotno : int
+        shot number
+    dataAddress : list (of strings)
+        addresses of the nodes on the MDSplus tree
+    timeBase : bool
+        default True.  also returns the length of each node's time base
+        
+    Returns
+    -------
+    df : pandas.core.frame.DataFrame
+        one row per node, indexed by address, with columns
+        exists : bool
+            the node is in the tree
+        hasData : bool
+            the node holds data for this shot
+        length : int
+            length of the stored data in bytes.  0 if empty
+        dtype : int
+            MDSplus data type code of the stored data (e.g. 14 for text)
+        timeLength : int
+            number of points in the time base.  -1 if there isn't one (or 
+            if timeBase is False)
+            
+    Example
+    -------
+    ::
+        
+        df=probeNodes(96530,['\HBTEP2::TOP.METADATA:COMMENT',
+                             '\HBTEP2::TOP.SENSORS.ROGOWSKIS:IP'])
+        print(df)
+    """
+    if _liveBackend()==False:
+        return _BACKEND.probeNodes(shotno,dataAddress,timeBase)
+    if type(dataAddress) is not list:
+        dataAddress=[dataAddress];
+    n=len(dataAddress)
+    exists=_np.ones(n,dtype=bool)
+    length=_np.zeros(n,dtype=int)
+    dtype=_np.zeros(n,dtype=int)
+    timeLength=-_np.ones(n,dtype=int)
+    
+    if _ON_HBTEP_SERVER==True:
+        for i in range(0,n):
+            try:
+                node=_LOCAL_TREES.node(shotno,dataAddress[i])
+            except _MDS_TREE_ERRORS:
+                exists[i]=False
+                continue
+            length[i]=int(node.getLength())
+            dtype[i]=int(node.dtype)
+            if timeBase==True and length[i]>0:
+                try:
+                    time=_TIMEBASES.lookup(shotno,dataAddress[i])
+                    if time is None:
+                        time=node.dim_of().data()
+                    timeLength[i]=len(time)
+                except Exception:
+                    pass
+                
+    else:
+        expressions=[]
+        for address in dataAddress:
+            expressions+=['getnci(%s,"LENGTH")'%address,
+                          'getnci(%s,"DTYPE")'%address]
+            if timeBase==True:
+                expressions.append('size(dim_of(%s))'%address)
+        step=3 if timeBase==True else 2
+        
+        with _activePool().connection(shotno) as mdsConn:
+            results=_getMany(mdsConn,expressions)
+            for i in range(0,n):
+                nci=[]
+                for j in range(0,2):
+                    value=results[i*step+j]
+                    if isinstance(value,Exception) and not isinstance(value,_MDS_TREE_ERRORS):
+                        # the batch failed.  try this one on its own
+                        try:
+                            _metricsAdd('retries',1)
+                            value=_get(mdsConn,expressions[i*step+j])
+                        except _MDS_TREE_ERRORS as error:
+                            value=error
+                    nci.append(value)
+                if isinstance(nci[0],Exception):
+                    exists[i]=False
+                    continue
+                length[i]=int(nci[0])
+                dtype[i]=int(nci[1])
+                if timeBase==True and length[i]>0:
+                    value=results[i*step+2]
+                    if not isinstance(value,Exception):
+                        timeLength[i]=int(value)
+                        
+    return _probeFrame(dataAddress,exists,length,dtype,timeLength)
+    
+    
+def _probeFrame(dataAddress,exists,length,dtype,timeLength):
+    """ builds the DataFrame returned by probeNodes """
+    return _pd.DataFrame({'exists':exists,
+                          'hasData':length>0,
+                          'length':length,
+                          'dtype':dtype,
+                          'timeLength':timeLength},
+                         index=dataAddress,
+                         columns=['exists','hasData','length','dtype','timeLength'])
+                         
+                         
+def nodeInfo(shotno=96530,dataAddress='\HBTEP2::TOP.SENSORS.ROGOWSKIS:IP',
+             timeBase=True):
+    """
+    Single node version of probeNodes
+    
+    Returns
+    -------
+    info : dict
+        with keys exists, hasData, length, dtype, and timeLength.  See 
+        probeNodes.
+    """
+    df=probeNodes(shotno,[dataAddress],timeBase=timeBase)
+    return df.iloc[0].to_dict()
+    
+    
+###############################################################################
+### resilient bulk fetch
+
+# threads used to put a time limit on fetches
+_TIMEOUT_EXECUTOR = None
+
+# the _timedCall of the call running in a timeout thread
+_TIMED_CALL = _threading.local()
+
+class _timedCall:
+    """
+    The pooled connections checked out by a call of _callWithTimeout.  If 
+    the caller stops waiting, abandon() closes them instead of letting 
+    them go back to the pool in an unknown state (e.g. with a reply still 
+    in flight), and any connection the call checks out later is closed 
+    when it is released.
+    """
+    def __init__(self):
+        self.abandoned=False
+        self._connections=[]  # [pool, conn]
+        self._lock=_threading.Lock()
+        
+    def add(self,pool,conn):
+        with self._lock:
+            self._connections.append([pool,conn])
+            
+    def remove(self,pool,conn):
+        """ False if abandon() has already closed conn """
+        with self._lock:
+            for item in self._connections:
+                if item[1] is conn:
+                    self._connections.remove(item)
+                    return True
+            return False
+            
+    def abandon(self):
+        with self._lock:
+            self.abandoned=True
+            connections=self._connections
+            self._connections=[]
+        for pool,conn in connections:
+            pool.release(conn,discard=True)
+            
+
+def _callWithTimeout(timeout,func,*args,**kwargs):
+    """
+    Calls func and returns its result.  If timeout (seconds) is not None 
+    and func takes longer, concurrent.futures.TimeoutError is raised.  The 
+    call itself can't be interrupted, so it finishes in the background and 
+    its result is discarded.  The pooled connections it holds are closed 
+    rather than returned to the pool.
+    """
+    global _TIMEOUT_EXECUTOR
+    if timeout is None:
+        return func(*args,**kwargs)
+    import concurrent.futures as _futures
+    if _TIMEOUT_EXECUTOR is None:
+        _TIMEOUT_EXECUTOR=_futures.ThreadPoolExecutor(
+                max_workers=2*getattr(_pref,'_MDS_POOL_SIZE',4))
+        
+    call=_timedCall()
+    def run():
+        _TIMED_CALL.call=call
+        try:
+            return func(*args,**kwargs)
+        finally:
+            _TIMED_CALL.call=None
+    future=_TIMEOUT_EXECUTOR.submit(run)
+    try:
+        return future.result(timeout)
+    except _futures.TimeoutError:
+        future.cancel()
+        call.abandon()
+        raise
+
+
+class fetchResult:
+    """
+    Result of fetchNodes.  Holds the data of every node that was fetched 
+    and the error of every node that wasn't.
+    
+    Attributes
+    ----------
+    shotno : int
+        shot number
+    dataAddress : list (of str)
+        requested node addresses, in order
+    data : dict
+        {address : data} of the nodes that were fetched
+    times : dict
+        {address : time} of the fetched nodes that have a time base
+    time : numpy.ndarray or list
+        time of the first fetched node that has one.  empty list otherwise
+    errors : dict
+        {address : exception} of the nodes that failed
+    attempts : dict
+        {address : number of attempts} 
+    ok : bool
+        True if every node was fetched
+        
+    Subfunctions
+    ------------
+    dataList :
+        the data in request order, with a fill value for failed nodes
+    raiseErrors :
+        raises the error of the first failed node, if any
+    """
+    def __init__(self,shotno,dataAddress):
+        self.shotno=shotno
+        self.dataAddress=list(dataAddress)
+        self.data={}
+        self.times={}
+        self.time=[]
+        self.errors={}
+        self.attempts={}
+        self.ok=True
+        
+    def _add(self,address,data,time):
+        self.data[address]=data
+        if isinstance(time,_np.ndarray):
+            self.times[address]=time
+            if type(self.time) is list:
+                self.time=time
+        if address in self.errors:
+            del self.errors[address]
+        self.ok=len(self.errors)==0
+        
+    def _fail(self,address,error):
+        self.errors[address]=error
+        self.ok=False
+        
+    def __getitem__(self,address):
+        """ data of a node.  raises the node's error if it failed """
+        if address in self.errors:
+            raise self.errors[address]
+        return self.data[address]
+    
+    def dataList(self,fill=None):
+        """ returns the data in request order.  failed nodes are fill """
+        return [self.data.get(address,fill) for address in self.dataAddress]
+    
+    def raiseErrors(self):
+        """ raises the error of the first failed node, if any """
+        for address in self.dataAddress:
+            if address in self.errors:
+                raise self.errors[address]
+            
+    def __repr__(self):
+        return '<fetchResult shot %s: %d of %d nodes, %d errors>'%(
+                self.shotno,len(self.data),len(self.dataAddress),len(self.errors))
+        
+        
+@_prepShotno
+def _timebaseGroups(shotno,dataAddress,timeLength):
+    """
+    Groups nodes that share a time base, i.e. that can be fetched with a 
+    single mdsData call.  When reading the remote tree, nodes are grouped by
+    time base fingerprint (one round trip for all of them).  Otherwise they
+    are grouped by the time base length from probeNodes.
+    
+    Returns
+    -------
+    groups : list (of lists of str)
+        addresses in request order.  A node whose fingerprint could not be 
+        read is left out
+    """
+    if _liveBackend()==True and _ON_HBTEP_SERVER==False:
+        expressions=[]
+        for address in dataAddress:
+            expressions+=_timebaseFingerprintExpressions(address)
+        with _activePool().connection(shotno) as mdsConn:
+            results=_getMany(mdsConn,expressions)
+        keys=[]
+        for i in range(0,len(dataAddress)):
+            fingerprint=results[3*i:3*i+3]
+            if timeLength[i]<0:
+                keys.append(-1) # no time base
+            elif any([isinstance(value,Exception) for value in fingerprint]):
+                keys.append(None)
+            else:
+                keys.append((int(fingerprint[0]),float(fingerprint[1]),
+                             float(fingerprint[2])))
+    else:
+        keys=[int(n) for n in timeLength]
+        
+    groups={}
+    for address,key in zip(dataAddress,keys):
+        if key is not None:
+            groups.setdefault(key,[]).append(address)
+    return sorted(groups.values(),key=lambda group: dataAddress.index(group[0]))
+    
+    
+@_prepShotno
+def fetchNodes(shotno=96530,
+               dataAddress=['\HBTEP2::TOP.SENSORS.ROGOWSKIS:IP',
+                            '\HBTEP2::TOP.SENSORS.LOOP_VOlTAGE'],
+               tStart=[],tStop=[],timeout=None,retries=2,backoff=0.5,
+               maxBackoff=8.):
+    """
+    Fetches many nodes without letting one bad node spoil the rest.  Returns
+    everything that could be fetched along with an error per failed node.
+    
+    Parameters
+    ----------
+    shotno : int
+        shot number (or list of them, see _prepShotno)
+    dataAddress : list (of strings)
+        address of desired data on MDSplus tree
+    tStart : float
+        trims data before this time
+    tStop : float
+        trims data after this time
+    timeout : float
+        default None (no limit).  seconds to wait for each node.  The first 
+        attempt fetches all nodes together and may take timeout seconds per
+        node.
+    retries : int
+        default 2.  number of times a node is tried again after a timeout 
+        or a connection error.  A node that is missing or empty 
+        (TreeNNF/TreeNODATA) is not retried.
+    backoff : float
+        default 0.5.  seconds before the first retry.  doubles for each 
+        retry after that
+    maxBackoff : float
+        default 8.  the longest pause between retries
+        
+    Returns
+    -------
+    result : fetchResult
+        one per shot (i.e. a list of them) if shotno is a list
+        
+    Notes
+    -----
+    The nodes are first probed (see probeNodes) and then fetched with a 
+    single mdsData call per time base, so that every node gets its own time.
+    Any node that this doesn't fetch is then fetched on its own, with 
+    retries.
+    
+    Example
+    -------
+    ::
+        
+        result=fetchNodes([96530,96531],['\HBTEP2::TOP.SENSORS.ROGOWSKIS:IP',
+                                         '\HBTEP2::TOP.SENSORS.MISSING'],
+                          timeout=10.,retries=3)
+        for r in result:
+            print(r, r.errors)
+    """
+    if type(dataAddress) is not list:
+        dataAddress=[dataAddress];
+    result=fetchResult(shotno,dataAddress)
+    
+    # the decimation (and precision) of the caller doesn't follow the fetch into the 
+    # timeout threads, so pass it on explicitly
+    decimate,decimateMode=getattr(_DECIMATION_LOCAL,'setting',None) or (1,'stride')
+    dtype=_resolveDtype()
+    def fetch(addresses):
+        out=_callWithTimeout(None if timeout is None else timeout*len(addresses),
+                             mdsData,shotno,addresses,tStart,tStop,
+                             decimate=decimate,decimateMode=decimateMode,
+                             dtype=dtype)
+        if type(out) is tuple:
+            return out
+        return out,[]
+        
+    # drop the nodes that are missing or empty
+    remaining=list(dataAddress)
+    groups=[]
+    try:
+        info=_callWithTimeout(timeout,probeNodes,shotno,remaining,timeBase=True)
+        for i in range(0,len(dataAddress)):
+            if info['exists'].iloc[i]==False:
+                result._fail(dataAddress[i],_TreeNNF())
+                result.attempts[dataAddress[i]]=0
+            elif info['hasData'].iloc[i]==False:
+                result._fail(dataAddress[i],_TreeNODATA())
+                result.attempts[dataAddress[i]]=0
+        remaining=[address for address in dataAddress if address not in result.errors]
+        timeLength=[info['timeLength'].iloc[dataAddress.index(address)] 
+                    for address in remaining]
+        groups=_callWithTimeout(timeout,_timebaseGroups,shotno,remaining,timeLength)
+    except Exception:
+        # fetch everything one at a time and let the errors show up below
+        pass
+    if len(remaining)==0:
+        return result
+    
+    # a single call per time base
+    for group in groups:
+        try:
+            data,time=fetch(group)
+        except Exception:
+            continue
+        for i in range(0,len(group)):
+            result.attempts[group[i]]=1
+            result._add(group[i],data[i],time if isinstance(data[i],_np.ndarray) else [])
+    remaining=[address for address in remaining if address not in result.attempts]
+    
+    # one at a time, with retries
+    for address in remaining:
+        delay=backoff
+        attempt=0
+        while True:
+            attempt+=1
+            try:
+                data,time=fetch([address])
+                result._add(address,data[0],time)
+                break
+            except _MDS_TREE_ERRORS as error:
+                result._fail(address,error)
+                break
+            except Exception as error:
+                result._fail(address,error)
+                if attempt>retries:
+                    break
+                _metricsAdd('retries',1)
+                _time.sleep(delay)
+                delay=min(2*delay,maxBackoff)
+        result.attempts[address]=attempt
+                
+    return result
+    
+    
+###############################################################################
+### tree catalog
+
+# names of the MDSplus node usage codes
+_MDS_USAGES = ['ANY','STRUCTURE','ACTION','DEVICE','DISPATCH','NUMERIC',
+               'SIGNAL','TASK','TEXT','WINDOW','AXIS','SUBTREE','COMPOUND_DATA']
+
+def _digitizer(text):
+    """ 
+    returns the digitizer (e.g. 'DEVICES.SOUTH_RACK:CPCI_10') whose input 
+    appears in a node path or decompiled record, or '' if there is none
+    """
+    import re as _re
+    match=_re.search(r'(DEVICES[\w.:]*?)[.:]INPUT_\d+',text.upper())
+    if match is None:
+        return ''
+    return match.group(1)
+
+
+class treeCatalog:
+    """
+    Local, indexed catalog of the nodes of the hbtep2 tree.  The tree is 
+    crawled once per shot range and node paths can then be looked up by 
+    pattern without contacting the server.
+    
+    Parameters
+    ----------
+    fileName : str
+        sqlite file that holds the catalog.  default is 
+        ~/.hbtepLib/treeCatalog.sqlite
+        
+    Subfunctions
+    ------------
+    crawl :
+        adds the nodes of a shot to the catalog
+    shots :
+        returns the crawled shot numbers
+    find :
+        returns the catalog entries that match a pattern
+    paths :
+        returns the node paths that match a pattern
+    missing :
+        returns the addresses that are not in the tree of a shot
+        
+    Notes
+    -----
+    Each entry holds the node path, usage (e.g. SIGNAL), MDSplus dtype code, 
+    length in bytes, digitizer, and time base source.  The digitizer is 
+    found from the node's record (e.g. a sensor calibrated from 
+    DEVICES.SOUTH_RACK:CPCI_10:INPUT_75).  Since each digitizer has its own 
+    clock, the digitizer is also the time base source unless the crawl is 
+    made with fingerprints=True, in which case it is the time base 
+    fingerprint (see timebaseRegistry).
+    
+    A crawl of shot S describes every shot from S up to the next crawled 
+    shot.  Lookups for shots before the first crawl use the first crawl.
+    
+    Example
+    -------
+    ::
+        
+        catalog=treeCatalog()
+        catalog.crawl([90000,96000,100000])
+        catalog.paths('MAGNETIC:*P',shotno=98170)
+        catalog.find('TRI_PROBE_S5*',shotno=98170)
+    """
+    def __init__(self,fileName='~/.hbtepLib/treeCatalog.sqlite'):
+        import sqlite3 as _sqlite3
+        self.fileName=_os.path.expanduser(fileName)
+        directory=_os.path.dirname(self.fileName)
+        if directory!='' and not _os.path.isdir(directory):
+            _os.makedirs(directory)
+        self._sqlite3=_sqlite3
+        self._lock=_threading.Lock()
+        self._shots=None
+        self._paths={}  # crawled shot -> set of normalized paths
+        with self._connect() as db:
+            db.execute('CREATE TABLE IF NOT EXISTS nodes (shotno INTEGER, '
+                       'path TEXT, usage TEXT, dtype INTEGER, length INTEGER, '
+                       'digitizer TEXT, timebase TEXT)')
+            db.execute('CREATE INDEX IF NOT EXISTS nodesIndex ON nodes (shotno, path)')
+            
+    def _connect(self):
+        return self._sqlite3.connect(self.fileName)
+    
+    def crawl(self,shotno,fingerprints=False):
+        """
+        Crawls the tree of one or more shots into the catalog.  An existing
+        crawl of the same shot is replaced.
+        
+        Parameters
+        ----------
+        shotno : int or list (of int)
+            shot number(s)
+        fingerprints : bool
+            default False.  also records the time base fingerprint of every 
+            signal.  This asks the server to evaluate the time base of every
+            signal, so it is much slower.
+            
+        Returns
+        -------
+        n : int
+            number of nodes added
+        """
+        if type(shotno) is list:
+            return sum([self.crawl(s,fingerprints) for s in shotno])
+        if _liveBackend()==False:
+            raise ValueError("crawl reads the live tree.  See setBackend()")
+            
+        if _ON_HBTEP_SERVER==True:
+            tree=_LOCAL_TREES.tree(shotno)
+            entries=self._crawlNodes(lambda expressions: _getManyLocal(tree,expressions),
+                                     fingerprints)
+        else:
+            with _activePool().connection(shotno) as mdsConn:
+                entries=self._crawlNodes(lambda expressions: _getMany(mdsConn,expressions),
+                                         fingerprints)
+            
+        with self._lock:
+            with self._connect() as db:
+                db.execute('DELETE FROM nodes WHERE shotno=?',(int(shotno),))
+                db.executemany('INSERT INTO nodes VALUES (?,?,?,?,?,?,?)',
+                               [(int(shotno),)+entry for entry in entries])
+            self._shots=None
+            self._paths={}
+        return len(entries)
+    
+    def _crawlNodes(self,getMany,fingerprints):
+        """ 
+        returns the (path, usage, dtype, length, digitizer, timebase) of 
+        every node.  getMany evaluates a list of TDI expressions (see 
+        _getMany)
+        """
+        results=getMany(['getnci("***","FULLPATH")',
+                         'getnci("***","USAGE")',
+                         'getnci("***","DTYPE")',
+                         'getnci("***","LENGTH")'])
+        for value in results:
+            if isinstance(value,Exception):
+                raise value
+        paths=[str(p).strip() for p in results[0]]
+        usage=[_MDS_USAGES[u] if u<len(_MDS_USAGES) else str(u) for u in results[1]]
+        dtype=[int(d) for d in results[2]]
+        length=[int(n) for n in results[3]]
+        n=len(paths)
+        
+        # digitizer of every signal, from its path or its record
+        signals=[i for i in range(0,n) if usage[i]=='SIGNAL' and length[i]>0]
+        digitizer=[_digitizer(p) for p in paths]
+        missing=[i for i in signals if digitizer[i]=='']
+        records=getMany(['decompile(getnci(%s,"RECORD"))'%paths[i] for i in missing])
+        for i,record in zip(missing,records):
+            if not isinstance(record,Exception):
+                digitizer[i]=_digitizer(str(record))
+        timebase=list(digitizer)
+        
+        if fingerprints==True:
+            expressions=[]
+            for i in signals:
+                expressions+=_timebaseFingerprintExpressions(paths[i])
+            values=getMany(expressions)
+            for j in range(0,len(signals)):
+                fingerprint=values[3*j:3*j+3]
+                if not any([isinstance(v,Exception) for v in fingerprint]):
+                    timebase[signals[j]]='%d %.9g %.9g'%(int(fingerprint[0]),
+                                                         float(fingerprint[1]),
+                                                         float(fingerprint[2]))
+        return [(paths[i],usage[i],dtype[i],length[i],digitizer[i],timebase[i]) 
+                for i in range(0,n)]
+    
+    def shots(self):
+        """ returns the crawled shot numbers """
+        shots=self._shots
+        if shots is None:
+            with self._connect() as db:
+                shots=[row[0] for row in db.execute('SELECT DISTINCT shotno FROM nodes ORDER BY shotno')]
+            self._shots=shots
+        return list(shots)
+        
+    def _catalogShot(self,shotno):
+        """ returns the crawled shot that describes shotno """
+        shots=self.shots()
+        if len(shots)==0:
+            raise ValueError("The catalog is empty.  See treeCatalog.crawl()")
+        if shotno is None:
+            return shots[-1]
+        earlier=[s for s in shots if s<=shotno]
+        if len(earlier)==0:
+            return shots[0]
+        return earlier[-1]
+    
+    def find(self,pattern='*',shotno=None,usage=None,hasData=None):
+        """
+        Returns the catalog entries whose path matches a pattern
+        
+        Parameters
+        ----------
+        pattern : str
+            node path with * and ? wildcards, e.g. 'MAGNETIC:*P'.  Patterns
+            that don't start with a backslash match the end of the path.
+        shotno : int
+            shot number.  default None uses the latest crawl
+        usage : str
+            optional.  e.g. 'SIGNAL'
+        hasData : bool
+            optional.  True (False) keeps only the nodes with (without) data
+            
+        Returns
+        -------
+        df : pandas.core.frame.DataFrame
+            one row per node, indexed by path
+        """
+        pattern=pattern.upper()
+        if not pattern.startswith('\\'):
+            pattern='*'+pattern
+        query='SELECT path, usage, dtype, length, digitizer, timebase FROM nodes WHERE shotno=? AND path GLOB ?'
+        args=[self._catalogShot(shotno),pattern]
+        if usage is not None:
+            query+=' AND usage=?'
+            args.append(usage.upper())
+        if hasData==True:
+            query+=' AND length>0'
+        elif hasData==False:
+            query+=' AND length=0'
+        with self._connect() as db:
+            rows=db.execute(query+' ORDER BY path',args).fetchall()
+        return _pd.DataFrame(rows,columns=['path','usage','dtype','length',
+                                           'digitizer','timebase']).set_index('path')
+        
+    def paths(self,pattern='*',shotno=None,hasData=True):
+        """ returns the list of node paths that match a pattern.  see find """
+        return list(self.find(pattern,shotno,hasData=hasData).index)
+    
+    def missing(self,dataAddress,shotno=None):
+        """
+        Returns the addresses that are not in the tree of a shot, according
+        to the catalog.  Only plain node paths (e.g. 
+        '\HBTEP2::TOP.SENSORS.ROGOWSKIS:IP') are checked; tags and TDI 
+        expressions are never reported.  An empty catalog reports nothing.
+        """
+        if type(dataAddress) is not list:
+            dataAddress=[dataAddress];
+        if len(self.shots())==0:
+            return []
+        catalogShot=self._catalogShot(shotno)
+        paths=self._paths.get(catalogShot)
+        if paths is None:
+            with self._connect() as db:
+                rows=db.execute('SELECT path FROM nodes WHERE shotno=?',(catalogShot,))
+                paths=set([_catalogPath(row[0]) for row in rows])
+            self._paths[catalogShot]=paths
+        missing=[]
+        for address in dataAddress:
+            path=_catalogPath(address)
+            if path is not None and path not in paths:
+                missing.append(address)
+        return missing
+    
+    
+def _catalogPath(address):
+    """ 
+    returns a node path in the form the catalog compares paths in (upper 
+    case, '.' for both children and members), or None if address is not a 
+    plain node path 
+    """
+    import re as _re
+    address=address.strip().upper()
+    if _re.match(r'^\\HBTEP2::TOP[\w.:]*$',address) is None:
+        return None
+    tree,_,path=address.partition('::')
+    return tree+'::'+path.replace(':','.')
+    
+    
+# the catalog that node addresses are checked against.  see setTreeCatalog
+_CATALOG = None
+
+def setTreeCatalog(catalog=None):
+    """
+    Selects the treeCatalog that mdsData and the sensor array loaders check 
+    node addresses against before contacting the server.  An address that 
+    the catalog doesn't have raises TreeNNF without a round trip.
+    
+    Parameters
+    ----------
+    catalog : treeCatalog
+        default None turns the check off
+        
+    Returns
+    -------
+    previous : treeCatalog
+        the catalog that was selected before
+        
+    Example
+    -------
+    ::
+        
+        catalog=treeCatalog()
+        catalog.crawl([90000,96000,100000])
+        setTreeCatalog(catalog)
+    """
+    global _CATALOG
+    previous=_CATALOG
+    _CATALOG=catalog
+    return previous
+    
+    
+def _checkCatalog(shotno,dataAddress,names=None):
+    """
+    Raises TreeNNF if the active catalog (see setTreeCatalog) doesn't have 
+    one of the addresses.  names optionally replaces the addresses in the 
+    error message (e.g. sensor names).  Only applies to the live tree.
+    """
+    if _CATALOG is None or _liveBackend()==False:
+        return
+    missing=_CATALOG.missing(dataAddress,shotno)
+    if len(missing)>0:
+        if names is not None:
+            missing=[str(names[dataAddress.index(address)]) for address in missing]
+        raise _TreeNNF("not in the tree catalog for shot %s: %s"%(shotno,', '.join(missing)))
+    
+    
+###############################################################################
+### asyncio interface
+
+# executor shared by the async functions.  its size bounds the number of 
+# fetches (and therefore remote connections) in flight at once
+_ASYNC_EXECUTOR = None
+_ASYNC_LOCK = _threading.Lock()
+
+def setAsyncWorkers(numWorkers=None):
+    """
+    Sets the number of fetches that the async functions run at once
+    
+    Parameters
+    ----------
+    numWorkers : int
+        number of worker threads.  default is _pref._MDS_POOL_SIZE if it 
+        exists, otherwise 4, i.e. one per pooled connection.
+    """
+    global _ASYNC_EXECUTOR
+    from concurrent.futures import ThreadPoolExecutor
+    if numWorkers is None:
+        numWorkers=getattr(_pref,'_MDS_POOL_SIZE',4)
+    with _ASYNC_LOCK:
+        old=_ASYNC_EXECUTOR
+        _ASYNC_EXECUTOR=ThreadPoolExecutor(max_workers=numWorkers)
+    if old is not None:
+        old.shutdown(wait=False)
+        
+        
+def _asyncExecutor():
+    """ returns the executor used by the async functions, creating it if needed """
+    if _ASYNC_EXECUTOR is None:
+        setAsyncWorkers()
+    return _ASYNC_EXECUTOR
+
+
+def _runAsync(func,*args,**kwargs):
+    """ 
+    Schedules func(*args,**kwargs) on the async executor and returns an
+    awaitable asyncio future 
+    """
+    import asyncio as _asyncio
+    from functools import partial
+    loop=_asyncio.get_event_loop()
+    return loop.run_in_executor(_asyncExecutor(),partial(func,*args,**kwargs))
+
+
+def mdsDataAsync(shotno=None,
+                 dataAddress=['\HBTEP2::TOP.DEVICES.SOUTH_RACK:CPCI_10:INPUT_94',
+                              '\HBTEP2::TOP.DEVICES.SOUTH_RACK:CPCI_10:INPUT_95'],
+                 tStart=[],tStop=[],**kwargs):
+    """
+    Async counterpart to mdsData.  Takes the same arguments and returns an 
+    awaitable that resolves to what mdsData returns.  
+    
+    The fetch runs on a bounded pool of worker threads (see 
+    setAsyncWorkers) that shares the active mdsConnectionPool, so many 
+    fetches can be gathered without opening more connections than the 
+    pool allows.
+    
+    Example
+    -------
+    ::
+        
+        import asyncio
+        async def main():
+            return await asyncio.gather(
+                mdsDataAsync(96530,['\HBTEP2::TOP.SENSORS.ROGOWSKIS:IP']),
+                mdsDataAsync(96530,['\HBTEP2::TOP.SENSORS.LOOP_VOlTAGE']))
+        (ip,t),(vl,t) = asyncio.get_event_loop().run_until_complete(main())
+    """
+    return _runAsync(mdsData,shotno,dataAddress,tStart,tStop,**kwargs)
+
+
+def loadAsync(loader,*args,**kwargs):
+    """
+    Async factory for the diagnostic classes and functions in this module.
+    Returns an awaitable that resolves to loader(*args,**kwargs).  Classes 
+    that load their data on first use (e.g. paData) are loaded before the 
+    awaitable resolves.
+    
+    Parameters
+    ----------
+    loader : class or function
+        e.g. ipData, nModeData, ipData_df
+    args, kwargs
+        passed on to loader
+    
+    Example
+    -------
+    ::
+        
+        import asyncio
+        async def dashboard(shotno):
+            return await asyncio.gather(loadAsync(ipData,shotno),
+                                        loadAsync(loopVoltageData,shotno),
+                                        loadAsync(nModeData,shotno),
+                                        loadAsync(sxrData,shotno))
+        ip,vl,nMode,sxr = asyncio.get_event_loop().run_until_complete(
+                              dashboard(96530))
+    """
+    return _runAsync(lambda: _loaded(loader(*args,**kwargs)))
+    
+    
+###############################################################################
+### data backends
+
+# MDSplus data type codes of the numpy types that the backends produce
+_MDS_DTYPES = {'u1':2, 'u2':3, 'u4':4, 'u8':5, 'i1':6, 'i2':7, 'i4':8, 'i8':9,
+               'f4':52, 'f8':53}
+_MDS_DTYPE_TEXT = 14
+
+def _mdsDtype(value):
+    """ returns the MDSplus data type code of a numpy array, number or str """
+    value=_np.asarray(value)
+    if value.dtype.kind in ['U','S']:
+        return _MDS_DTYPE_TEXT
+    return _MDS_DTYPES.get('%s%d'%(value.dtype.kind,value.dtype.itemsize),0)
+
+
+class dataBackend(_abc.ABC):
+    """
+    Base class of the sources of data that mdsData, probeNodes and 
+    latestShotNumber read from.  See setBackend.
+    
+    Subfunctions
+    ------------
+    getData :
+        returns the untrimmed data and time of a list of nodes
+    probeNodes :
+        same as the module function probeNodes
+    latestShotNumber :
+        same as the module function latestShotNumber
+    mdsData :
+        same as the module function mdsData.  Built on getData.
+        
+    Notes
+    -----
+    A new backend only needs to implement getData, probeNodes and 
+    latestShotNumber.  
+    """
+    @_abc.abstractmethod
+    def getData(self,shotno,dataAddress):
+        """
+        Returns
+        -------
+        data : list
+            untrimmed data of each node
+        time : numpy.ndarray or list
+            time of the first node.  empty list if the data is not an array
+        """
+        
+    @_abc.abstractmethod
+    def probeNodes(self,shotno,dataAddress,timeBase=True):
+        """ returns a DataFrame with the same columns as probeNodes """
+        
+    @_abc.abstractmethod
+    def latestShotNumber(self):
+        """ returns the most recent shot number """
+        
+    def mdsData(self,shotno,dataAddress,tStart=[],tStop=[],decimate=1,
+                decimateMode='stride',dtype=None,**kwargs):
+        if type(dataAddress) is not list:
+            dataAddress=[dataAddress];
+        data,time=self.getData(shotno,dataAddress)
+        data=_castData(data,dtype)
+        if isinstance(time,_np.ndarray):
+            time=_TIMEBASES.register(shotno,dataAddress[0],time)
+            if type(tStop)!=list:
+                time,data=_trimTime(time,data,tStart,tStop)
+            if decimate>1:
+                time,data=_decimate(time,data,decimate,decimateMode)
+            return data, time
+        return data
+    
+    
+class mdsplusBackend(dataBackend):
+    """
+    The live MDSplus tree, either local (on the HBT-EP server) or remote 
+    through the active mdsConnectionPool.  This is the default backend.
+    Its methods are the module functions of the same names.
+    """
+    def getData(self,shotno,dataAddress):
+        out=mdsData(shotno,dataAddress,decimate=1)
+        if type(out) is tuple:
+            return out
+        return out, []
+        
+    def probeNodes(self,shotno,dataAddress,timeBase=True):
+        return probeNodes(shotno,dataAddress,timeBase)
+        
+    def latestShotNumber(self):
+        return latestShotNumber()
+        
+    def mdsData(self,shotno,dataAddress,tStart=[],tStop=[],**kwargs):
+        return mdsData(shotno,dataAddress,tStart,tStop,**kwargs)
+        
+        
+class archiveBackend(dataBackend):
+    """
+    Reads shots from an on-disk archive instead of the server
+    
+    Parameters
+    ----------
+    directory : str
+        directory of the archive.  The archive has the same layout as the 
+        local shot cache, so a directory filled with enableShotCache() while 
+        connected to the server can be read back offline.
+        
+    Notes
+    -----
+    A node that is not in the archive raises MDSplus.TreeNODATA (or a 
+    stand-in if MDSplus is not installed), as a node without data does on 
+    the server.  The time of a request is the archived time base of its 
+    first node, or of any other node of the request if the first has none.
+    
+    Example
+    -------
+    ::
+        
+        # while connected
+        enableShotCache('~/hbtArchive')
+        ip=ipData(96530)
+        
+        # offline
+        setBackend(archiveBackend('~/hbtArchive'))
+        ip=ipData(96530)
+    """
+    def __init__(self,directory):
+        self.directory=_os.path.expanduser(directory)
+        self._files=shotCache(self.directory,maxSize=_np.inf)
+        
+    def _time(self,shotno,dataAddress):
+        for address in dataAddress:
+            time=self._files.read('hbtep2',shotno,'dim_of('+address+')')
+            if time is not None:
+                return time
+        return None
+        
+    def getData(self,shotno,dataAddress):
+        data=[]
+        for address in dataAddress:
+            value=self._files.read('hbtep2',shotno,address)
+            if value is None:
+                raise _TreeNODATA()
+            data.append(value)
+        time=[]
+        if isinstance(data[0],_np.ndarray):
+            time=self._time(shotno,dataAddress)
+            if time is None:
+                raise _TreeNODATA()
+        return data, time
+    
+    def probeNodes(self,shotno,dataAddress,timeBase=True):
+        if type(dataAddress) is not list:
+            dataAddress=[dataAddress];
+        n=len(dataAddress)
+        exists=_np.zeros(n,dtype=bool)
+        length=_np.zeros(n,dtype=int)
+        dtype=_np.zeros(n,dtype=int)
+        timeLength=-_np.ones(n,dtype=int)
+        for i in range(0,n):
+            value=self._files.read('hbtep2',shotno,dataAddress[i])
+            if value is None:
+                continue
+            exists[i]=True
+            length[i]=_np.asarray(value).nbytes
+            dtype[i]=_mdsDtype(value)
+            if timeBase==True and isinstance(value,_np.ndarray):
+                time=self._time(shotno,[dataAddress[i]])
+                if time is not None:
+                    timeLength[i]=len(time)
+        return _probeFrame(dataAddress,exists,length,dtype,timeLength)
+        
+    def latestShotNumber(self):
+        """ returns the largest shot number in the archive """
+        shotnos=[]
+        root=_os.path.join(self.directory,'hbtep2')
+        if _os.path.isdir(root):
+            shotnos=[int(name) for name in _os.listdir(root) if name.isdigit()]
+        if len(shotnos)==0:
+            raise ValueError("no shots archived in %s"%self.directory)
+        return max(shotnos)
+    
+    
+class syntheticBackend(dataBackend):
+    """
+    Generates realistic HBT-EP data without the server.  Every node exists 
+    and the same (shotno, node) always returns the same data, so loaders and
+    the mode analysis can be run and benchmarked offline.
+    
+    Parameters
+    ----------
+    latestShot : int
+        the latest shot number.  default is 100000
+    seed : int
+        changes every generated shot.  default is 0
+    dt : float
+        sample period in seconds.  default 2e-6 (i.e. 500 kHz)
+    tStart : float
+        first time sample in seconds.  default 0
+    tStop : float
+        last time sample in seconds.  default 16e-3
+    missing : list (of str)
+        node addresses that report no data
+        
+    Notes
+    -----
+    Each shot has a plasma current of 12-18 kA that lasts from about 1.5 ms
+    to 5-8 ms, and a rotating m/n=3/1 mode at 5-10 kHz.  The magnetic sensors 
+    (PA, FB and TA) see the equilibrium field plus the mode at their 
+    poloidal and toroidal locations.  SXR, loop voltage and metadata nodes
+    are also modelled.  Any other node returns a smooth, noisy waveform of 
+    the same length.
+    
+    Example
+    -------
+    ::
+        
+        setBackend(syntheticBackend())
+        mode=nModeData(100000)
+    """
+    def __init__(self,latestShot=100000,seed=0,dt=2e-6,tStart=0.,tStop=16e-3,
+                 missing=[]):
+        self.latestShot=latestShot
+        self.seed=seed
+        self.dt=dt
+        self.time=_np.arange(tStart,tStop+dt/2.,dt)
+        self.time.flags.writeable=False
+        self.missing=set([address.strip().upper() for address in missing])
+        
+    def _rng(self,shotno,key=''):
+        """ random number generator seeded by the shot and a key """
+        text=('%d %d %s'%(self.seed,shotno,key.strip().upper())).encode('utf-8')
+        return _np.random.RandomState(int(_hashlib.sha1(text).hexdigest()[:8],16))
+    
+    def _plasma(self,shotno):
+        """ returns the plasma current and the mode phase of a shot """
+        rng=self._rng(shotno)
+        tOn=rng.uniform(1.2e-3,1.8e-3)
+        tOff=rng.uniform(5e-3,8e-3)
+        ipMax=rng.uniform(12e3,18e3)
+        freq=rng.uniform(5e3,10e3)
+        t=self.time
+        
+        rise=_np.clip((t-tOn)/0.5e-3,0,1)
+        fall=_np.clip((tOff-t)/0.3e-3,0,1)
+        ip=ipMax*_np.sin(rise*_np.pi/2)**2*fall*(1-0.3*_np.clip((t-tOn)/(tOff-tOn),0,1))
+        phase=2*_np.pi*_np.cumsum(freq*(1+0.2*(t-tOn)/(tOff-tOn)))*self.dt+rng.uniform(0,2*_np.pi)
+        modeAmp=rng.uniform(0.01,0.04)*_np.clip((t-tOn-1e-3)/1e-3,0,1)
+        return ip,phase,modeAmp
+        
+    def _sensorAngles(self,name):
+        """ returns (theta, phi) in radians of a magnetic sensor, e.g. FB03_S2P """
+        fbPhi=[241,277,313,349,25,61,97,133,169,205]
+        fbTheta=[-83.4,-29.3,29.3,83.4]
+        array,sensor=name.split('_')
+        k=int(sensor[1:-1])
+        if array.startswith('PA'):
+            theta=-174.74778518+(k-1)*349.49557036/31.
+            phi=317.5 if array=='PA1' else 137.5
+        elif array.startswith('FB'):
+            theta=fbTheta[k-1]
+            phi=fbPhi[int(array[2:])-1]
+        else: # TA
+            theta=0.
+            phi=fbPhi[int(array[2:])-1]+0.5+(k-1)*9.
+        return theta*_np.pi/180., phi*_np.pi/180.
+    
+    def _signal(self,shotno,address):
+        """ returns the data of a node """
+        path=address.strip().upper()
+        name=path.split(':')[-1]
+        rng=self._rng(shotno,path)
+        t=self.time
+        n=len(t)
+        
+        if 'METADATA' in path:
+            return {'COMMENT':'synthetic shot %d'%shotno,
+                    'DATE':'01-JAN-2018 00:00:00.00',
+                    'OPERATOR':'synthetic',
+                    'POST_COMMENT':''}.get(name,'')
+        
+        ip,phase,modeAmp=self._plasma(shotno)
+        envelope=ip/15e3
+        if 'SENSORS.MAGNETIC' in path and (name[:2] in ['PA','FB','TA']):
+            theta,phi=self._sensorAngles(name)
+            bEq=4e-7*_np.pi*ip/(2*_np.pi*0.16)  # poloidal field at the wall
+            if name.endswith('R'):
+                return (0.05*bEq*_np.cos(theta)
+                        +bEq*modeAmp*_np.sin(3*theta-phi-phase)
+                        +rng.normal(0,1e-5,n))
+            return (bEq
+                    +bEq*modeAmp*_np.cos(3*theta-phi-phase)
+                    +rng.normal(0,1e-5,n))
+        if path.endswith('ROGOWSKIS:IP'):
+            return ip+rng.normal(0,20.,n)
+        if 'LOOP_VO' in path:
+            return 10.*envelope*_np.exp(-_np.clip(t-2e-3,0,None)/2e-3)+2.*envelope+rng.normal(0,0.05,n)
+        if 'SXR_FAN' in path:
+            channel=int(path[-2:]) if path[-2:].isdigit() else 8
+            profile=_np.exp(-((channel-8.5)/5.)**2)
+            return envelope*profile*(1+0.1*_np.cos(phase+channel*0.4))+rng.normal(0,1e-3,n)
+        
+        # anything else: a smooth waveform plus noise
+        amplitude=rng.uniform(0.1,10.)
+        return amplitude*(rng.uniform(-0.1,0.1)+envelope*_np.cos(2*_np.pi*rng.uniform(0,500)*t))+rng.normal(0,amplitude*1e-2,n)
+        
+    def getData(self,shotno,dataAddress):
+        data=[]
+        for address in dataAddress:
+            if address.strip().upper() in self.missing:
+                raise _TreeNODATA()
+            data.append(self._signal(shotno,address))
+        time=[]
+        if isinstance(data[0],_np.ndarray):
+            time=self.time
+        return data, time
+    
+    def probeNodes(self,shotno,dataAddress,timeBase=True):
+        if type(dataAddress) is not list:
+            dataAddress=[dataAddress];
+        n=len(dataAddress)
+        exists=_np.ones(n,dtype=bool)
+        length=_np.zeros(n,dtype=int)
+        dtype=_np.zeros(n,dtype=int)
+        timeLength=-_np.ones(n,dtype=int)
+        for i in range(0,n):
+            if dataAddress[i].strip().upper() in self.missing:
+                continue
+            if 'METADATA' in dataAddress[i].upper():
+                value=self._signal(shotno,dataAddress[i])
+                length[i]=len(value)
+                dtype[i]=_MDS_DTYPE_TEXT
+            else:
+                length[i]=len(self.time)*8
+                dtype[i]=_MDS_DTYPES['f8']
+                if timeBase==True:
+                    timeLength[i]=len(self.time)
+        return _probeFrame(dataAddress,exists,length,dtype,timeLength)
+    
+    def latestShotNumber(self):
+        return self.latestShot
     
     
-def latestShotNumber():
+_BACKEND = mdsplusBackend()
+
+def setBackend(backend=None):
     """
-    Gets the latest shot number from the tree
+    Selects where data is read from
     
     Parameters
     ----------
-    
+    backend : dataBackend
+        mdsplusBackend(), archiveBackend(directory), or syntheticBackend().
+        None selects the live MDSplus tree (the default).
+        
     Returns
     -------
-    shot_num : int
-        latest shot number
+    previous : dataBackend
+        the backend that was selected before
+        
+    Notes
+    -----
+    The shared time bases, cached trees and the remembered latest shot 
+    number belong to the previous backend, so they are cleared.
     """
-    conn = _mds.Connection(_pref._HBT_SERVER_ADDRESS+':8003');
-    shot_num = conn.get('current_shot("hbtep2")')
-    return int(shot_num)
+    global _BACKEND
+    if backend is None:
+        backend=mdsplusBackend()
+    previous=_BACKEND
+    _BACKEND=backend
+    _TIMEBASES.clear()
+    _LOCAL_TREES.clear()
+    with _LATEST_SHOT_LOCK:
+        _LATEST_SHOT['shotno']=None
+        _LATEST_SHOT['time']=0.
+    return previous
+    
+    
+def _liveBackend():
+    """ True if data is read from the live MDSplus tree """
+    return isinstance(_BACKEND,mdsplusBackend)
+    
+    
+###############################################################################
+### columnar export
+
+# loaders written by exportShots by default
+_EXPORT_DIAGNOSTICS = ['ipData_df','paData_df','fbData_df','taData_df',
+                       'nModeData_df','plasmaRadiusData_df']
 
+# names of the DataFrames returned by the *_df functions, by number returned
+_EXPORT_TABLES = {1:['data'], 2:['data','meta'], 3:['data','raw','meta']}
 
-def waitUntilLatestShotNumber(shotno,debug=False):
+def _exportTables(out):
+    """ 
+    returns {table name : DataFrame} from what a loader returned: a 
+    DataFrame, a tuple of DataFrames, or an object with df* attributes
     """
-    If the shotno that you are interested is the latest shotno,
-    this code checks to see if all of the data has finished recording.  
-    If not, the code pauses until it has.  Then it exits the code.
+    if isinstance(out,_pd.DataFrame):
+        out=(out,)
+    if type(out) is tuple:
+        return dict(zip(_EXPORT_TABLES[len(out)],out))
+    # lazy df* attributes are on the class until first accessed
+    names=set([name for name in dir(type(out)) if name.startswith('df')])
+    names.update([name for name in vars(out) if name.startswith('df')])
+    tables={}
+    for name in sorted(names):
+        value=getattr(out,name)
+        if isinstance(value,_pd.DataFrame):
+            tables[name[2].lower()+name[3:]]=value
+    return tables
+
+
+def _exportFileName(directory,diagnostic,table,shotno,fileFormat):
+    """ hive partitioned file name of one table of one shot """
+    return _os.path.join(directory,'diagnostic=%s'%diagnostic,'table=%s'%table,
+                         'shotno=%d'%shotno,'part-0.%s'%fileFormat)
+
+
+# schema metadata key that lists the complex columns split by _splitComplex
+_EXPORT_COMPLEX_KEY = b'hbtepLib.complexColumns'
+
+def _splitComplex(df):
+    """ 
+    Arrow has no complex type.  Returns (df, names) where each complex 
+    column of df (e.g. X1 of nModeData_df) is replaced, in place in the 
+    column order, by the float columns <name>_real and <name>_imag
+    """
+    names=[column for column in df.columns if df[column].dtype.kind=='c']
+    if len(names)==0:
+        return df,names
+    parts={}
+    for column in df.columns:
+        if column in names:
+            values=df[column].to_numpy()
+            parts[column+'_real']=values.real
+            parts[column+'_imag']=values.imag
+        else:
+            parts[column]=df[column]
+    return _pd.DataFrame(parts,index=df.index),names
+
+
+def _joinComplex(df,names):
+    """ undoes _splitComplex for the columns names (those that were read) """
+    parts={}
+    for column in df.columns:
+        if column.endswith('_real') and column[:-5] in names:
+            name=column[:-5]
+            parts[name]=df[column].to_numpy()+1j*df[name+'_imag'].to_numpy()
+        elif column.endswith('_imag') and column[:-5] in names:
+            continue
+        else:
+            parts[column]=df[column]
+    return _pd.DataFrame(parts,index=df.index)
+
+
+def _writeTable(df,fileName,fileFormat):
+    """ writes a DataFrame to a parquet or arrow (IPC) file.  Complex 
+    columns are split into real and imaginary parts (see _splitComplex) """
+    import pyarrow as _pa
+    import json as _json
+    df,complexNames=_splitComplex(df)
+    table=_pa.Table.from_pandas(df,preserve_index=True)
+    if len(complexNames)>0:
+        metadata=dict(table.schema.metadata or {})
+        metadata[_EXPORT_COMPLEX_KEY]=_json.dumps([str(n) for n in complexNames]).encode()
+        table=table.replace_schema_metadata(metadata)
+    directory=_os.path.dirname(fileName)
+    if not _os.path.isdir(directory):
+        try:
+            _os.makedirs(directory)
+        except OSError:
+            pass
+    tempName='%s.%d.%d.tmp'%(fileName,_os.getpid(),_threading.current_thread().ident)
+    if fileFormat=='parquet':
+        import pyarrow.parquet as _pq
+        _pq.write_table(table,tempName)
+    else:
+        with _pa.OSFile(tempName,'wb') as sink:
+            writer=_pa.ipc.new_file(sink,table.schema)
+            writer.write_table(table)
+            writer.close()
+    _os.rename(tempName,fileName)
     
-    This code is useful to include in anything where you want to make sure
-    you aren't trying to get data from a shot number that hasn't finished recording yet.
     
+def exportShots(shotno=[96530,96531],diagnostics=None,
+                directory='~/.hbtepLib/export',fileFormat='parquet',
+                overwrite=False,numWorkers=1,**kwargs):
+    """
+    Loads a list of diagnostics for a range of shots and writes their 
+    DataFrames to partitioned Parquet or Arrow IPC files
     
     Parameters
     ----------
-    shotno : int
-        shot number
-    debug : bool
-        default False.  
-        prints text to screen to help with debugging.  
-    """
-
-    latestShotno=latestShotNumber()
-    if debug==True:
-        print("latest shot number : %d"%latestShotno)
-        print("shot number in question : %d"%shotno)
-    
-    # if you haven't made it to the latest number yet
-    if shotno<latestShotno:
-        return
-    
-    # if you are trying to access a number that hasn't even been created yet
-    elif shotno>latestShotno:
-        print("This shot number hasn't even been created yet.  Waiting...")
-        stop=True
-        while(stop==True):
-            if shotno==latestShotNumber():
-                stop=False
-            else:
-                pass
-    
-            _time.sleep(2)
+    shotno : list (of int)
+        shot numbers, e.g. range(96500,96600)
+    diagnostics : list
+        loaders to export, as functions/classes or their names.  default is
+        _EXPORT_DIAGNOSTICS.  A class is exported through its df* 
+        attributes (e.g. dfData, dfMeta)
+    directory : str
+        root directory of the export
+    fileFormat : str
+        'parquet' (default) or 'arrow' (Arrow IPC file)
+    overwrite : bool
+        default False.  shots that were already exported are skipped, so an
+        interrupted export can simply be run again
+    numWorkers : int
+        default 1.  number of shots loaded at once
+    kwargs :
+        passed on to every loader, e.g. tStart, tStop
         
-    # if you are trying to access a number that has been created but not finished        
-#    if shotno==latestShotno:
-#    print("shotno==latestShotno")
-    stop=False
-    try:
-        mdsData(shotno,dataAddress=['\HBTEP2::TOP.DEVICES.WEST_RACK:CPCI:INPUT_96'],
-                    tStart=[],tStop=[])
-    except _mds.TreeNODATA:
-        stop=True
-        print("Shot number has not finished.  Waiting...")
+    Returns
+    -------
+    errors : dict
+        {(shotno, diagnostic) : exception} for the loads that failed
         
-    while(stop==True):
+    Notes
+    -----
+    The files are laid out as 
+    directory/diagnostic=<name>/table=<data|raw|meta>/shotno=<shotno>/part-0.<fileFormat>
+    which any hive partition aware reader (pyarrow.dataset, Spark, DuckDB) 
+    can scan, using the shot number (or the diagnostic) to skip files.  
+    The DataFrame index (e.g. Time) is stored as a column.  Arrow has no 
+    complex type, so complex columns (e.g. X1 of nModeData_df) are stored 
+    as <name>_real and <name>_imag.  readExport joins them back together.
+    
+    Requires pyarrow.
+    
+    Example
+    -------
+    ::
         
-        _time.sleep(2)
-        try:
-            mdsData(shotno,
-                        dataAddress=['\HBTEP2::TOP.DEVICES.WEST_RACK:CPCI:INPUT_96'],
-                        tStart=[],tStop=[])
-            stop=False
-            _time.sleep(1)
-        except _mds.TreeNODATA:
-            pass
+        errors=exportShots(range(96500,96600),['ipData_df','fbData_df'],
+                           directory='~/hbtExport',numWorkers=4)
+    """
+    import concurrent.futures as _futures
+    import pyarrow as _pa  # fail now (not per shot) if it is missing
+    if fileFormat not in ['parquet','arrow']:
+        raise ValueError("fileFormat must be 'parquet' or 'arrow'")
+    if diagnostics is None:
+        diagnostics=_EXPORT_DIAGNOSTICS
+    directory=_os.path.expanduser(directory)
+    loaders=[]
+    for diagnostic in diagnostics:
+        if callable(diagnostic):
+            loaders.append((diagnostic.__name__,diagnostic))
+        else:
+            loaders.append((diagnostic,globals()[diagnostic]))
+    errors={}
+    
+    def exportShot(shot):
+        for name,loader in loaders:
+            marker=_os.path.join(directory,'diagnostic=%s'%name,'.shotno=%d'%shot)
+            if overwrite==False and _os.path.exists(marker):
+                continue
+            try:
+                tables=_exportTables(loader(shot,**kwargs))
+                for table,df in tables.items():
+                    _writeTable(df,_exportFileName(directory,name,table,shot,fileFormat),
+                                fileFormat)
+                open(marker,'w').close()
+            except Exception as error:
+                print("shot %d, %s failed: %s"%(shot,name,error))
+                errors[(shot,name)]=error
                 
-    return
+    shotnos=[int(s) for s in shotno]
+    if numWorkers>1:
+        with _futures.ThreadPoolExecutor(max_workers=numWorkers) as executor:
+            list(executor.map(exportShot,shotnos))
+    else:
+        for shot in shotnos:
+            exportShot(shot)
+    return errors
 
-        
-def mdsData(shotno=None,
-            dataAddress=['\HBTEP2::TOP.DEVICES.SOUTH_RACK:CPCI_10:INPUT_94',
-                         '\HBTEP2::TOP.DEVICES.SOUTH_RACK:CPCI_10:INPUT_95'],
-            tStart=[],tStop=[]):
+
+def readExport(directory='~/.hbtepLib/export',diagnostic='ipData_df',
+               table='data',shotno=None,columns=None,fileFormat='parquet'):
     """
-    Get data and optionally associated time from MDSplus tree
+    Reads an export made by exportShots
     
     Parameters
     ----------
-    shotno : int
-        shotno of data.  this function will establish its own mdsConn of this 
-        shotno
-    dataAddress : list (of strings)
-        address of desired data on MDSplus tree
-    tStart : float
-        trims data before this time
-    tStop : float
-        trims data after this time
-    
+    directory : str
+        root directory of the export
+    diagnostic : str
+        name of the loader, e.g. 'fbData_df'
+    table : str
+        'data', 'raw' or 'meta'
+    shotno : list (of int)
+        optional.  only these shots are read.  the other files are skipped
+    columns : list (of str)
+        optional.  only these columns are read
+    fileFormat : str
+        'parquet' (default) or 'arrow'
+        
     Returns
     -------
-    data : list (of numpy.ndarray)
-        requested data
-    time : numpy.ndarray
-        time associated with data array
-    """            
-        
-    # convert dataAddress to a list if it not one originally 
-    if type(dataAddress) is not list:
-        dataAddress=[dataAddress];
-        
-#    # if shotno == -1, use the latest shot number
-#    if shotno==-1:
-#        shotno=latestShotNumber()
-        
-    # init arrays
-    time = []
-    data = []
-        
-    # check if computer is located locally or remotely.  The way it connects to spitzer remotely can only use one method, but locally, either method can be used.  
-    if _ON_HBTEP_SERVER==True: # if operating local to the tree
-        # converted from Ian's code
-        
-        tree = _mds.Tree('hbtep2', shotno)  
-        for i in range(0,len(dataAddress)):
+    df : pandas.core.frame.DataFrame
+        the tables of every shot, with a shotno column.  Complex columns 
+        (stored as <name>_real and <name>_imag) are joined back together
+    """
+    import pyarrow.dataset as _ds
+    import json as _json
+    path=_os.path.join(_os.path.expanduser(directory),'diagnostic=%s'%diagnostic,
+                       'table=%s'%table)
+    dataset=_ds.dataset(path,format='parquet' if fileFormat=='parquet' else 'ipc',
+                        partitioning='hive')
+    complexNames=_json.loads((dataset.schema.metadata or {}).get(_EXPORT_COMPLEX_KEY,b'[]'))
+    where=None
+    if shotno is not None:
+        where=_ds.field('shotno').isin([int(s) for s in shotno])
+    if columns is not None:
+        stored=[]
+        for column in columns:
+            if column in complexNames:
+                stored+=[column+'_real',column+'_imag']
+            else:
+                stored.append(column)
+        columns=stored+['shotno']
+    df=dataset.to_table(columns=columns,filter=where).to_pandas()
+    return _joinComplex(df,complexNames)
 
-            node = tree.getNode(dataAddress[i])            #Get the proper node    
-            data.append(node.data())                      #Get the data from this node 
-        if type(data[0]) is _np.ndarray: # if node is an array, return data and time
-            time = node.dim_of().data()        
 
-    
-    else: # operaeting remotely
-    
-        # if shotno is specified, this function gets its own mdsConn
-        if type(shotno) is float or type(shotno) is int or type(shotno) is _np.int64:
-            mdsConn=_initRemoteMDSConnection(shotno);
+###############################################################################
+### background prefetch
 
-        for i in range(0,len(dataAddress)):
-            data.append(mdsConn.get(dataAddress[i]).data())
-        
-        # if data is an array, also get time
-        if type(data[0]) is _np.ndarray:
+# diagnostics that shotPrefetcher loads by default
+_PREFETCH_DIAGNOSTICS = ['ipData','loopVoltageData','paData','fbData','taData',
+                         'sxrData']
+
+class shotPrefetcher:
+    """
+    Background thread that watches for new shots and loads a list of 
+    diagnostics as soon as each shot has finished recording.  The data lands
+    in the local shot cache, so loading the same diagnostics afterwards 
+    doesn't touch the server.
     
-            time = mdsConn.get('dim_of('+dataAddress[0]+')').data();  # time assocated with data
-            
-        mdsConn.closeTree('hbtep2', shotno)
-        mdsConn.disconnect()
- 
-    if time != [] and type(tStop)!=list:
-        # trim time and data
-        time,data= _trimTime(time,data,tStart,tStop)
+    Parameters
+    ----------
+    diagnostics : list
+        loaders to run on every new shot, either functions/classes of this 
+        module or their names.  default is _PREFETCH_DIAGNOSTICS
+    numWorkers : int
+        number of diagnostics loaded at once.  default is 4
+    pollInterval : float
+        seconds between checks for a new shot.  default is 2
+    callback : function
+        optional.  called with the shot number after each shot is prefetched
         
-    if time != []:
-        return data, time
-    else: 
-        return data
-    
+    Attributes
+    ----------
+    shots : list
+        shot numbers that have been prefetched
+    errors : dict
+        {shotno : {diagnostic name : exception}} for diagnostics that failed
+    lastShot : int
+        the last shot that was prefetched (or skipped)
+        
+    Subfunctions
+    ------------
+    start :
+        starts watching for new shots, beginning with the latest shot
+    stop :
+        stops watching
+    prefetch :
+        loads the diagnostics of one shot now
+        
+    Notes
+    -----
+    The shot cache must be enabled first (see enableShotCache).  
     
+    Example
+    -------
+    ::
+        
+        enableShotCache()
+        prefetcher=shotPrefetcher(['ipData','fbData','sxrData'])
+        prefetcher.start()
+        ...
+        fb=fbData(-1)  # read from the local cache
+    """
+    def __init__(self,diagnostics=None,numWorkers=4,pollInterval=2.,
+                 callback=None):
+        if diagnostics is None:
+            diagnostics=_PREFETCH_DIAGNOSTICS
+        self.diagnostics=list(diagnostics)
+        self.numWorkers=numWorkers
+        self.pollInterval=pollInterval
+        self.callback=callback
+        self.shots=[]
+        self.errors={}
+        self.lastShot=None
+        self._stop=_threading.Event()
+        self._thread=None
+        
+    def _loader(self,diagnostic):
+        """ returns (name, loader) of a diagnostic """
+        if callable(diagnostic):
+            return diagnostic.__name__,diagnostic
+        return diagnostic,globals()[diagnostic]
+    
+    def prefetch(self,shotno):
+        """
+        Loads every diagnostic of a shot into the shot cache
+        
+        Returns
+        -------
+        errors : dict
+            {diagnostic name : exception} of the diagnostics that failed
+        """
+        import concurrent.futures as _futures
+        if _SHOT_CACHE is None:
+            raise RuntimeError("The shot cache is not enabled.  See enableShotCache()")
+        loaders=[self._loader(diagnostic) for diagnostic in self.diagnostics]
+        errors={}
+        with _futures.ThreadPoolExecutor(max_workers=self.numWorkers) as executor:
+            futures=[executor.submit(lambda loader: _loaded(loader(shotno)),loader) 
+                     for name,loader in loaders]
+            for (name,loader),future in zip(loaders,futures):
+                try:
+                    future.result()
+                except Exception as error:
+                    errors[name]=error
+        if len(errors)>0:
+            self.errors[shotno]=errors
+        self.shots.append(shotno)
+        return errors
+    
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                latestShotno=latestShotNumber()
+                if self.lastShot is None:
+                    self.lastShot=latestShotno-1
+                for shotno in range(self.lastShot+1,latestShotno+1):
+                    if shotno==latestShotno and _shotDoneNodeLength(shotno)==0:
+                        # still recording.  try again on the next poll
+                        break
+                    self.prefetch(shotno)
+                    self.lastShot=shotno
+                    if self.callback is not None:
+                        self.callback(shotno)
+                    if self._stop.is_set():
+                        break
+            except Exception as error:
+                print("shotPrefetcher: %s"%error)
+            self._stop.wait(self.pollInterval)
+            
+    def start(self):
+        """ starts watching for new shots in a background thread """
+        if _SHOT_CACHE is None:
+            raise RuntimeError("The shot cache is not enabled.  See enableShotCache()")
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread=_threading.Thread(target=self._run,name='shotPrefetcher')
+        self._thread.daemon=True
+        self._thread.start()
+        
+    def stop(self,wait=True):
+        """ stops watching for new shots """
+        self._stop.set()
+        if wait==True and self._thread is not None:
+            self._thread.join()
+            
+            
 ###############################################################################
 ### get device specific data
     
@@ -446,15 +4061,15 @@ class ipData:
             
         if paIntegrate==True:
             # integrate PA1 sensor data to get IP
-            dfPA=paData(shotno,tStart,tStop).dfDataRaw
-            dfPA=dfPA.drop(columns=['PA2_S27P','PA2_S14P','PA1_S16P'])
-            dfPA1=dfPA.iloc[:,dfPA.columns.str.contains('PA1')]
-            dfPA2=dfPA.iloc[:,dfPA.columns.str.contains('PA2')]
+            raw=paData(shotno,tStart,tStop).raw
+            raw=raw.drop(['PA2_S27P','PA2_S14P','PA1_S16P'])
+            pa1=raw.group('PA1').data
+            pa2=raw.group('PA2').data
             
             mu0=4*_np.pi*1e-7
             minorRadius=0.16
-            self.ipPA1Integration=_np.array(dfPA1.sum(axis=1)*1.0/dfPA1.shape[1]*2*_np.pi*minorRadius/mu0)
-            self.ipPA2Integration=_np.array(dfPA2.sum(axis=1)*1.0/dfPA2.shape[1]*2*_np.pi*minorRadius/mu0)
+            self.ipPA1Integration=pa1.sum(axis=0)*1.0/pa1.shape[0]*2*_np.pi*minorRadius/mu0
+            self.ipPA2Integration=pa2.sum(axis=0)*1.0/pa2.shape[0]*2*_np.pi*minorRadius/mu0
 
 
         
@@ -585,20 +4200,18 @@ def ipData_df(    shotno=96530,
     ip=data[0];
     time=time;
     
-    dfData=_pd.DataFrame(index=time)
-    dfData['ip']=ip*1.0
+    dfData=_timeFrame([ip],time,['ip'],indexName=None)
     
 #     dfData.plot()
     
     if paIntegrate==True:
         # integrate PA1 sensor data to get IP
-        dfPA=paData(shotno,tStart,tStop).dfDataRaw
         key='PA1'
-        dfPA=dfPA.iloc[:,dfPA.columns.str.contains(key)]
+        pa=paData(shotno,tStart,tStop).raw.group(key).data
         
         mu0=4*_np.pi*1e-7
         minorRadius=0.16
-        ipPAIntegration=_np.array(dfPA.sum(axis=1)*1.0/dfPA.shape[1]*2*_np.pi*minorRadius/mu0)
+        ipPAIntegration=pa.sum(axis=0)*1.0/pa.shape[0]*2*_np.pi*minorRadius/mu0
         dfData['ip%s'%key]=ipPAIntegration
 
     
@@ -1407,16 +5020,17 @@ class tpData:
         if shotno > 95000: # Shotno after 2017 summer upgrade = 97239.  TPS2 was moved to section 5.  Now, it's TPS5.
             if probes=='both' or probes=='tps5' or probes=='tps2':
                 
-                # get data   
-                try:         
+                # get data.  fall back to the S2 nodes if the S5 nodes are empty
+                s5Address=['\HBTEP2::TOP.SENSORS.TRI_PROBE_S5.V_ION',
+                           '\HBTEP2::TOP.SENSORS.TRI_PROBE_S5.V_ELEC',
+                           '\HBTEP2::TOP.SENSORS.TRI_PROBE_S5.V_FLOAT',
+                           '\HBTEP2::TOP.SENSORS.TRI_PROBE_S5.I_SAT']
+                if probeNodes(shotno,s5Address,timeBase=False)['hasData'].all():
                     data, time=mdsData(shotno=shotno,
                                   # TODO these addresses need to be updated to section 5 in the tree before they can be updated here
-                                  dataAddress=['\HBTEP2::TOP.SENSORS.TRI_PROBE_S5.V_ION',
-                                               '\HBTEP2::TOP.SENSORS.TRI_PROBE_S5.V_ELEC',
-                                               '\HBTEP2::TOP.SENSORS.TRI_PROBE_S5.V_FLOAT',
-                                               '\HBTEP2::TOP.SENSORS.TRI_PROBE_S5.I_SAT'],
+                                  dataAddress=s5Address,
                                   tStart=tStart, tStop=tStop)
-                except:
+                else:
                     data, time=mdsData(shotno=shotno,
                                   # TODO these addresses need to be updated to section 5 in the tree before they can be updated here
                                   dataAddress=['\HBTEP2::TOP.SENSORS.TRI_PROBE_S2.V_ION',
@@ -1574,29 +5188,707 @@ class tpData:
                         yLegendLabel='TPS8')
         return p1
         
-    def plotOfISat(self):            
-        # initialize ion sat current
-        p1=_plot.plot(yLabel='A',xLabel='time [ms]',
-                      subtitle='Ion Sat. Current',shotno=[self.shotno]);
-        if self.probes=='both' or self.probes=='tps5':
-            p1.addTrace(yData=self.tps5Current,xData=self.tps5Time*1000,
-                        yLegendLabel='TPS5')
-        if self.probes=='both' or self.probes=='tps8':
-            p1.addTrace(yData=self.tps8Current,xData=self.tps8Time*1000,
-                        yLegendLabel='TPS8')   
-        return p1
-            
-    def plot(self,plotAll=False):
-        if plotAll == False:
-            _plot.subPlot([self.plotOfKTe(),self.plotOfNe(),self.plotOfVf()]);
-        else:
-            _plot.subPlot([self.plotOfKTe(),self.plotOfNe(),self.plotOfVf()]);
-#            _plot.subPlot([self.plotOfTipA(),self.plotOfTipB(),self.plotOfTipC(),
-#                         self.plotOfISat()]);          
-            _plot.subPlot([self.plotOfTipB(),self.plotOfTipC(),
-                         self.plotOfISat()]);              
-  
+    def plotOfISat(self):            
+        # initialize ion sat current
+        p1=_plot.plot(yLabel='A',xLabel='time [ms]',
+                      subtitle='Ion Sat. Current',shotno=[self.shotno]);
+        if self.probes=='both' or self.probes=='tps5':
+            p1.addTrace(yData=self.tps5Current,xData=self.tps5Time*1000,
+                        yLegendLabel='TPS5')
+        if self.probes=='both' or self.probes=='tps8':
+            p1.addTrace(yData=self.tps8Current,xData=self.tps8Time*1000,
+                        yLegendLabel='TPS8')   
+        return p1
+            
+    def plot(self,plotAll=False):
+        if plotAll == False:
+            _plot.subPlot([self.plotOfKTe(),self.plotOfNe(),self.plotOfVf()]);
+        else:
+            _plot.subPlot([self.plotOfKTe(),self.plotOfNe(),self.plotOfVf()]);
+#            _plot.subPlot([self.plotOfTipA(),self.plotOfTipB(),self.plotOfTipC(),
+#                         self.plotOfISat()]);          
+            _plot.subPlot([self.plotOfTipB(),self.plotOfTipC(),
+                         self.plotOfISat()]);
+
+
+###############################################################################
+### magnetic sensor arrays
+
+class _lazyProperty(object):
+    """
+    Decorator for a method (without arguments) that computes an attribute 
+    the first time it is accessed.  The result is stored on the instance, 
+    so later accesses are plain attribute lookups and can be reassigned.
+    
+    Example
+    -------
+    ::
+        
+        class fbData:
+            @_lazyProperty
+            def raw(self):
+                return _loadSensorArray(...)  # downloaded on first use only
+    """
+    def __init__(self,func):
+        self.func=func
+        self.__name__=func.__name__
+        self.__doc__=func.__doc__
+        
+    def __get__(self,obj,cls=None):
+        if obj is None:
+            return self
+        value=self.func(obj)
+        obj.__dict__[self.__name__]=value
+        return value
+    
+    
+class _lazyRows(object):
+    """
+    Read-only list of n items.  Item i is computed by func(owner,i) the 
+    first time it is accessed.  func is handed the owner instead of closing 
+    over it, so that a deep copy of the owner computes its rows from the 
+    copy's data
+    """
+    def __init__(self,owner,func,n):
+        self._owner=owner
+        self._func=func
+        self._n=n
+        self._items={} # computed items, by index
+        
+    def __len__(self):
+        return self._n
+        
+    def __getitem__(self,i):
+        if isinstance(i,slice):
+            return [self[j] for j in range(len(self))[i]]
+        i=range(len(self))[i]
+        if i not in self._items:
+            self._items[i]=self._func(self._owner,i)
+        return self._items[i]
+    
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+            
+    def __repr__(self):
+        return repr(list(self))
+    
+    
+def _loaded(out):
+    """ 
+    Calls out.load() if out has one (i.e. it loads its data on first use), 
+    so that the data is downloaded now.  Returns out.  Used where a loader 
+    runs in the background (see _runParallel, loadAsync, shotPrefetcher) 
+    """
+    load=getattr(out,'load',None)
+    if callable(load):
+        load()
+    return out
+    
+    
+def _stackRows(rows,dtype=None,out=None):
+    """ Copies a list of equal length 1D arrays into a new (rows x samples)
+    matrix, or into out if it is given """
+    if dtype is None:
+        dtype=rows[0].dtype if len(rows)>0 else _np.float64
+    if out is None:
+        out=_np.empty((len(rows),len(rows[0]) if len(rows)>0 else 0),dtype=dtype)
+    for i in range(0,len(rows)):
+        out[i]=rows[i]
+    return out
+
+
+def _timeFrame(data,time,columns,indexName='Time'):
+    """
+    (time x channels) DataFrame of channel data, indexed by time.  A 2D 
+    array is wrapped as is, so the DataFrame shares its memory with data 
+    and building it only costs the index and column labels
+    
+    Parameters
+    ----------
+    data : numpy.ndarray or list (of numpy.ndarray)
+        2D (channels x time) array, or one 1D array per channel, which are 
+        copied once into a new matrix (see _stackRows)
+    time : numpy.ndarray
+        time.  becomes the index (not a column)
+    columns : list (of str)
+        channel names
+    indexName : str
+        name of the index.  default is 'Time'
+    """
+    if not (isinstance(data,_np.ndarray) and data.ndim==2):
+        data=_stackRows([_np.asarray(row) for row in data])
+    return _pd.DataFrame(data.transpose(),
+                         index=_pd.Index(time,name=indexName),
+                         columns=list(columns),
+                         copy=False)
+
+
+class sensorArray:
+    """
+    Data of an array of sensors that share a time base, held as a single
+    contiguous (sensors x time) matrix
+
+    Parameters
+    ----------
+    data : numpy.ndarray or list (of numpy.ndarray)
+        2D (sensors x time) array, which is used as is, or one 1D array per
+        sensor, which are copied into a new matrix
+    time : numpy.ndarray
+        time shared by all sensors
+    meta : pandas.DataFrame
+        one row per sensor (in the same order as data), indexed by sensor
+        name.  The magnetic arrays have the columns Phi, Theta (radians),
+        Address and SectionNum.  See _registryMeta
+
+    Attributes
+    ----------
+    data : numpy.ndarray
+        (sensors x time) matrix
+    time : numpy.ndarray
+        time
+    meta : pandas.DataFrame
+        sensor metadata
+    names : list (of str)
+        sensor names, in the order of the rows of data
+
+    Subfunctions
+    ------------
+    __getitem__ :
+        data of a single sensor (by name or row index).  A view, not a copy
+    rows :
+        list of the data of several (default all) sensors.  Views
+    select :
+        a new sensorArray with only the given sensors
+    group :
+        a new sensorArray with only the sensors of a group of the registry
+        (e.g. 'PA1' or 'FB_S4P', see _SENSORS) 
+    drop :
+        a new sensorArray without the given sensors
+    like :
+        a new sensorArray with the same sensors and time but other data
+    toDataFrame :
+        (time x sensors) DataFrame that shares its memory with data
+
+    Notes
+    -----
+    The rows returned by __getitem__ and rows(), and the columns of
+    toDataFrame(), all point at the same matrix.  Modifying one modifies the
+    others.  Use .copy() on them where that is not wanted.
+
+    Example
+    -------
+    ::
+
+        pa=paData(96530)
+        pa.data['PA1_S01P']          # one sensor
+        pa.data.select(['PA1_S01P','PA1_S02P']).toDataFrame()
+        pa.data.group('PA2').data   # (sensors x time) matrix of PA2
+    """
+    def __init__(self,data,time,meta):
+        if isinstance(data,_np.ndarray) and data.ndim==2:
+            self.data=data
+        else:
+            self.data=_stackRows(data)
+        self.time=time
+        self.meta=meta
+        if self.data.shape[0]!=len(meta):
+            raise ValueError('data has %d sensors but meta has %d' % (self.data.shape[0],len(meta)))
+
+    @property
+    def names(self):
+        return list(self.meta.index)
+
+    def __len__(self):
+        return self.data.shape[0]
+
+    def __repr__(self):
+        return 'sensorArray(%d sensors x %d samples, %s)' % (self.data.shape[0],self.data.shape[1],self.data.dtype)
+
+    def _index(self,name):
+        return self.meta.index.get_loc(name)
+
+    def __getitem__(self,key):
+        if not isinstance(key,(int,_np.integer)):
+            key=self._index(key)
+        return self.data[key]
+
+    def rows(self,names=None):
+        if names is None:
+            return [self.data[i] for i in range(0,len(self))]
+        return [self[name] for name in names]
+
+    def _selectRows(self,i):
+        if len(i)>0 and _np.all(_np.diff(i)==1):
+            # a contiguous block of rows is a view
+            data=self.data[i[0]:i[-1]+1]
+        else:
+            data=self.data[i]
+        return sensorArray(data,self.time,self.meta.iloc[i])
+
+    def select(self,names):
+        return self._selectRows(_np.array([self._index(name) for name in names],dtype=int))
+
+    def group(self,group):
+        # sensors of the group that are in this array (bad sensors may have 
+        # been dropped), in the order of this array
+        i=self.meta.index.get_indexer(_sensorGroup(group))
+        return self._selectRows(_np.sort(i[i>=0]))
+
+    def drop(self,names):
+        return self.select([name for name in self.meta.index if name not in names])
+
+    def like(self,data):
+        return sensorArray(data,self.time,self.meta)
+
+    def toDataFrame(self,suffix='',indexName='Time'):
+        return _timeFrame(self.data,self.time,
+                          [name+suffix for name in self.meta.index],indexName)
+
+
+def _buildSensorRegistry():
+    """
+    Builds the sensor registry (see _SENSORS).  The only place where the 
+    names, locations and addresses of the magnetic and SOL sensors are 
+    written out
+    """
+    magRoot='\HBTEP2::TOP.SENSORS.MAGNETIC:'
+    solRoot='\HBTEP2::TOP.SENSORS.SOL:'
+    rows=[]
+    
+    # PA1 (section 3) and PA2 (section 8).  32 poloidal sensors each
+    paTheta=[-174.74778518, -164.23392461, -153.66901098, -143.01895411,       -132.24974382, -121.3277924 , -110.22067715,  -98.93591492,        -87.23999699,  -75.60839722,  -63.97679673,  -52.34519359,        -40.71359604,  -29.08199717,  -17.45039318,   -5.81879416,          5.81280487,   17.44440438,   29.07600466,   40.70760263,         52.33920936,   63.97080017,   75.60240749,   87.23400093,         98.93591492,  110.22067715,  121.3277924 ,  132.24974382,        143.01895411,  153.66901098,  164.23392461,  174.74778518]
+    for j,phi,section in [(1,317.5,3),(2,137.5,8)]:
+        for i in range(0,32):
+            name='PA%d_S%.2dP' % (j,i+1)
+            rows.append((name,'PA%d'%j,'P',section,i+1,phi,paTheta[i],magRoot+name))
+            
+    # FB.  poloidal and radial sensors of 4 rows (S1 at the bottom to S4 at 
+    # the top) in each of the 10 sections
+    fbPhi=[241,277,313,349,25,61, 97,133,169,205]
+    fbTheta=[-83.4,-29.3,29.3,83.4]
+    for kind in ['P','R']:
+        for i in range(0,4):
+            for j in range(0,10):
+                name='FB%.2d_S%d%s' % (j+1,i+1,kind)
+                rows.append((name,'FB',kind,j+1,i+1,fbPhi[j],fbTheta[i],magRoot+name))
+                
+    # TA.  3 poloidal sensors in each of the 10 sections and a radial 
+    # sensor at the center one
+    taPhi=[241.5,250.5,259.5,277.5,286.5,295.5,313.5,322.5,331.5,349.5,358.5,7.5,25.5,34.5,43.5,61.5,70.5,79.5,97.5,106.5,115.5,133.5,142.5,151.5,169.5,178.5,187.5,205.5,214.5,223.5]
+    for j in range(0,10):
+        for i in range(0,3):
+            name='TA%.2d_S%dP' % (j+1,i+1)
+            rows.append((name,'TA','P',j+1,i+1,taPhi[3*j+i],189-360,magRoot+name))
+    for j in range(0,10):
+        name='TA%.2d_S2R' % (j+1)
+        rows.append((name,'TA','R',j+1,2,taPhi[3*j+1],189-360,magRoot+name))
+        
+    # SOL tiles in sections 1, 4 and 8
+    solTheta=[-70. , -50. , -30. , -10. ,  10. ,  30. ,  50. ,  70.]
+    for section,phi,theta in [(1,234.8,solTheta),(4,342.8,[-83. , -28.2,  28.2,  83.]),(8,126.8,solTheta)]:
+        for i in range(0,len(theta)):
+            name='LFS%.2d_S%d' % (section,i+1)
+            rows.append((name,'SOL','',section,i+1,phi,theta[i],solRoot+name))
+            
+    registry=_np.array(rows,dtype=[('name','U16'),('array','U4'),('kind','U1'),
+                                   ('section','i8'),('sensorNum','i8'),
+                                   ('phi','f8'),('theta','f8'),('address','U64')])
+    registry['phi']*=_np.pi/180.
+    registry['theta']*=_np.pi/180.
+    registry.flags.writeable=False
+    
+    # index groups
+    groups={}
+    def add(key,mask):
+        i=_np.flatnonzero(mask)
+        i.flags.writeable=False
+        groups[key]=i
+    pol=registry['kind']=='P'
+    add('PA',(registry['array']=='PA1')|(registry['array']=='PA2'))
+    for key in ['PA1','PA2','SOL']:
+        add(key,registry['array']==key)
+    for key in ['FB','TA']:
+        isArray=registry['array']==key
+        add(key,isArray&pol)
+        add(key+'_R',isArray&~pol)
+        for i in range(1,5):
+            for kind in ['P','R']:
+                mask=isArray&(registry['kind']==kind)&(registry['sensorNum']==i)
+                if mask.any():
+                    add('%s_S%d%s'%(key,i,kind),mask)
+    for section in range(1,11):
+        add('SECTION%.2d'%section,registry['section']==section)
+        add('LFS%.2d'%section,(registry['array']=='SOL')&(registry['section']==section))
+    groups={key:i for key,i in groups.items() if len(i)>0}
+    return registry,groups
+
+# Sensor registry.  A read-only structured array, one entry per sensor, with
+# the fields name, array ('PA1','PA2','FB','TA' or 'SOL'), kind ('P'oloidal 
+# or 'R'adial), section, sensorNum (the S number), phi and theta (radians) and 
+# address.  _SENSOR_GROUPS maps a group to the (read-only) indices of its 
+# sensors in _SENSORS:
+#   'PA', 'PA1', 'PA2'              - poloidal arrays
+#   'FB', 'TA' (and 'FB_R', 'TA_R') - poloidal (radial) sensors
+#   'FB_S1P' ... 'FB_S4R', 'TA_S1P' ... 'TA_S2R' - a single row
+#   'SOL', 'LFS01', 'LFS04', 'LFS08' - SOL tiles
+#   'SECTION01' ... 'SECTION10'     - all sensors in a section
+_SENSORS,_SENSOR_GROUPS=_buildSensorRegistry()
+
+
+def _sensorGroup(group):
+    """ names of the sensors of a group of the registry (see _SENSORS) """
+    if group not in _SENSOR_GROUPS:
+        raise KeyError('unknown sensor group %s.  Options are %s' % (group,sorted(_SENSOR_GROUPS)))
+    return _SENSORS['name'][_SENSOR_GROUPS[group]]
+
+
+def _registryMeta(group):
+    """
+    Sensor metadata table (see sensorArray) of the sensors of a group of the
+    registry (see _SENSORS), in registry order.  A new table on each call
+    """
+    if group not in _SENSOR_GROUPS:
+        raise KeyError('unknown sensor group %s.  Options are %s' % (group,sorted(_SENSOR_GROUPS)))
+    r=_SENSORS[_SENSOR_GROUPS[group]]
+    return _pd.DataFrame(     data={'Phi':r['phi'],
+                                    'Theta':r['theta'],
+                                    'Address':r['address'].astype(object),
+                                    'SectionNum':r['section'],
+                                    },
+                            index=_pd.Index(r['name'].astype(object),name='SensorNames'),
+                            columns=['Phi','Theta','Address','SectionNum'])
+
+
+def _paMeta():
+    """ the 64 poloidal PA sensors.  PA1 (section 3) then PA2 (section 8) """
+    return _registryMeta('PA')
+
+
+def _fbMeta(radial=False):
+    """ the 40 poloidal (or radial) FB sensors, ordered by row (S1 to S4)
+    and then by FB number.  Adds the column Row """
+    group='FB_R' if radial else 'FB'
+    meta=_registryMeta(group)
+    meta['Row']=_SENSORS['sensorNum'][_SENSOR_GROUPS[group]]
+    return meta
+
+
+def _taMeta(radial=False):
+    """ the 30 poloidal TA sensors (or the 10 radial S2R sensors), ordered
+    by TA number.  Adds the column CenterSensor """
+    group='TA_R' if radial else 'TA'
+    meta=_registryMeta(group)
+    meta['CenterSensor']=_SENSORS['sensorNum'][_SENSOR_GROUPS[group]]==2
+    return meta
+
+
+def _magMeta(removeBadSensors=True):
+    """ the poloidal TA, PA and FB sensors, in that order and each ordered by
+    toroidal angle (FB row by row).  This is the sensor set of 
+    magneticsData.  Adds the column marker (the plot marker of each array) """
+    ta=_taMeta().sort_values('Phi')
+    pa=_paMeta()
+    fb=_fbMeta().sort_values(['Row','Phi'],kind='mergesort')
+    if removeBadSensors==True:
+        pa=pa.drop(index=['PA2_S14P','PA2_S27P'])
+        fb=fb.drop(index=['FB03_S1P','FB06_S2P','FB08_S3P'])
+    meta=_pd.concat((ta,pa,fb))[['Phi','Theta','Address','SectionNum']]
+    names=meta.index.str
+    meta['marker']=_np.select([names.startswith('FB'),names.startswith('TA'),
+                               names.startswith('PA1'),names.startswith('PA2')],
+                              [u'^',u'v',u'>',u'<'])
+    return meta
+
+
+def _loadSensorArray(shotno,meta,tStart=_TSTART,tStop=_TSTOP,**kwargs):
+    """ Downloads the sensors of meta (its Address column) with a single
+    mdsData call.  kwargs are passed on to mdsData.  Sensors missing from 
+    the active tree catalog are reported by name (see setTreeCatalog) """
+    _checkCatalog(shotno,list(meta['Address']),names=list(meta.index))
+    data,time=mdsData(shotno,list(meta['Address']),tStart,tStop,**kwargs)
+    return sensorArray(data,time,meta)
+
+
+def _highPassSensorArray(raw,smoothingAlgorithm='gaussian'):
+    """
+    Removes the low-frequency offset of every sensor of raw.  All sensors
+    are filtered in a single call along the time axis
+
+    Parameters
+    ----------
+    raw : sensorArray
+        raw data
+    smoothingAlgorithm : str
+        'gaussian' - use gaussianHighPassFilter (default)
+        'butterworth' - use butterworth lfilter (causal filter)
+
+    Returns
+    -------
+    data : sensorArray
+        high-pass filtered data
+    fit : sensorArray
+        the low-frequency fit that was subtracted from raw
+    """
+    if smoothingAlgorithm == 'gaussian':
+        data,fit=_process.gaussianHighPassFilter(raw.data,raw.time,timeWidth=1./20000,axis=1)
+    elif smoothingAlgorithm == 'butterworth':
+        # the sampling rate of the (possibly decimated) data, not the 
+        # digitizer's 500 kHz that butterworthFilter assumes
+        samplingRate=1./_np.mean(_np.diff(raw.time))
+        data=_process.butterworthFilter(raw.data,raw.time,samplingRate=samplingRate,
+                                        cutoffFreq=2e3,filterType='high',axis=1)
+        fit=_process.butterworthFilter(raw.data,raw.time,samplingRate=samplingRate,
+                                       cutoffFreq=2e3,filterType='low',axis=1)
+    else:
+        raise ValueError("smoothingAlgorithm must be 'gaussian' or 'butterworth'")
+    return raw.like(data), raw.like(fit)
+
+
+###############################################################################
+### sensor health
+
+def sensorHealth(raw,sigma=1.0):
+    """
+    Health metrics and verdicts of every sensor of a sensorArray.  Each 
+    metric is computed for all sensors at once over the (sensors x time) 
+    matrix
+    
+    Parameters
+    ----------
+    raw : sensorArray
+        raw data
+    sigma : float
+        sensors whose MeanAbs is more than sigma standard deviations from the 
+        average MeanAbs of the (finite) sensors are outliers.  default is 1
+        
+    Returns
+    -------
+    health : pandas.DataFrame
+        one row per sensor, indexed by sensor name, with the columns
+        Offset - mean of the signal
+        Rms - root mean square of the signal
+        MeanAbs - mean of the absolute value of the signal
+        SignFlipped - True if Offset<0 (the signal is inverted)
+        Dead - True if the signal is flat or not finite
+        Outlier - True if MeanAbs is an outlier (see sigma)
+        Bad - Dead or Outlier
+        
+    Notes
+    -----
+    Outlier is the sigma outlier rejection that fbData has always used (see
+    _processData.rejectOutliers).  Flat sensors are included in the 
+    statistics, as they always were.  Sensors with non-finite data are left
+    out, since a single NaN would otherwise make every sensor an outlier.
+    """
+    data=raw.data
+    n=data.shape[1]
+    offset=data.sum(axis=1)/n
+    rms=_np.sqrt(_np.einsum('ij,ij->i',data,data)/n)
+    meanAbs=_np.abs(data).sum(axis=1)/n
+    finite=_np.isfinite(rms)
+    dead=(rms==0)|~finite
+    outlier=_np.zeros(len(raw),dtype=bool)
+    if finite.any():
+        outlier[finite]=~_process.rejectOutliers(meanAbs[finite],sigma=sigma)[1]
+    return _pd.DataFrame(     data={'Offset':offset,
+                                    'Rms':rms,
+                                    'MeanAbs':meanAbs,
+                                    'SignFlipped':offset<0,
+                                    'Dead':dead,
+                                    'Outlier':outlier,
+                                    'Bad':dead|outlier},
+                            index=raw.meta.index,
+                            columns=['Offset','Rms','MeanAbs','SignFlipped','Dead','Outlier','Bad'])
+    
+    
+# health of the most recently checked sensor sets, least recently used first.
+# keyed by _sensorHealthKey.  the size covers a blacklist window (20 shots) 
+# of the three arrays
+_SENSOR_HEALTH = {}
+_SENSOR_HEALTH_SIZE = 64
+_SENSOR_HEALTH_LOCK = _threading.Lock()
+
+def _sensorHealthKey(shotno,meta,tStart,tStop,sigma,options):
+    """ (shotno, sensor names, tStart, tStop, sigma, decimation, precision,
+    backend).  options are the mdsData keywords of the load, see _loadOptions """
+    return (int(shotno),tuple(meta.index),float(tStart),float(tStop),float(sigma),
+            int(options['decimate']),options['decimateMode'],str(options['dtype']),
+            _BACKEND)
+
+def _cachedSensorHealth(shotno,meta,tStart=_TSTART,tStop=_TSTOP,sigma=1.0,
+                        load=True,**kwargs):
+    """
+    Returns (health, raw) of the sensors of meta.  health is taken from the
+    cache if the shot has already been checked, in which case raw is None.
+    Otherwise the sensors are downloaded (one mdsData call, kwargs are 
+    passed on to it) and checked.  With load=False, (None, None) is returned
+    instead of downloading anything
+    """
+    options=dict(_loadOptions(),**kwargs)
+    key=_sensorHealthKey(shotno,meta,tStart,tStop,sigma,options)
+    with _SENSOR_HEALTH_LOCK:
+        health=_SENSOR_HEALTH.pop(key,None)
+        if health is not None:
+            _SENSOR_HEALTH[key]=health  # now the most recently used
+    if health is not None or load==False:
+        return health,None
+    raw=_loadSensorArray(shotno,meta,tStart,tStop,**options)
+    health=sensorHealth(raw,sigma)
+    with _SENSOR_HEALTH_LOCK:
+        _SENSOR_HEALTH[key]=health
+        while len(_SENSOR_HEALTH)>_SENSOR_HEALTH_SIZE:
+            del _SENSOR_HEALTH[next(iter(_SENSOR_HEALTH))]
+    return health,raw
+
+def clearSensorHealth():
+    """ Forgets the cached sensor health of every shot """
+    with _SENSOR_HEALTH_LOCK:
+        _SENSOR_HEALTH.clear()
+
+
+@_prepShotno
+def sensorHealthData(shotno=98170,group='FB',tStart=_TSTART,tStop=_TSTOP,
+                     sigma=1.0):
+    """
+    Health of the sensors of a group of the sensor registry (see _SENSORS and
+    sensorHealth).  The result is cached per shot, so checking a shot a 
+    second time (or loading it with fbData) does not download anything again
+    
+    Parameters
+    ----------
+    shotno : int
+        shot number of desired data
+    group : str
+        sensor group, e.g. 'PA', 'FB', 'TA' or 'FB_S4P'.  The outlier 
+        statistics are computed over the group, so it should be a single
+        array.  default is 'FB' (all poloidal FB sensors)
+    tStart : float
+        time (in seconds) to trim data before
+        default is 0 ms
+    tStop : float
+        time (in seconds) to trim data after
+        default is 10 ms
+    sigma : float
+        see sensorHealth.  default is 1
+        
+    Returns
+    -------
+    health : pandas.DataFrame
+        see sensorHealth.  The cached table is returned.  Do not modify it
+    
+    Example
+    -------
+    ::
+        
+        health=sensorHealthData(96530,'PA')
+        health.index[health.Bad]
+    """
+    return _cachedSensorHealth(shotno,_registryMeta(group),tStart,tStop,sigma)[0]
+
+
+class sensorBlacklist:
+    """
+    Rolling blacklist of sensors.  A sensor is blacklisted if it was bad (see
+    sensorHealth) in at least a fraction threshold of the most recent window
+    shots that have been checked
+    
+    Parameters
+    ----------
+    window : int
+        number of (most recent) shots that are kept.  default is 20
+    threshold : float
+        fraction of those shots in which a sensor must be bad.  default is 0.5
     
+    Attributes
+    ----------
+    shotnos : list (of int)
+        shots in the window, in increasing order
+    sensors : list (of str)
+        blacklisted sensors
+    fractions : pandas.Series
+        fraction of the shots in the window in which each sensor was bad
+        
+    Subfunctions
+    ------------
+    update :
+        adds the verdicts of a shot
+    sweep :
+        checks a list of shots and adds their verdicts
+    __contains__ :
+        `name in blacklist` is True if the sensor is blacklisted
+        
+    Example
+    -------
+    ::
+        
+        _SENSORBLACKLIST.sweep(range(-20,0),groups=['PA','FB','TA'],parallel=True)
+        print(_SENSORBLACKLIST.sensors)
+    """
+    def __init__(self,window=20,threshold=0.5):
+        self.window=window
+        self.threshold=threshold
+        self._verdicts={} # shotno -> pandas.Series of Bad
+        self._lock=_threading.Lock()
+        
+    def update(self,shotno,health):
+        """ adds (or merges) the health (see sensorHealth) of a shot """
+        with self._lock:
+            bad=health['Bad']
+            if shotno in self._verdicts:
+                bad=bad.combine_first(self._verdicts[shotno])
+            self._verdicts[shotno]=bad
+            for old in sorted(self._verdicts)[:-self.window]:
+                del self._verdicts[old]
+                
+    def sweep(self,shotnos,groups=('PA','FB','TA'),tStart=_TSTART,tStop=_TSTOP,
+              sigma=1.0,**kwargs):
+        """
+        Checks every shot (see sensorHealthData) and adds its verdicts.  
+        kwargs (e.g. parallel=True) are passed to sensorHealthData.  In 
+        parallel mode, shots that fail to load are skipped.  Returns 
+        self.sensors
+        """
+        shotnos=list(shotnos)
+        if any(shotno<0 for shotno in shotnos):
+            latest=latestShotNumber()
+            shotnos=[int(latest+shotno+1) if shotno<0 else int(shotno) for shotno in shotnos]
+        for group in groups:
+            healths=sensorHealthData(shotnos,group,tStart,tStop,sigma,**kwargs)
+            for shotno,health in zip(shotnos,healths):
+                if health is not None:
+                    self.update(shotno,health)
+        return self.sensors
+    
+    @property
+    def shotnos(self):
+        with self._lock:
+            return sorted(self._verdicts)
+    
+    @property
+    def fractions(self):
+        with self._lock:
+            if len(self._verdicts)==0:
+                return _pd.Series(dtype=float)
+            # (sensors x shots).  sensors that were not checked in a shot are NaN
+            return _pd.DataFrame(self._verdicts).astype(float).mean(axis=1)
+    
+    @property
+    def sensors(self):
+        fractions=self.fractions
+        return list(fractions.index[(fractions>=self.threshold).to_numpy()])
+    
+    def __contains__(self,name):
+        return name in self.sensors
+    
+    def __repr__(self):
+        return 'sensorBlacklist(%d shots, %s)' % (len(self.shotnos),self.sensors)
+    
+    
+# the rolling blacklist.  Empty until shots are added with sweep or update
+_SENSORBLACKLIST = sensorBlacklist()
+
+
 @_prepShotno
 class paData:
     """
@@ -1650,6 +5942,16 @@ class paData:
         fit applied to raw data
     pa2RawFit : list (of numpy.ndarray)
         fit applied to raw data
+    raw : sensorArray
+        raw data of both arrays.  pa1Raw and pa2Raw are views of its rows
+    data : sensorArray
+        processed data of both arrays
+    fit : sensorArray
+        fit applied to raw data
+    dfData, dfDataRaw : pandas.DataFrame
+        views of data and raw
+    dfMeta : pandas.DataFrame
+        sensor names, locations, addresses and sections
         
     Subfunctions
     ------------
@@ -1659,12 +5961,21 @@ class paData:
         returns plot of PA2 sensor based on the provided index
     plot :
         plots all relevant plots    
+    load :
+        downloads and filters the data now instead of on first use
         
         
     Notes
     -----
     'PA2_S14P' is a known bad sensor
     pa1_s16 ???
+    
+    With removeBadSensors=True, the bad sensors are not downloaded, so they
+    are missing from every attribute (not only from the DataFrames).
+    
+    The data attributes are computed the first time they are accessed.  The
+    raw data is downloaded on first use of any of them, and the filter is 
+    only run if data, fit or their lists and DataFrames are used.
 
     """
     
@@ -1678,111 +5989,29 @@ class paData:
         self.tStart = tStart
         self.tStop = tStop
         
-        # poloidal location
-        self.thetaPA1 =_np.array([-174.74778518, -164.23392461, -153.66901098, -143.01895411,       -132.24974382, -121.3277924 , -110.22067715,  -98.93591492,        -87.23999699,  -75.60839722,  -63.97679673,  -52.34519359,        -40.71359604,  -29.08199717,  -17.45039318,   -5.81879416,          5.81280487,   17.44440438,   29.07600466,   40.70760263,         52.33920936,   63.97080017,   75.60240749,   87.23400093,         98.93591492,  110.22067715,  121.3277924 ,  132.24974382,        143.01895411,  153.66901098,  164.23392461,  174.74778518])*_np.pi/180.
-        self.thetaPA2 =_np.array([-174.74778518, -164.23392461, -153.66901098, -143.01895411,       -132.24974382, -121.3277924 , -110.22067715,  -98.93591492,        -87.23999699,  -75.60839722,  -63.97679673,  -52.34519359,        -40.71359604,  -29.08199717,  -17.45039318,   -5.81879416,          5.81280487,   17.44440438,   29.07600466,   40.70760263,         52.33920936,   63.97080017,   75.60240749,   87.23400093,         98.93591492,  110.22067715,  121.3277924 ,  132.24974382,        143.01895411,  153.66901098,  164.23392461,  174.74778518])*_np.pi/180.
-        
-        # toroidal location
-        self.phiPA1=_np.ones(len(self.thetaPA1))*317.5*_np.pi/180.
-        self.phiPA2=_np.ones(len(self.thetaPA2))*137.5*_np.pi/180.
-        
-        # sensor names
-        self.namesPA1=_np.array([   'PA1_S01P', 'PA1_S02P', 'PA1_S03P', 'PA1_S04P', 'PA1_S05P', 'PA1_S06P', 'PA1_S07P', 'PA1_S08P', 'PA1_S09P', 'PA1_S10P', 'PA1_S11P', 'PA1_S12P', 'PA1_S13P', 'PA1_S14P', 'PA1_S15P', 'PA1_S16P', 'PA1_S17P', 'PA1_S18P', 'PA1_S19P', 'PA1_S20P', 'PA1_S21P', 'PA1_S22P', 'PA1_S23P', 'PA1_S24P', 'PA1_S25P', 'PA1_S26P', 'PA1_S27P', 'PA1_S28P', 'PA1_S29P', 'PA1_S30P', 'PA1_S31P', 'PA1_S32P'])
-        self.namesPA2=_np.array([   'PA2_S01P', 'PA2_S02P', 'PA2_S03P', 'PA2_S04P', 'PA2_S05P', 'PA2_S06P', 'PA2_S07P', 'PA2_S08P', 'PA2_S09P', 'PA2_S10P', 'PA2_S11P', 'PA2_S12P', 'PA2_S13P', 'PA2_S14P', 'PA2_S15P', 'PA2_S16P', 'PA2_S17P', 'PA2_S18P', 'PA2_S19P', 'PA2_S20P', 'PA2_S21P', 'PA2_S22P', 'PA2_S23P', 'PA2_S24P', 'PA2_S25P', 'PA2_S26P', 'PA2_S27P', 'PA2_S28P', 'PA2_S29P', 'PA2_S30P', 'PA2_S31P', 'PA2_S32P'])
-
-                    
-
+        # names, locations and addresses of the sensors
+        meta=_paMeta()
         if self.correctTheta:
-            self.thetaPA1=processPlasma.thetaCorrection(self.shotno,self.thetaPA1,\
-                    self.tStart,self.tStop)[1]
-            self.thetaPA2=processPlasma.thetaCorrection(self.shotno,self.thetaPA2,\
-                    self.tStart,self.tStop)[1]
-        # compile full sensor addresses names
-        pa1SensorAddresses=[]
-        pa2SensorAddresses=[]        
-        rootAddress='\HBTEP2::TOP.SENSORS.MAGNETIC:';
-        for i in range(0,len(self.namesPA1)):
-            pa1SensorAddresses.append(rootAddress+self.namesPA1[i])
-        for i in range(0,len(self.namesPA2)):
-            pa2SensorAddresses.append(rootAddress+self.namesPA2[i])
-            
-        # get raw data
-        self.pa1Raw,self.pa1Time=mdsData(shotno,pa1SensorAddresses, tStart, tStop)
-        self.pa2Raw,self.pa2Time=mdsData(shotno,pa2SensorAddresses, tStart, tStop)
-        
-        # data smoothing algorithm
-        self.pa1Data=[]
-        self.pa1RawFit=[]
-        self.pa2Data=[]
-        self.pa2RawFit=[]
-        
-        if smoothingAlgorithm == 'gaussian':
-            # gaussian offset subtraction
-            for i in range(0,len(self.namesPA1)):
-                temp,temp2=_process.gaussianHighPassFilter(self.pa1Raw[i][:],self.pa1Time,timeWidth=1./20000)
-                self.pa1RawFit.append(temp2)
-                self.pa1Data.append(temp)
-            for i in range(0,len(self.namesPA2)):
-                temp,temp2=_process.gaussianHighPassFilter(self.pa2Raw[i][:],self.pa2Time,timeWidth=1./20000)
-                self.pa2RawFit.append(temp2)
-                self.pa2Data.append(temp)
-                
-        elif smoothingAlgorithm == 'butterworth':
-            # butterworth lfilter
-            for i in range(0,len(self.namesPA1)):
-                temp = _process.butterworthFilter(self.pa1Raw[i][:],self.pa1Time,cutoffFreq=2e3,filterType='high')
-                temp2 = _process.butterworthFilter(self.pa1Raw[i][:],self.pa1Time,cutoffFreq=2e3,filterType='low')
-                self.pa1RawFit.append(temp2)
-                self.pa1Data.append(temp)
-            for i in range(0,len(self.namesPA2)):
-                temp = _process.butterworthFilter(self.pa2Raw[i][:],self.pa2Time,cutoffFreq=2e3,filterType='high')
-                temp2 = _process.butterworthFilter(self.pa2Raw[i][:],self.pa2Time,cutoffFreq=2e3,filterType='low')
-                self.pa2RawFit.append(temp2)
-                self.pa2Data.append(temp)            
-            
-        # pandas dataframes 
-        #TODO(John) rewrite entire class.  start with dataframes instead of lists
-        self.dfData=_pd.DataFrame(     data=_np.append(_np.array([self.pa1Time]).transpose(),_np.array(self.pa1Data+self.pa2Data).transpose(),axis=1),
-                            columns=_np.append(_np.append(_np.array(['Time']),self.namesPA1),self.namesPA2)).set_index('Time')
-        self.dfDataRaw=_pd.DataFrame(     data=_np.append(_np.array([self.pa1Time]).transpose(),_np.array(self.pa1Raw+self.pa2Raw).transpose(),axis=1),
-                            columns=_np.append(_np.append(_np.array(['Time']),self.namesPA1),self.namesPA2)).set_index('Time')
-        self.dfMeta=_pd.DataFrame(     data={'SensorNames':_np.append(self.namesPA1,self.namesPA2),
-                                    'Phi':_np.append(self.phiPA1,self.phiPA2),
-                                    'Theta':_np.append(self.thetaPA1,self.thetaPA2),
-                                    'Address':pa1SensorAddresses+pa2SensorAddresses,
-                                    'SectionNum':_np.append([3]*32,[8]*32),
-                                    },
-                                columns=['SensorNames','Phi','Theta','Address','SectionNum']).set_index('SensorNames')#,'Address','SectionNum'])
-        
-        
+            for section in [3,8]:
+                i=(meta.SectionNum==section).to_numpy()
+                meta.loc[i,'Theta']=processPlasma.thetaCorrection(self.shotno,meta.Theta[i].to_numpy(),\
+                        self.tStart,self.tStop)[1]
         if removeBadSensors==True:
-            self.dfData=self.dfData.drop(columns=self.badSensors)
-            self.dfMeta=self.dfMeta.drop(index=self.badSensors)
+            meta=meta.drop(index=self.badSensors)
             
-            # Non-Pandas solution
-            
-            for i in self.badSensors:
-                iBad=_np.where(self.namesPA1==i)
-                
-                self.namesPA1=_np.delete(self.namesPA1,iBad)
-                self.thetaPA1=_np.delete(self.thetaPA1,iBad)
-                self.phiPA2=_np.delete(self.phiPA2,iBad)
-                
-                iBad=_np.where(self.namesPA2==i)
-                self.namesPA2=_np.delete(self.namesPA2,iBad)
-                self.thetaPA2=_np.delete(self.thetaPA2,iBad)
-                self.phiPA2=_np.delete(self.phiPA2,iBad)
-                '''
-                self.pa1Raw=_np.delete(self.pa1Raw,iBad)
-                self.pa1RawFit=_np.delete(self.pa1RawFit,iBad)
-                self.pa1Data=_np.delete(self.pa1Data,iBad) 
-                
-                
-                
-                self.pa2Raw=_np.delete(self.pa2Raw,iBad)
-                self.pa2RawFit=_np.delete(self.pa2RawFit,iBad)
-                self.pa2Data=_np.delete(self.pa2Data,iBad)
-                '''
+        # per-array names and locations
+        isPA1=(meta.SectionNum==3).to_numpy()
+        self.namesPA1=meta.index[isPA1].to_numpy()
+        self.namesPA2=meta.index[~isPA1].to_numpy()
+        self.thetaPA1=meta.Theta[isPA1].to_numpy()
+        self.thetaPA2=meta.Theta[~isPA1].to_numpy()
+        self.phiPA1=meta.Phi[isPA1].to_numpy()
+        self.phiPA2=meta.Phi[~isPA1].to_numpy()
+        self.dfMeta=meta
+        
+        # the data is downloaded and filtered on first use.  see raw
+        self.smoothingAlgorithm=smoothingAlgorithm
+        self._loadOptions=_loadOptions()
                 
         if plot==True or plot=='all':
             self.plot(True)
@@ -1790,6 +6019,73 @@ class paData:
             self.plotOfPA1().plot();
             self.plotOfPA2().plot();
             
+    def load(self):
+        """ downloads and filters the data now.  returns self """
+        self.data
+        self.fit
+        return self
+        
+    @_lazyProperty
+    def raw(self):
+        """ raw data of both arrays, downloaded in one call """
+        return _loadSensorArray(self.shotno,self.dfMeta,self.tStart,self.tStop,
+                                **self._loadOptions)
+        
+    @_lazyProperty
+    def _filtered(self):
+        # remove the low-frequency offset
+        return _highPassSensorArray(self.raw,self.smoothingAlgorithm)
+    
+    @_lazyProperty
+    def data(self):
+        return self._filtered[0]
+    
+    @_lazyProperty
+    def fit(self):
+        return self._filtered[1]
+    
+    # the per-array data lists hold views of raw, data and fit
+    @_lazyProperty
+    def pa1Time(self):
+        return self.raw.time
+    
+    @_lazyProperty
+    def pa2Time(self):
+        return self.raw.time
+    
+    @_lazyProperty
+    def pa1Raw(self):
+        return self.raw.rows(self.namesPA1)
+    
+    @_lazyProperty
+    def pa2Raw(self):
+        return self.raw.rows(self.namesPA2)
+    
+    @_lazyProperty
+    def pa1Data(self):
+        return self.data.rows(self.namesPA1)
+    
+    @_lazyProperty
+    def pa2Data(self):
+        return self.data.rows(self.namesPA2)
+    
+    @_lazyProperty
+    def pa1RawFit(self):
+        return self.fit.rows(self.namesPA1)
+    
+    @_lazyProperty
+    def pa2RawFit(self):
+        return self.fit.rows(self.namesPA2)
+    
+    # pandas dataframes (views of the same arrays)
+    @_lazyProperty
+    def dfData(self):
+        return self.data.toDataFrame()
+    
+    @_lazyProperty
+    def dfDataRaw(self):
+        return self.raw.toDataFrame()
+    
     def plotOfPA1Stripey(self,tStart=2e-3,tStop=4e-3):
         iStart=_process.findNearest(self.pa1Time,tStart)
         iStop=_process.findNearest(self.pa1Time,tStop)
@@ -2000,106 +6296,20 @@ def paData_df(shotno=98170,tStart=_TSTART,tStop=_TSTOP,plot=False,
 
     """
 
-    shotno = shotno
-    title1 = '%d, PA1 sensors' % shotno
-    title2 = '%d, PA2 sensors' % shotno
     badSensors=['PA2_S14P','PA2_S27P']
-    correctTheta=correctTheta
-    tStart = tStart
-    tStop = tStop
-    
-    # poloidal location
-    thetaPA1 =_np.array([-174.74778518, -164.23392461, -153.66901098, -143.01895411,       -132.24974382, -121.3277924 , -110.22067715,  -98.93591492,        -87.23999699,  -75.60839722,  -63.97679673,  -52.34519359,        -40.71359604,  -29.08199717,  -17.45039318,   -5.81879416,          5.81280487,   17.44440438,   29.07600466,   40.70760263,         52.33920936,   63.97080017,   75.60240749,   87.23400093,         98.93591492,  110.22067715,  121.3277924 ,  132.24974382,        143.01895411,  153.66901098,  164.23392461,  174.74778518])*_np.pi/180.
-    thetaPA2 =_np.array([-174.74778518, -164.23392461, -153.66901098, -143.01895411,       -132.24974382, -121.3277924 , -110.22067715,  -98.93591492,        -87.23999699,  -75.60839722,  -63.97679673,  -52.34519359,        -40.71359604,  -29.08199717,  -17.45039318,   -5.81879416,          5.81280487,   17.44440438,   29.07600466,   40.70760263,         52.33920936,   63.97080017,   75.60240749,   87.23400093,         98.93591492,  110.22067715,  121.3277924 ,  132.24974382,        143.01895411,  153.66901098,  164.23392461,  174.74778518])*_np.pi/180.
-    
-    # toroidal location
-    phiPA1=_np.ones(len(thetaPA1))*317.5*_np.pi/180.
-    phiPA2=_np.ones(len(thetaPA2))*137.5*_np.pi/180.
-    
-    # sensor names
-    namesPA1=_np.array([   'PA1_S01P', 'PA1_S02P', 'PA1_S03P', 'PA1_S04P', 'PA1_S05P', 'PA1_S06P', 'PA1_S07P', 'PA1_S08P', 'PA1_S09P', 'PA1_S10P', 'PA1_S11P', 'PA1_S12P', 'PA1_S13P', 'PA1_S14P', 'PA1_S15P', 'PA1_S16P', 'PA1_S17P', 'PA1_S18P', 'PA1_S19P', 'PA1_S20P', 'PA1_S21P', 'PA1_S22P', 'PA1_S23P', 'PA1_S24P', 'PA1_S25P', 'PA1_S26P', 'PA1_S27P', 'PA1_S28P', 'PA1_S29P', 'PA1_S30P', 'PA1_S31P', 'PA1_S32P'])
-    namesPA2=_np.array([   'PA2_S01P', 'PA2_S02P', 'PA2_S03P', 'PA2_S04P', 'PA2_S05P', 'PA2_S06P', 'PA2_S07P', 'PA2_S08P', 'PA2_S09P', 'PA2_S10P', 'PA2_S11P', 'PA2_S12P', 'PA2_S13P', 'PA2_S14P', 'PA2_S15P', 'PA2_S16P', 'PA2_S17P', 'PA2_S18P', 'PA2_S19P', 'PA2_S20P', 'PA2_S21P', 'PA2_S22P', 'PA2_S23P', 'PA2_S24P', 'PA2_S25P', 'PA2_S26P', 'PA2_S27P', 'PA2_S28P', 'PA2_S29P', 'PA2_S30P', 'PA2_S31P', 'PA2_S32P'])
-
-                
-
-#    if correctTheta:
-#        thetaPA1=processPlasma.thetaCorrection(shotno,thetaPA1,\
-#                tStart,tStop)[1]
-#        thetaPA2=processPlasma.thetaCorrection(shotno,thetaPA2,\
-#                tStart,tStop)[1]
-    # compile full sensor addresses names
-    pa1SensorAddresses=[]
-    pa2SensorAddresses=[]        
-    rootAddress='\HBTEP2::TOP.SENSORS.MAGNETIC:';
-    for i in range(0,len(namesPA1)):
-        pa1SensorAddresses.append(rootAddress+namesPA1[i])
-    for i in range(0,len(namesPA2)):
-        pa2SensorAddresses.append(rootAddress+namesPA2[i])
-        
-    # get raw data
-    pa1Raw,pa1Time=mdsData(shotno,pa1SensorAddresses, tStart, tStop)
-    pa2Raw,pa2Time=mdsData(shotno,pa2SensorAddresses, tStart, tStop)
-    
-    # data smoothing algorithm
-    pa1Data=[]
-    pa1RawFit=[]
-    pa2Data=[]
-    pa2RawFit=[]
-    '''
-    # old
-    for i in range(0,len(namesPA1)):
-		temp,temp2=_process.gaussianHighPassFilter(pa1Raw[i][:],pa1Time,timeWidth=1./20000)
-		pa1RawFit.append(temp2)
-		pa1Data.append(temp)
-	for i in range(0,len(namesPA2)):
-		temp,temp2=_process.gaussianHighPassFilter(pa2Raw[i][:],pa2Time,timeWidth=1./20000)
-		pa2RawFit.append(temp2)
-		pa2Data.append(temp)
-    '''
-    if smoothingAlgorithm == 'gaussian':
-        # gaussian offset subtraction
-        for i in range(0,len(namesPA1)):
-            temp,temp2=_process.gaussianHighPassFilter(pa1Raw[i][:],pa1Time,timeWidth=1./20000)
-            pa1RawFit.append(temp2)
-            pa1Data.append(temp)
-        for i in range(0,len(namesPA2)):
-            temp,temp2=_process.gaussianHighPassFilter(pa2Raw[i][:],pa2Time,timeWidth=1./20000)
-            pa2RawFit.append(temp2)
-            pa2Data.append(temp)
-            
-    elif smoothingAlgorithm == 'butterworth':
-        # butterworth lfilter
-        for i in range(0,len(namesPA1)):
-            temp = _process.butterworthFilter(pa1Raw[i][:],pa1Time,cutoffFreq=2e3,filterType='high')
-            temp2 = _process.butterworthFilter(pa1Raw[i][:],pa1Time,cutoffFreq=2e3,filterType='low')
-            pa1RawFit.append(temp2)
-            pa1Data.append(temp)
-        for i in range(0,len(namesPA2)):
-            temp = _process.butterworthFilter(pa2Raw[i][:],pa2Time,cutoffFreq=2e3,filterType='high')
-            temp2 = _process.butterworthFilter(pa2Raw[i][:],pa2Time,cutoffFreq=2e3,filterType='low')
-            pa1RawFit.append(temp2)
-            pa1Data.append(temp)
-    
-    # pandas dataframes 
-    dfData=_pd.DataFrame(     data=_np.append(_np.array([pa1Time]).transpose(),_np.array(pa1Data+pa2Data).transpose(),axis=1),
-                        columns=_np.append(_np.append(_np.array(['Time']),namesPA1),namesPA2)).set_index('Time')
-    dfDataRaw=_pd.DataFrame(     data=_np.append(_np.array([pa1Time]).transpose(),_np.array(pa1Raw+pa2Raw).transpose(),axis=1),
-                        columns=_np.append(_np.append(_np.array(['Time']),namesPA1),namesPA2)).set_index('Time')
-    dfMeta=_pd.DataFrame(     data={'SensorNames':_np.append(namesPA1,namesPA2),
-                                'Phi':_np.append(phiPA1,phiPA2),
-                                'Theta':_np.append(thetaPA1,thetaPA2),
-                                'Address':pa1SensorAddresses+pa2SensorAddresses,
-                                'SectionNum':_np.append([3]*32,[8]*32),
-                                },
-                            columns=['SensorNames','Phi','Theta','Address','SectionNum']).set_index('SensorNames')#,'Address','SectionNum'])
     
+    # names, locations and addresses of the sensors
+    meta=_paMeta()
     if removeBadSensors==True:
-        dfData=dfData.drop(columns=badSensors)
-        dfDataRaw=dfDataRaw.drop(columns=badSensors)
-        dfMeta=dfMeta.drop(index=badSensors)
+        meta=meta.drop(index=badSensors)
         
-#    return dfData,dfDataRaw,dfMeta
-    return dfData,dfDataRaw,dfMeta
+    # get raw data (both arrays in one call) and remove the low-frequency 
+    # offset
+    raw=_loadSensorArray(shotno,meta,tStart,tStop)
+    data,fit=_highPassSensorArray(raw,smoothingAlgorithm)
+    
+    # pandas dataframes (views of the sensorArrays)
+    return data.toDataFrame(),raw.toDataFrame(),meta
         
         
         
@@ -2131,6 +6341,10 @@ class sxrData:
         title to put at the top of figures
     data : list (of numpy.ndarray)
         list of 11 (of 16) data arrays, one for each channel
+    time : numpy.ndarray
+        time of data
+    R, Z, Midplane : list
+        geometry of each channel
         
     Subfunctions
     ------------
@@ -2140,6 +6354,8 @@ class sxrData:
         returns a stripey plot of the sensors
     plotOfOneChannel :
         returns a plot of a single channel based on the provided index, i
+    load :
+        downloads the data now instead of on first use
         
     Notes
     -----
@@ -2147,6 +6363,8 @@ class sxrData:
     missing sensors are broken and others include anamolous or attenuated 
     results.  
     
+    data, time and the geometry are downloaded the first time they are 
+    accessed.
 
     """
     
@@ -2174,12 +6392,12 @@ class sxrData:
             mdsAddressR.append(address+':R')
             mdsAddressZ.append(address+':Z')
             mdsAddressMid.append(address+':MIDPLANE')
-        # get data
+        # the data and geometry are downloaded on first use.  see data and R
         #self.data,self.time=mdsData(shotno,sensorAddresses, tStart, tStop)
-        self.data, self.time = mdsData(shotno,mdsAddressRaw,tStart,tStop)
-        self.R = mdsData(shotno,mdsAddressR)
-        self.Z = mdsData(shotno,mdsAddressZ)
-        self.Midplane = mdsData(shotno,mdsAddressMid)
+        self.tStart = tStart
+        self.tStop = tStop
+        self._addresses = (mdsAddressRaw,mdsAddressR,mdsAddressZ,mdsAddressMid)
+        self._loadOptions=_loadOptions()
         # aperture location
         self.det_ap_R = [.9654660224914551]
         self.det_ap_Z = [.2211250066757202]
@@ -2193,6 +6411,43 @@ class sxrData:
             self.plotOfSXRStripey(tStart,tStop).plot()
             
             
+    def load(self):
+        """ downloads the data now.  returns self """
+        self.data
+        return self
+    
+    @_lazyProperty
+    def _raw(self):
+        return mdsData(self.shotno,self._addresses[0],self.tStart,self.tStop,
+                       **self._loadOptions)
+    
+    @_lazyProperty
+    def data(self):
+        return self._raw[0]
+    
+    @_lazyProperty
+    def time(self):
+        return self._raw[1]
+    
+    @_lazyProperty
+    def _geometry(self):
+        # R, Z and midplane of every channel in one call
+        n=len(self.sensor_num)
+        values,time=mdsData(self.shotno,self._addresses[1]+self._addresses[2]+self._addresses[3])
+        return ((values[0:n],time),(values[n:2*n],time),(values[2*n:3*n],time))
+    
+    @_lazyProperty
+    def R(self):
+        return self._geometry[0]
+    
+    @_lazyProperty
+    def Z(self):
+        return self._geometry[1]
+    
+    @_lazyProperty
+    def Midplane(self):
+        return self._geometry[2]
+            
     def plotOfSXRStripey(self,tStart=1e-3,tStop=10e-3):
         iStart=_process.findNearest(self.time,tStart)
         iStop=_process.findNearest(self.time,tStop)
@@ -2244,47 +6499,43 @@ def fbData_df(shotno=98170,tStart=_TSTART,tStop=_TSTOP,plot=False,
               badSensors=['FB03_S1P','FB06_S2P','FB08_S3P'],poloidalOnly=True,
               smoothingAlgorithm='gaussian'):
     
-    rootAddress='\HBTEP2::TOP.SENSORS.MAGNETIC:';
-    
-    names=[]
-    addresses=[]
-    
     if poloidalOnly==True:
         sensors=["P"]
     else:
         sensors=["P","R"]
-    for k in sensors:
-        for i in range(4):
-#            for j in range(10):
-            for j in _np.array([5,6,7,8,9,10,1,2,3,4])-1:
-                names.append('FB%1.2d_S%d%s'%(j+1,i+1,k))
-                addresses.append('%s%s'%(rootAddress,names[-1]))
-    
-    dataRaw, time =mdsData(shotno,addresses, tStart, tStop)
-#     dataRaw
-    dfData=_pd.DataFrame(data=_np.array(dataRaw).transpose(),columns=["%s_RAW"%i for i in names])
-    dfData['time']=time
-    dfData=dfData.set_index('time')
-    
-#    phi=_np.pi/180.*_np.array([241,277,313,349,25,61, 97,133,169,205]*4)
-    phi=_np.pi/180.*_np.array([25,61, 97,133,169,205,241,277,313,349]*4)
-    theta=_np.pi/180.*_np.array([_np.ones(10)*(-83.4),_np.ones(10)*(-29.3),_np.ones(10)*29.3,_np.ones(10)*83.4]).flatten()
-    dfMeta=_pd.DataFrame(index=names)
-    dfMeta['Phi']=phi
-    dfMeta['Theta']=theta
-    dfMeta['address']=addresses
-    
-    dfMeta=dfMeta.drop(index=badSensors)
-    badSensors=['%s_RAW'%i for i in badSensors]
-    dfData=dfData.drop(columns=badSensors)
-    
-    for i, (key, vals) in enumerate(dfData.iteritems()):
-        t=dfData.index.to_numpy()
-        if smoothingAlgorithm == 'gaussian':
-            dfData[key[0:8]]=_process.gaussianFilter(t,dfData[key],timeFWHM=5e-4,filterType='high',plot=False)
-        #elif smoothingAlgorithm == 'butterworth':
-        #    # haven't implement this for butterworth filter
-        #    pass
+        
+    # names, locations and addresses of the sensors.  in each row, ordered
+    # by toroidal angle (FB05 to FB10 and then FB01 to FB04)
+    meta=_pd.concat([_fbMeta(radial=(k=="R")).sort_values(['Row','Phi'],kind='mergesort') for k in sensors])
+    meta=meta.drop(index=badSensors)
+    
+    # raw data
+    columns=[name+'_RAW' for name in meta.index]
+    if smoothingAlgorithm == 'gaussian':
+        # raw and filtered data share one (2 x sensors, time) matrix so that
+        # the DataFrame wraps it as is.  the raw data is copied into its top
+        # half and the filter writes into the bottom half
+        _checkCatalog(shotno,list(meta['Address']),names=list(meta.index))
+        rows,time=mdsData(shotno,list(meta['Address']),tStart,tStop)
+        n=len(rows)
+        matrix=_np.empty((2*n,len(time)),dtype=rows[0].dtype)
+        raw=sensorArray(_stackRows(rows,out=matrix[:n]),time,meta)
+    else:
+        raw=_loadSensorArray(shotno,meta,tStart,tStop)
+    
+    # filtered data
+    if smoothingAlgorithm == 'gaussian':
+        _process.gaussianFilter(raw.time,raw.data,timeFWHM=5e-4,filterType='high',
+                                plot=False,axis=1,out=matrix[n:])
+        dfData=_timeFrame(matrix,raw.time,columns+list(meta.index),indexName='time')
+    #elif smoothingAlgorithm == 'butterworth':
+    #    # haven't implement this for butterworth filter
+    #    pass
+    else:
+        dfData=_timeFrame(raw.data,raw.time,columns,indexName='time')
+    
+    dfMeta=meta[['Phi','Theta','Address']].rename(columns={'Address':'address'})
+    dfMeta.index.name=None
     return dfData,dfMeta
 
 
@@ -2344,6 +6595,18 @@ class fbData:
         fbPolData
     fbRadRawFit : 2D list (of numpy.ndarray)
         smoothed fit of raw radial data.  subtracted from data to get fbRadData
+    raw : sensorArray
+        raw poloidal data of all rows.  fbPolRaw holds views of its rows
+    rawRad : sensorArray
+        raw radial data of all rows
+    data : sensorArray
+        poloidal data, processed
+    fit : sensorArray
+        smoothed fit of raw poloidal data
+    dfData, dfDataRaw : pandas.DataFrame
+        views of data and raw
+    dfMeta : pandas.DataFrame
+        sensor names, locations, addresses, sections and rows
         
     Subfunctions
     ------------
@@ -2353,126 +6616,53 @@ class fbData:
         returns plot of a specified radial sensor
     plot :
         plots all relevant data
+    load :
+        downloads and filters the data now instead of on first use
     
     Notes
     -----
     Known bad sensors: 'FB03_S1P','FB06_S2P','FB08_S3P'
     The S4P array has no broken sensors at present.  
+    
+    The data attributes are computed the first time they are accessed, so 
+    only what is used is downloaded.  With removeBadSensors=False, a single
+    row (e.g. fbPolData[3]) downloads only the 10 sensors of that row.  The 
+    outlier rejection compares all 40 poloidal sensors, so with 
+    removeBadSensors=True the first check of a shot downloads all of them.  
+    The verdicts are cached per shot (see sensorHealthData), so afterwards a 
+    single row again downloads only its good sensors.  The radial sensors 
+    are only downloaded if fbRadRaw or rawRad is used.
     """
     def __init__(self,shotno=98170,tStart=_TSTART,tStop=_TSTOP,plot=False,
                  removeBadSensors=True,invertNegSignals=True, smoothingAlgorithm='gaussian'):
         self.shotno = shotno
         self.title = "%d, FB sensors" % shotno
 #        self.badSensors=['FB03_S1P','FB06_S2P','FB08_S3P'] # some sensors appear to be broken
-
-        # sensor names
-        fbPolNames=[['FB01_S1P', 'FB02_S1P', 'FB03_S1P', 'FB04_S1P', 'FB05_S1P', 'FB06_S1P', 'FB07_S1P', 'FB08_S1P', 'FB09_S1P', 'FB10_S1P'], ['FB01_S2P', 'FB02_S2P', 'FB03_S2P', 'FB04_S2P', 'FB05_S2P', 'FB06_S2P', 'FB07_S2P', 'FB08_S2P', 'FB09_S2P', 'FB10_S2P'], ['FB01_S3P', 'FB02_S3P', 'FB03_S3P', 'FB04_S3P', 'FB05_S3P', 'FB06_S3P', 'FB07_S3P', 'FB08_S3P', 'FB09_S3P', 'FB10_S3P'], ['FB01_S4P', 'FB02_S4P', 'FB03_S4P', 'FB04_S4P', 'FB05_S4P', 'FB06_S4P', 'FB07_S4P', 'FB08_S4P', 'FB09_S4P', 'FB10_S4P']]
-        self.fbRadNames=[['FB01_S1R', 'FB02_S1R', 'FB03_S1R', 'FB04_S1R', 'FB05_S1R', 'FB06_S1R', 'FB07_S1R', 'FB08_S1R', 'FB09_S1R', 'FB10_S1R'], ['FB01_S2R', 'FB02_S2R', 'FB03_S2R', 'FB04_S2R', 'FB05_S2R', 'FB06_S2R', 'FB07_S2R', 'FB08_S2R', 'FB09_S2R', 'FB10_S2R'], ['FB01_S3R', 'FB02_S3R', 'FB03_S3R', 'FB04_S3R', 'FB05_S3R', 'FB06_S3R', 'FB07_S3R', 'FB08_S3R', 'FB09_S3R', 'FB10_S3R'], ['FB01_S4R', 'FB02_S4R', 'FB03_S4R', 'FB04_S4R', 'FB05_S4R', 'FB06_S4R', 'FB07_S4R', 'FB08_S4R', 'FB09_S4R', 'FB10_S4R']]
-        
-        # sensor, toroidal location
-#        self.phi=_np.pi/180.*_np.array([242.5-360, 278.5-360, 314.5-360, 350.5-360, 26.5, 62.5, 98.5, 134.5, 170.5, 206.5]);#*_np.pi/180.
-        phi=_np.pi/180.*_np.array([241,277,313,349,25,61, 97,133,169,205])
-        phi=[phi,phi,phi,phi]
-        theta=_np.pi/180.*_np.array([_np.ones(10)*(-83.4),_np.ones(10)*(-29.3),_np.ones(10)*29.3,_np.ones(10)*83.4])
-        theta=[theta[0,:],theta[1,:],theta[2,:],theta[3,:]]
-        
-        ## construct full sensor addresses 
-        fbPolSensorAddresses=[[],[],[],[]]
-        fbRadSensorAddresses=[[],[],[],[]]   
-        rootAddress='\HBTEP2::TOP.SENSORS.MAGNETIC:';
-        for j in range(0,4):
-            for i in range(0,len(fbPolNames[j])):
-                fbPolSensorAddresses[j].append(rootAddress+fbPolNames[j][i])
-                fbRadSensorAddresses[j].append(rootAddress+self.fbRadNames[j][i])
-        
-        # get raw data
-        fbPolRaw=[[],[],[],[]];
-        fbPolRaw[0], self.fbPolTime =mdsData(shotno,fbPolSensorAddresses[0], tStart, tStop)
-        fbPolRaw[1], self.fbPolTime =mdsData(shotno,fbPolSensorAddresses[1], tStart, tStop)
-        fbPolRaw[2], self.fbPolTime =mdsData(shotno,fbPolSensorAddresses[2], tStart, tStop)
-        fbPolRaw[3], self.fbPolTime =mdsData(shotno,fbPolSensorAddresses[3], tStart, tStop)
-
-        self.fbRadRaw=[[],[],[],[]];
-        self.fbRadRaw[0], self.fbRadTime =mdsData(shotno,fbRadSensorAddresses[0], tStart, tStop)
-        self.fbRadRaw[1], self.fbRadTime =mdsData(shotno,fbRadSensorAddresses[1], tStart, tStop)
-        self.fbRadRaw[2], self.fbRadTime =mdsData(shotno,fbRadSensorAddresses[2], tStart, tStop)
-        self.fbRadRaw[3], self.fbRadTime =mdsData(shotno,fbRadSensorAddresses[3], tStart, tStop)        
-               
-        # remove bad/broken sensors using a sigma=1 outlier rejection method
-        if removeBadSensors==True:
-            linArrayOfSensorData=[]
-            linListOfSensorNames=[]
-            for i in range(0,4):
-                for j in range(0,len(fbPolNames[i])):
-                    linArrayOfSensorData.append(_np.average(_np.abs(fbPolRaw[i][j])))
-                    linListOfSensorNames.append(fbPolNames[i][j])
-            temp,indicesOfGoodSensors=_process.rejectOutliers(_np.array(linArrayOfSensorData),sigma=1.0)
-            indicesOfBadSensors = indicesOfGoodSensors==False
-            self.badSensors=_np.array(linListOfSensorNames)[indicesOfBadSensors]
-            self.fbPolNames=[[],[],[],[]]
-            self.fbPolRaw=[[],[],[],[]];
-            self.phi=[[],[],[],[]];
-            self.theta=[[],[],[],[]];
-            for j in range(0,4):
-                for i in range(0,len(fbPolNames[j])):
-                    if fbPolNames[j][i] not in self.badSensors:
-                        self.fbPolRaw[j].append(fbPolRaw[j][i])
-                        self.fbPolNames[j].append(fbPolNames[j][i])
-                        self.theta[j].append(theta[j][i])
-                        self.phi[j].append(phi[j][i])
-                    else:
-                        print("Removing broken signal: %s" % fbPolNames[j][i])
-        else:
-            self.fbPolNames=fbPolNames
-            self.fbPolRaw=fbPolRaw
-            self.theta=theta
-            self.phi=phi
-
-        # make sure the signals are not inverted
-        if invertNegSignals==True:
-            for i in range(0,4):
-                for j in range(0,len(self.fbPolRaw[i])):
-                    if _np.average(self.fbPolRaw[i][j])<0:
-                        self.fbPolRaw[i][j]*=-1
-                        print("inverting signal %s"%self.fbPolNames[i][j])
-        
-        # remove low-frequency offset (we are only interested in high-freq data)
-        self.fbPolData=[[],[],[],[]]
-        self.fbPolRawFit=[[],[],[],[]]
+        self.tStart = tStart
+        self.tStop = tStop
+        self.removeBadSensors = removeBadSensors
+        self.invertNegSignals = invertNegSignals
+        self.smoothingAlgorithm = smoothingAlgorithm
+        self._loadOptions=_loadOptions()
+        self._meta=_fbMeta()
+        self._polRows={}
+        self._polRowsFiltered={}
+        
+        # radial sensor names
+        meta=_fbMeta(radial=True)
+        self.fbRadNames=[list(meta.index[(meta.Row==j+1).to_numpy()]) for j in range(0,4)]
+        
+        # 2D lists by row (S1 to S4).  each row is computed on first use, and
+        # the data lists hold views of the row's sensorArray
+        self.fbPolNames=_lazyRows(self,lambda fb,j: list(fb._polMeta(j).index),4)
+        self.phi=_lazyRows(self,lambda fb,j: fb._polMeta(j).Phi.to_numpy(),4)
+        self.theta=_lazyRows(self,lambda fb,j: fb._polMeta(j).Theta.to_numpy(),4)
+        self.fbPolRaw=_lazyRows(self,lambda fb,j: fb._polRow(j).rows(),4)
+        self.fbPolData=_lazyRows(self,lambda fb,j: fb._polRowFiltered(j)[0].rows(),4)
+        self.fbPolRawFit=_lazyRows(self,lambda fb,j: fb._polRowFiltered(j)[1].rows(),4)
+        self.fbRadRaw=_lazyRows(self,lambda fb,j: fb.rawRad.rows(fb.fbRadNames[j]),4)
         self.fbRadData=[[],[],[],[]]
         self.fbRadRawFit=[[],[],[],[]]
-        # gaussian filter
-        if smoothingAlgorithm == 'gaussian':
-            for j in range(0,4):
-                for i in range(0,len(self.fbPolNames[j])):
-                    temp,temp2=_process.gaussianHighPassFilter(self.fbPolRaw[j][i][:],self.fbPolTime,timeWidth=1./20000*1.0,plot=False) 
-                    self.fbPolRawFit[j].append(temp2)
-                    self.fbPolData[j].append(temp)
-        # butterworth lfilter
-        elif smoothingAlgorithm == 'butterworth':
-            for j in range(0,4):
-                for i in range(0,len(self.fbPolNames[j])):
-                    temp = _process.butterworthFilter(self.fbPolRaw[j][i][:],self.fbPolTime,cutoffFreq=2e3,filterType='high')
-                    temp2 = _process.butterworthFilter(self.fbPolRaw[j][i][:],self.fbPolTime,cutoffFreq=2e3,filterType='low')
-                    self.fbPolRawFit[j].append(temp2)
-                    self.fbPolData[j].append(temp)        
-        
-        # pandas dataframes 
-        #TODO(John) rewrite entire class.  start with dataframes instead of lists
-        flatten = lambda l: [item for sublist in l for item in sublist]
-        self.dfData=_pd.DataFrame(     data=_np.append(_np.array([self.fbPolTime]).transpose(),_np.array(flatten(self.fbPolData)).transpose(),axis=1),
-                                columns=['Time']+flatten(self.fbPolNames)).set_index('Time')
-        self.dfDataRaw=_pd.DataFrame(     data=_np.append(_np.array([self.fbPolTime]).transpose(),_np.array(flatten(self.fbPolRaw)).transpose(),axis=1),
-                                columns=['Time']+flatten(self.fbPolNames)).set_index('Time')
-        self.dfMeta=_pd.DataFrame(     data={'SensorNames':flatten(self.fbPolNames),
-                                    'Phi':flatten(self.phi),
-                                    'Theta':flatten(self.theta),
-#                                    'Address':dataAddress,
-#                                    'SectionNum':[ ],
-#                                    'RowNum':[1,1,1....2,2,2....,4,4,4,4],
-                                    },
-                                columns=['SensorNames','Phi','Theta']).set_index('SensorNames')#,'Address','SectionNum'])
-        
 
         # plot
         if plot=='sample':
@@ -2481,6 +6671,141 @@ class fbData:
         elif plot == True or plot=='all':
             self.plot(True)
             
+    def _invertNegSignals(self,raw):
+        # make sure the signals are not inverted
+        if self.invertNegSignals==True:
+            i=_np.flatnonzero(raw.data.sum(axis=1)<0)
+            if len(i)>0:
+                raw.data[i]*=-1
+                print("inverting signals %s"%', '.join(raw.meta.index[i]))
+        return raw
+    
+    def _health(self,load=True):
+        """ health of the 40 poloidal sensors (see sensorHealthData), 
+        cached per shot.  (health, raw), raw is None if it was cached """
+        return _cachedSensorHealth(self.shotno,self._meta,self.tStart,self.tStop,
+                                   sigma=1.0,load=load,**self._loadOptions)
+    
+    def load(self):
+        """ downloads and filters the data now.  returns self """
+        self.data
+        self.fit
+        self.rawRad
+        return self
+    
+    @_lazyProperty
+    def _screened(self):
+        if self.removeBadSensors==False:
+            # all poloidal sensors in one call
+            raw=_loadSensorArray(self.shotno,self._meta,self.tStart,self.tStop,
+                                 **self._loadOptions)
+            return self._invertNegSignals(raw), _np.array([],dtype=str)
+        
+        # remove bad/broken sensors using a sigma=1 outlier rejection method.
+        # if the shot has already been checked, only the good sensors are 
+        # downloaded
+        health,raw=self._health()
+        badSensors=health.index[health.Bad.to_numpy()].to_numpy()
+        if len(badSensors)>0:
+            print("Removing broken signals: %s" % ', '.join(badSensors))
+        if raw is None:
+            raw=_loadSensorArray(self.shotno,self._meta.drop(index=badSensors),
+                                 self.tStart,self.tStop,**self._loadOptions)
+        else:
+            raw=raw.drop(badSensors)
+        return self._invertNegSignals(raw), badSensors
+    
+    @_lazyProperty
+    def raw(self):
+        """ raw poloidal data of all rows """
+        return self._screened[0]
+    
+    @_lazyProperty
+    def badSensors(self):
+        """ sensors removed by the outlier rejection.  empty (without 
+        downloading anything) if removeBadSensors is False.  Nothing is 
+        downloaded either if the shot has already been checked """
+        if self.removeBadSensors==False:
+            return _np.array([],dtype=str)
+        health=self._health(load=False)[0]
+        if health is None:
+            return self._screened[1]
+        return health.index[health.Bad.to_numpy()].to_numpy()
+    
+    @_lazyProperty
+    def rawRad(self):
+        """ raw radial data of all rows """
+        return _loadSensorArray(self.shotno,_fbMeta(radial=True),self.tStart,
+                                self.tStop,**self._loadOptions)
+    
+    @_lazyProperty
+    def _filtered(self):
+        # remove low-frequency offset (we are only interested in high-freq data)
+        return _highPassSensorArray(self.raw,self.smoothingAlgorithm)
+    
+    @_lazyProperty
+    def data(self):
+        return self._filtered[0]
+    
+    @_lazyProperty
+    def fit(self):
+        return self._filtered[1]
+    
+    def _polMeta(self,j):
+        """ metadata of row j (0 to 3) """
+        meta=self._meta.drop(index=self.badSensors)
+        return meta[(meta.Row==j+1).to_numpy()]
+    
+    def _polRow(self,j):
+        """ 
+        raw data of row j (0 to 3).  The row is downloaded on its own unless
+        all rows are already loaded.  With removeBadSensors=True, the first
+        check of a shot compares (and so downloads) all rows 
+        """
+        if j not in self._polRows:
+            meta=self._polMeta(j) # checks the shot first, if needed
+            if '_screened' in self.__dict__ or 'raw' in self.__dict__:
+                self._polRows[j]=self.raw.select(meta.index)
+            else:
+                self._polRows[j]=self._invertNegSignals(
+                        _loadSensorArray(self.shotno,meta,self.tStart,
+                                         self.tStop,**self._loadOptions))
+        return self._polRows[j]
+    
+    def _polRowFiltered(self,j):
+        """ (data, fit) of row j (0 to 3) """
+        if j not in self._polRowsFiltered:
+            if '_filtered' in self.__dict__:
+                names=self._polMeta(j).index
+                self._polRowsFiltered[j]=(self.data.select(names),self.fit.select(names))
+            else:
+                self._polRowsFiltered[j]=_highPassSensorArray(self._polRow(j),self.smoothingAlgorithm)
+        return self._polRowsFiltered[j]
+    
+    @_lazyProperty
+    def fbPolTime(self):
+        # all rows share the time base.  use a row that is already loaded
+        if len(self._polRows)>0:
+            return list(self._polRows.values())[0].time
+        return self.raw.time
+    
+    @_lazyProperty
+    def fbRadTime(self):
+        return self.rawRad.time
+    
+    # pandas dataframes (views of raw and data)
+    @_lazyProperty
+    def dfData(self):
+        return self.data.toDataFrame()
+    
+    @_lazyProperty
+    def dfDataRaw(self):
+        return self.raw.toDataFrame()
+    
+    @_lazyProperty
+    def dfMeta(self):
+        return self._meta.drop(index=self.badSensors)
+            
     def plotOfFBPolStripey(self,tStart=2e-3,tStop=4e-3,sensorArray='S4P'):
         # grab and trim data to desired time rane
         iStart=_process.findNearest(self.fbPolTime,tStart)
@@ -2628,6 +6953,20 @@ class taData:
     taRadRawFit : list (of numpy.ndarray)
         fit of raw radial-TA sensor data.  subtract this from taRadRaw to get
         taRadData
+    raw : sensorArray
+        raw poloidal-TA data.  taPolRaw holds views of its rows
+    rawRad : sensorArray
+        raw radial-TA data
+    data : sensorArray
+        poloidal-TA data, processed
+    fit : sensorArray
+        fit of raw poloidal-TA data
+        
+    Notes
+    -----
+    The data attributes are computed the first time they are accessed, so 
+    only what is used is downloaded.  The radial sensors are only downloaded
+    if taRadRaw or rawRad is used.
         
     Subfunctions
     ------------
@@ -2636,6 +6975,8 @@ class taData:
         index
     plot :
         plots all relevant datas
+    load :
+        downloads and filters the data now instead of on first use
 
     """
         
@@ -2650,75 +6991,22 @@ class taData:
         self.title = "%d, TA sensor data." % shotno
         self.badSensors=[] # no bad sensors as of present
         
-        # names of poloidal and radial sensors
-        self.namesTAPol=['TA01_S1P', 'TA01_S2P', 'TA01_S3P', 'TA02_S1P', 'TA02_S2P', 'TA02_S3P', 'TA03_S1P', 'TA03_S2P', 'TA03_S3P', 'TA04_S1P', 'TA04_S2P', 'TA04_S3P', 'TA05_S1P', 'TA05_S2P', 'TA05_S3P', 'TA06_S1P', 'TA06_S2P', 'TA06_S3P', 'TA07_S1P', 'TA07_S2P', 'TA07_S3P', 'TA08_S1P', 'TA08_S2P', 'TA08_S3P', 'TA09_S1P', 'TA09_S2P', 'TA09_S3P', 'TA10_S1P', 'TA10_S2P', 'TA10_S3P'];
-        self.namesTARad=['TA01_S2R', 'TA02_S2R', 'TA03_S2R', 'TA04_S2R', 'TA05_S2R', 'TA06_S2R', 'TA07_S2R', 'TA08_S2R', 'TA09_S2R', 'TA10_S2R']
-        
-        # toroidal locations for the poloidal measurements
-        self.phi=_np.pi/180.*_np.array([241.5,250.5,259.5,277.5,286.5,295.5,313.5,322.5,331.5,349.5,358.5,7.5,25.5,34.5,43.5,61.5,70.5,79.5,97.5,106.5,115.5,133.5,142.5,151.5,169.5,178.5,187.5,205.5,214.5,223.5])    
-        
-        # poloidal locations of sensors
-        self.theta=_np.ones(len(self.phi))*(189-360)*_np.pi/180
-        
-#        # toroidal locations for the radial measurements
-#        self.phiR=_np.pi/180.*_np.array([-108.,  -72.,  -36.,    0.,   36.,   72.,  108.,  144.,  180.,  216.])
-        
-        # compile full sensor addresses names
-        taPolSensorAddresses=[]
-        taRadSensorAddresses=[]    
-        rootAddress='\HBTEP2::TOP.SENSORS.MAGNETIC:';
-        for i in range(0,30):
-            taPolSensorAddresses.append(rootAddress+self.namesTAPol[i])
-            if i < 10:
-                taRadSensorAddresses.append(rootAddress+self.namesTARad[i])
-                
-        # get raw data
-        self.taPolRaw,self.taPolTime=mdsData(shotno,taPolSensorAddresses, tStart, tStop)
-        self.taRadRaw,self.taRadTime=mdsData(shotno,taRadSensorAddresses, tStart, tStop)
-          
-        # data smoothing algorithm
-        self.taPolData=[]
-        self.taPolRawFit=[]
+        self.tStart = tStart
+        self.tStop = tStop
+        self.smoothingAlgorithm = smoothingAlgorithm
+        self._loadOptions=_loadOptions()
+        
+        # names and locations
+        meta=_taMeta()
+        self.namesTAPol=list(meta.index)
+        self.namesTARad=list(_taMeta(radial=True).index)
+        self.phi=meta.Phi.to_numpy()
+        self.theta=meta.Theta.to_numpy()
         self.taRadData=[]
         self.taRadRawFit=[]
-        
-        # high pass filter the measurements
-        if smoothingAlgorithm == 'gaussian':
-            for i in range(0,30):
-                temp,temp2=_process.gaussianHighPassFilter(self.taPolRaw[i][:],self.taPolTime,timeWidth=1./20000)
-                self.taPolData.append(temp)
-                self.taPolRawFit.append(temp2)
-        elif smoothingAlgorithm == 'butterworth':
-            for i in range(0,30):
-                temp = _process.butterworthFilter(self.taPolRaw[i][:],self.taPolTime,cutoffFreq=2e3,filterType='high')
-                temp2 = _process.butterworthFilter(self.taPolRaw[i][:],self.taPolTime,cutoffFreq=2e3,filterType='low')
-                self.taPolData.append(temp)
-                self.taPolRawFit.append(temp2)            
-            
-        # pandas dataframes 
-        #TODO(John) rewrite entire class.  start with dataframes instead of lists
-        self.dfData=_pd.DataFrame(     data=_np.append(_np.array([self.taPolTime]).transpose(),_np.array(self.taPolData).transpose(),axis=1),
-                                columns=['Time']+self.namesTAPol).set_index('Time')
-        self.dfDataRaw=_pd.DataFrame(     data=_np.append(_np.array([self.taPolTime]).transpose(),_np.array(self.taPolRaw).transpose(),axis=1),
-                                columns=['Time']+self.namesTAPol).set_index('Time')
-        self.dfMeta=_pd.DataFrame(     data={'SensorNames':self.namesTAPol,
-                                    'Phi':self.phi,
-                                    'Theta':self.theta,
-                                    'Address':taPolSensorAddresses,
-                                    'SectionNum':_np.array([ 1,  1,  1,  2,  2,  2,  3,  3,  3,  4,  4,  4,  5,  5,  5,  6,  6,
-                                                           6,  7,  7,  7,  8,  8,  8,  9,  9,  9, 10, 10, 10]),
-                                    'CenterSensor':[False,  True, False, False,  True, False, False,  True, False,
-                                                   False,  True, False, False,  True, False, False,  True, False,
-                                                   False,  True, False, False,  True, False, False,  True, False,
-                                                   False,  True, False],
-                                    },
-                                columns=['SensorNames','Phi','Theta','Address','SectionNum','CenterSensor']).set_index('SensorNames')#,'Address','SectionNum'])
-        
-
-        if removeBadSensors==True:
-            self.dfData=self.dfData.drop(columns=self.badSensors)
-            self.dfDataRaw=self.dfDataRaw.drop(columns=self.badSensors)
-            self.dfMeta=self.dfMeta.drop(index=self.badSensors)
+        self._meta=meta
+        self._removed=self.badSensors if removeBadSensors==True else []
+        self.dfMeta=meta.drop(index=self._removed)
 
         # plot
         if plot=='sample':
@@ -2726,6 +7014,72 @@ class taData:
         elif plot==True or plot=='all':
             self.plot(True);
             
+    def load(self):
+        """ downloads and filters the data now.  returns self """
+        self.data
+        self.fit
+        self.rawRad
+        return self
+    
+    @_lazyProperty
+    def raw(self):
+        """ raw poloidal data, downloaded in one call """
+        return _loadSensorArray(self.shotno,self._meta,self.tStart,self.tStop,
+                                **self._loadOptions)
+    
+    @_lazyProperty
+    def rawRad(self):
+        """ raw radial data, downloaded in one call """
+        return _loadSensorArray(self.shotno,_taMeta(radial=True),self.tStart,
+                                self.tStop,**self._loadOptions)
+    
+    @_lazyProperty
+    def _filtered(self):
+        # high pass filter the measurements
+        return _highPassSensorArray(self.raw,self.smoothingAlgorithm)
+    
+    @_lazyProperty
+    def data(self):
+        return self._filtered[0]
+    
+    @_lazyProperty
+    def fit(self):
+        return self._filtered[1]
+    
+    # the data lists hold views of raw, data and fit
+    @_lazyProperty
+    def taPolTime(self):
+        return self.raw.time
+    
+    @_lazyProperty
+    def taRadTime(self):
+        return self.rawRad.time
+    
+    @_lazyProperty
+    def taPolRaw(self):
+        return self.raw.rows()
+    
+    @_lazyProperty
+    def taPolData(self):
+        return self.data.rows()
+    
+    @_lazyProperty
+    def taPolRawFit(self):
+        return self.fit.rows()
+    
+    @_lazyProperty
+    def taRadRaw(self):
+        return self.rawRad.rows()
+    
+    # pandas dataframes (views of the same arrays, unless sensors are removed)
+    @_lazyProperty
+    def dfData(self):
+        return self.data.drop(self._removed).toDataFrame()
+    
+    @_lazyProperty
+    def dfDataRaw(self):
+        return self.raw.drop(self._removed).toDataFrame()
+            
     # TODO Add plotOfSingleRad function
             
     def plotOfTAStripey(self,tStart=2e-3,tStop=4e-3):
@@ -2870,74 +7224,20 @@ def taData_df(shotno=98173,
 
     """
     
-    shotno = shotno
-#    title = "%d, TA sensor data." % shotno
     badSensors=[] # no bad sensors as of present
     
-    # names of poloidal and radial sensors
-    namesTAPol=['TA04_S3P', 'TA05_S1P', 'TA05_S2P', 'TA05_S3P', 'TA06_S1P', 'TA06_S2P', 'TA06_S3P', 'TA07_S1P', 'TA07_S2P', 'TA07_S3P', 'TA08_S1P', 'TA08_S2P', 'TA08_S3P', 'TA09_S1P', 'TA09_S2P', 'TA09_S3P', 'TA10_S1P', 'TA10_S2P', 'TA10_S3P','TA01_S1P', 'TA01_S2P', 'TA01_S3P', 'TA02_S1P', 'TA02_S2P', 'TA02_S3P', 'TA03_S1P', 'TA03_S2P', 'TA03_S3P', 'TA04_S1P', 'TA04_S2P'];
-    namesTARad=['TA01_S2R', 'TA02_S2R', 'TA03_S2R', 'TA04_S2R', 'TA05_S2R', 'TA06_S2R', 'TA07_S2R', 'TA08_S2R', 'TA09_S2R', 'TA10_S2R']
-    
-    # toroidal locations for the poloidal measurements
-    phi=_np.pi/180.*_np.array([7.5,25.5,34.5,43.5,61.5,70.5,79.5,97.5,106.5,115.5,133.5,142.5,151.5,169.5,178.5,187.5,205.5,214.5,223.5,241.5,250.5,259.5,277.5,286.5,295.5,313.5,322.5,331.5,349.5,358.5])    
-    
-    # poloidal locations of sensors
-    theta=_np.ones(len(phi))*(189-360)*_np.pi/180
-    
-#        # toroidal locations for the radial measurements
-#        phiR=_np.pi/180.*_np.array([-108.,  -72.,  -36.,    0.,   36.,   72.,  108.,  144.,  180.,  216.])
-    
-    # compile full sensor addresses names
-    taPolSensorAddresses=[]
-    taRadSensorAddresses=[]    
-    rootAddress='\HBTEP2::TOP.SENSORS.MAGNETIC:';
-    for i in range(0,30):
-        taPolSensorAddresses.append(rootAddress+namesTAPol[i])
-        if i < 10:
-            taRadSensorAddresses.append(rootAddress+namesTARad[i])
-            
-    # get raw data
-    taPolRaw,taPolTime=mdsData(shotno,taPolSensorAddresses, tStart, tStop)
-    taRadRaw,taRadTime=mdsData(shotno,taRadSensorAddresses, tStart, tStop)
-      
-    # data smoothing algorithm
-    taPolData=[]
-    taPolRawFit=[]
-    taRadData=[]
-    taRadRawFit=[]
-    
-    # high pass filter the measurements
-    for i in range(0,30):
-        temp,temp2=_process.gaussianHighPassFilter(taPolRaw[i][:],taPolTime,timeWidth=1./20000)
-        taPolData.append(temp)
-        taPolRawFit.append(temp2)
-        
-    # pandas dataframes 
-    #TODO(John) rewrite entire class.  start with dataframes instead of lists
-    dfData=_pd.DataFrame(     data=_np.append(_np.array([taPolTime]).transpose(),_np.array(taPolData).transpose(),axis=1),
-                            columns=['Time']+namesTAPol).set_index('Time')
-    dfDataRaw=_pd.DataFrame(     data=_np.append(_np.array([taPolTime]).transpose(),_np.array(taPolRaw).transpose(),axis=1),
-                            columns=['Time']+namesTAPol).set_index('Time')
-    dfMeta=_pd.DataFrame(     data={'SensorNames':namesTAPol,
-                                'Phi':phi,
-                                'Theta':theta,
-                                'Address':taPolSensorAddresses,
-                                'SectionNum':_np.array([ 1,  1,  1,  2,  2,  2,  3,  3,  3,  4,  4,  4,  5,  5,  5,  6,  6,
-                                                       6,  7,  7,  7,  8,  8,  8,  9,  9,  9, 10, 10, 10]),
-                                'CenterSensor':[False,  True, False, False,  True, False, False,  True, False,
-                                               False,  True, False, False,  True, False, False,  True, False,
-                                               False,  True, False, False,  True, False, False,  True, False,
-                                               False,  True, False],
-                                },
-                            columns=['SensorNames','Phi','Theta','Address','SectionNum','CenterSensor']).set_index('SensorNames')#,'Address','SectionNum'])
-    
-
+    # names, locations and addresses of the poloidal sensors, ordered by 
+    # toroidal angle (TA04_S3P first)
+    meta=_taMeta().sort_values('Phi')
     if removeBadSensors==True:
-        dfData=dfData.drop(columns=badSensors)
-        dfDataRaw=dfDataRaw.drop(columns=badSensors)
-        dfMeta=dfMeta.drop(index=badSensors)
-
-    return dfData,dfDataRaw,dfMeta
+        meta=meta.drop(index=badSensors)
+            
+    # get raw data and high pass filter the measurements
+    raw=_loadSensorArray(shotno,meta,tStart,tStop)
+    data,fit=_highPassSensorArray(raw)
+        
+    # pandas dataframes (views of the sensorArrays)
+    return data.toDataFrame(),raw.toDataFrame(),meta
 
 
 @_prepShotno
@@ -3098,8 +7398,8 @@ class quartzJumperData:
         self.theta=_np.array([0,0,0,0])
         
         # pandas dataframes
-        self.dfData=_pd.DataFrame(     data=_np.array((time,data[0],data[1],data[2],data[3],data[4],data[5])).transpose(),
-                                columns=['Time','Jumper9_10','Jumper3_4','Jumper10_1','Jumper5_6','WestRackGround','NorthRackGround']).set_index('Time')
+        self.dfData=_timeFrame(data[0:6],time,
+                               ['Jumper9_10','Jumper3_4','Jumper10_1','Jumper5_6','WestRackGround','NorthRackGround'])
         self.dfMeta=_pd.DataFrame(     data={'SensorNames':['Jumper9_10','Jumper3_4','Jumper10_1','Jumper5_6','WestRackGround','NorthRackGround'],
                                     'Phi':_np.array([198,342,234,54,0,0])*_np.pi/180.,
                                     'Theta':_np.array([0,0,0,0,0,0]),
@@ -3238,19 +7538,38 @@ class usbSpectrometerData:
         
         # get data
         dataAddressRoot = '\HBTEP2::TOP.SENSORS.USB_SPECTROM:SPECTRUM_'
+        dataAddress=['%s%02d' % (dataAddressRoot, i) for i in range(1,11)]
+        
+        # only fetch the channels that hold data.  if the probe itself 
+        # fails, try every channel
+        try:
+            hasData=list(probeNodes(shotno,dataAddress,timeBase=False)['hasData'])
+        except Exception:
+            hasData=[True]*len(dataAddress)
+        channels=[i for i in range(1,11) if hasData[i-1]]
+        
+        # fetch the populated channels in one call.  if that fails, fall 
+        # back to fetching them one at a time so that a single bad channel 
+        # only drops that channel
         self.spectrometerArrayNumber=[]
         self.spectrometerData=[]
+        try:
+            if len(channels)>0:
+                data, _=mdsData(shotno=shotno,
+                                dataAddress=[dataAddress[i-1] for i in channels])
+                self.spectrometerData=list(data)
+            self.spectrometerArrayNumber=channels
+        except Exception:
+            for i in channels:
+                try:
+                    data, _=mdsData(shotno=shotno,
+                                    dataAddress=dataAddress[i-1])
+                    self.spectrometerArrayNumber.append(i)
+                    self.spectrometerData.append(data[0])
+                except Exception:
+                    pass
         for i in range(1,11):
-            if i < 10:
-                dataAddress='%s0%d' % (dataAddressRoot, i)
-            else:
-                dataAddress='%s%d' % (dataAddressRoot, i)
-            try:
-                data, xData=mdsData(shotno=shotno,
-                                    dataAddress=dataAddress)
-                self.spectrometerArrayNumber.append(i)
-                self.spectrometerData.append(data[0])
-            except:# _mds.MdsIpException:
+            if i not in self.spectrometerArrayNumber:
                 print("usb spectrometer channel %d data does not exist for shot number %d" % (i, shotno))
         
         self.spectrometerArrayNumber=_np.array(self.spectrometerArrayNumber)
@@ -3329,6 +7648,9 @@ class solData:
         Raw SOL data (prior to offset subtraction)
     time : numpy.ndarray
         time data
+    raw, data, fit : sensorArray
+        raw data, data with offset subtracted and fits.  solDataRaw, solData
+        and solDataFit hold views of their rows
         
     Subfunctions 
     ------------
@@ -3346,41 +7668,31 @@ class solData:
         # initialize
         self.shotno = shotno
         self.title = "%d, SOL Data" % shotno
-        self.sensorNames = ['LFS01_S1', 'LFS01_S2', 'LFS01_S3', 'LFS01_S4', 'LFS01_S5', 'LFS01_S6', 'LFS01_S7', 'LFS01_S8', 'LFS04_S1', 'LFS04_S2', 'LFS04_S3', 'LFS04_S4', 'LFS08_S1', 'LFS08_S2', 'LFS08_S3', 'LFS08_S4', 'LFS08_S5', 'LFS08_S6', 'LFS08_S7', 'LFS08_S8']
-        self.phis=_np.array([234.8, 234.8, 234.8, 234.8, 234.8, 234.8, 234.8, 234.8, 342.8, 342.8, 342.8, 342.8, 126.8, 126.8, 126.8, 126.8, 126.8, 126.8, 126.8, 126.8])
-        self.thetas=_np.array([-70. , -50. , -30. , -10. ,  10. ,  30. ,  50. ,  70. , -83. ,       -28.2,  28.2,  83. , -70. , -50. , -30. , -10. ,  10. ,  30. ,  50. ,  70. ])
-        sensorPathRoot='\HBTEP2::TOP.SENSORS.SOL:'
-        
-        # compile list of sensor addresses for all 20 SOL tiles
-        sensorAddress=[]
-        for i in range(0,len(self.sensorNames)):
-            sensorAddress.append(sensorPathRoot+'%s' % self.sensorNames[i]) 
+        # names, locations (degrees) and addresses of all 20 SOL tiles
+        self.dfMeta=_registryMeta('SOL').drop(columns='SectionNum')
+        self.sensorNames=list(self.dfMeta.index)
+        self.phis=_np.degrees(self.dfMeta.Phi.to_numpy())
+        self.thetas=_np.degrees(self.dfMeta.Theta.to_numpy())
             
         # get raw data from the tree
-        self.solDataRaw, self.time=mdsData(shotno=shotno,
-                              dataAddress=sensorAddress,
+        data, self.time=mdsData(shotno=shotno,
+                              dataAddress=list(self.dfMeta.Address),
                               tStart=tStart, tStop=tStop)
+        self.raw=sensorArray(data,self.time,self.dfMeta)
                               
-        # subtract offset from sensors
-        self.solDataFit=[]
-        self.solData=[]
-        for i in range(0,len(self.sensorNames)):
-            temp,temp2=_process.gaussianHighPassFilter(self.solDataRaw[i],self.time,timeWidth=1./20000,plot=False)
-            self.solData.append(temp)
-            self.solDataFit.append(temp2)
+        # subtract offset from all sensors at once
+        data,fit=_process.gaussianHighPassFilter(self.raw.data,self.time,timeWidth=1./20000,plot=False,axis=1)
+        self.data=self.raw.like(data)
+        self.fit=self.raw.like(fit)
+        self.solDataRaw=self.raw.rows()
+        self.solData=self.data.rows()
+        self.solDataFit=self.fit.rows()
             
         # pandas dataframes
-        self.dfData=_pd.DataFrame(     data=_np.append(_np.array([self.time]).transpose(),_np.array(self.solData).transpose(),axis=1),
-                                columns=['Time']+self.sensorNames).set_index('Time')
-        self.dfMeta=_pd.DataFrame(     data={'SensorNames':self.sensorNames,
-                                    'Phi':self.phis*_np.pi/180,
-                                    'Theta':self.thetas*_np.pi/180,
-                                    'Address':sensorAddress},
-                                columns=['SensorNames','Phi','Theta','Address']).set_index('SensorNames')
+        self.dfData=self.data.toDataFrame()
         self.dfData['AllTotal']=self.dfData.sum(axis=1)
-        self.dfData['S01Total']=self.dfData.iloc[:,self.dfData.columns.str.contains('S01')].sum(axis=1)
-        self.dfData['S04Total']=self.dfData.iloc[:,self.dfData.columns.str.contains('S04')].sum(axis=1)
-        self.dfData['S08Total']=self.dfData.iloc[:,self.dfData.columns.str.contains('S08')].sum(axis=1)
+        for section in [1,4,8]:
+            self.dfData['S%.2dTotal'%section]=self.data.group('LFS%.2d'%section).data.sum(axis=0)
         
         # optional plotting    
         if plot == True:
@@ -3975,11 +8287,8 @@ def plasmaRadiusData_df(shotno=95782,tStart=_TSTART,tStop=_TSTOP, plot=False, pr
     inwardLimitedIndices=majorRadius < (0.92 - 0.01704)   
     minorRadius[inwardLimitedIndices] = majorRadius[inwardLimitedIndices] - 0.75296 # inward limited
     
-    dfData=_pd.DataFrame()
-    dfData['time']=time
-    dfData['minorRadius']=minorRadius
-    dfData['majorRadius']=majorRadius
-    dfData=dfData.set_index('time')
+    dfData=_timeFrame([minorRadius,majorRadius],time,
+                      ['minorRadius','majorRadius'],indexName='time')
     
     return dfData
 #    
@@ -4086,7 +8395,7 @@ def checkBlackList_depricated(inData,inName):
     Otherwise, returns original data # and a false boolean.
     
     """
-    if inName in _SENSORBLACKLIST==True:
+    if inName in _SENSORBLACKLIST:
         outData=_np.zeros(inData.size);
     else:
         outData=inData;
@@ -4274,12 +8583,8 @@ class nModeData:
         self.n1PhaseRaw=temp[3]
         self.n1Freq=temp[4]
         
-        self.dfData=_pd.DataFrame(     data=_np.concatenate((    [_np.array(self.time)],
-                                                    [_np.array(self.n1Amp).transpose()],
-                                                    [_np.array(self.n1Phase).transpose()],
-                                                    [_np.array(self.n1PhaseRaw).transpose()],
-                                                    [_np.array(self.n1Freq).transpose()])).transpose(),
-                                columns=['Time','n1Amp','n1Phase','n1PhaseRaw','n1Freq']).set_index('Time')
+        self.dfData=_timeFrame([self.n1Amp,self.n1Phase,self.n1PhaseRaw,self.n1Freq],
+                               self.time,['n1Amp','n1Phase','n1PhaseRaw','n1Freq'])
         self.dfMeta=_pd.DataFrame() # intentionally left empty
 
         
@@ -4705,11 +9010,12 @@ def nModeData_df(shotno=96530,tStart=_TSTART,tStop=_TSTOP,plot=False,
         phi=temp.phi
 #            [n,m]=_np.shape(data)
     elif nModeSensor=='FB' or nModeSensor=='FB_S4':
+        # the screened S4P row.  the sensor health is cached per shot, so 
+        # after the first check only this row is downloaded (see fbData)
         fb=fbData(shotno,tStart,tStop)
-        time=fb.dfData.index.to_numpy()
-        b=fb.dfData.iloc[:,fb.dfData.columns.str.contains('S4P')].to_numpy()
-        b=b.transpose()
-        phi=fb.dfMeta[fb.dfMeta.index.str.contains('S4P')].Phi.to_numpy()
+        b=_np.array(fb.fbPolData[3])
+        time=fb.fbPolTime
+        phi=_np.array(fb.phi[3])
     
     if method=='leastSquares':
         n=len(phi)
@@ -4836,69 +9142,82 @@ def nModeData_df(shotno=96530,tStart=_TSTART,tStop=_TSTOP,plot=False,
     return dfResults
 
 
-def loadAllMagData(shotno):
+@_prepShotno
+def magneticsData(shotno=98170,tStart=_TSTART,tStop=_TSTOP,
+                  removeBadSensors=True):
     """
-    Downloads all TA, FB, and PA data into a single dataframe for data and another
-    for meta data
+    Downloads all poloidal TA, PA and FB sensors with a single mdsData call 
+    (one connection, one time base) and high pass filters them.
     
-    #TODO
+    Parameters
+    ----------
+    shotno : int
+        shot number of desired data
+    tStart : float
+        time (in seconds) to trim data before
+        default is 0 ms
+    tStop : float
+        time (in seconds) to trim data after
+        default is 10 ms
+    removeBadSensors : bool
+        removes the known bad PA and FB sensors (see paData_df and fbData_df)
+        default is True
+        
+    Returns
+    -------
+    data : sensorArray
+        high pass filtered data of all sensors, a single (sensors x time) 
+        matrix
+    raw : sensorArray
+        raw data of all sensors
+        
+    Notes
     -----
-    taData_df, fbData_df, paData_df need to operating the same way.
-    """
-    
-    taData,_,taMeta=taData_df(shotno)
-    fbData,fbMeta=fbData_df(shotno)
-    fbData=fbData.iloc[:,_np.invert(fbData.columns.str.contains('RAW'))]
-    paData,_,paMeta=paData_df(shotno)
-    
-    dfDataAll=_pd.concat((taData,paData,fbData),axis=1)
-    dfMetaAll=_pd.concat((taMeta,paMeta,fbMeta))
-    
-    for i,(key,val) in enumerate(dfMetaAll.iterrows()):
-        if 'FB' in val.name:
-            dfMetaAll.at[key,'marker']=u'^'
-        elif 'TA' in val.name:
-            dfMetaAll.at[key,'marker']=u'v'
-        elif 'PA1' in val.name:
-            dfMetaAll.at[key,'marker']=u'>'
-        elif 'PA2' in val.name:
-            dfMetaAll.at[key,'marker']=u'<'
-            
-    return dfDataAll,dfMetaAll
+    The sensors are ordered TA, PA and then FB (see _magMeta).  meta has the
+    columns Phi, Theta, Address, SectionNum and marker.  
+    
+    The TA and PA sensors are filtered as in taData_df and paData_df, and the
+    FB sensors as in fbData_df.  Each group is filtered in one call, written 
+    into the same output matrix.
+    
+    Example
+    -------
+    ::
+        
+        data,raw=magneticsData(96530)
+        data.toDataFrame()
+        data.meta
+    """
+    meta=_magMeta(removeBadSensors)
+    raw=_loadSensorArray(shotno,meta,tStart,tStop)
+    
+    # filter each group of rows along the time axis
+    isFB=meta.index.str.startswith('FB')
+    nTAPA=len(meta)-isFB.sum()
+    data=_np.empty_like(raw.data)
+    data[:nTAPA]=_process.gaussianHighPassFilter(raw.data[:nTAPA],raw.time,timeWidth=1./20000,axis=1)[0]
+    data[nTAPA:]=_process.gaussianFilter(raw.time,raw.data[nTAPA:],timeFWHM=5e-4,filterType='high',plot=False,axis=1)
+    
+    return raw.like(data),raw
+
+
+def loadAllMagData(shotno):
+    """
+    Downloads all TA, FB, and PA data into a single dataframe for data and another
+    for meta data.  See magneticsData
+    """
+    data,raw=magneticsData(shotno)
+    return data.toDataFrame(),data.meta
 
 
 
 def loadAllRawMagData(shotno):
     """
-    Downloads all TA, FB, and PA data into a single dataframe for data and another
-    for meta data
-    
-    #TODO
-    -----
-    taData_df, fbData_df, paData_df need to operating the same way.
-    """
-    
-    taData,taDataRaw,taMeta=taData_df(shotno)
-    fbDataAll,fbMeta=fbData_df(shotno)
-    fbData=fbDataAll.iloc[:,_np.invert(fbDataAll.columns.str.contains('RAW'))]
-    fbDataRaw=fbDataAll.iloc[:,fbDataAll.columns.str.contains('RAW')]
-    fbDataRaw.columns =fbData.columns.to_numpy().tolist()
-    paData,paDataRaw,paMeta=paData_df(shotno)
-    
-    dfDataAll=_pd.concat((taDataRaw,paDataRaw,fbDataRaw),axis=1)
-    dfMetaAll=_pd.concat((taMeta,paMeta,fbMeta))
-    
-    for i,(key,val) in enumerate(dfMetaAll.iterrows()):
-        if 'FB' in val.name:
-            dfMetaAll.at[key,'marker']=u'^'
-        elif 'TA' in val.name:
-            dfMetaAll.at[key,'marker']=u'v'
-        elif 'PA1' in val.name:
-            dfMetaAll.at[key,'marker']=u'>'
-        elif 'PA2' in val.name:
-            dfMetaAll.at[key,'marker']=u'<'
-            
-    return dfDataAll,dfMetaAll
+    Downloads all TA, FB, and PA raw data into a single dataframe for data and 
+    another for meta data.  See magneticsData
+    """
+    raw=_loadSensorArray(shotno,_magMeta())
+    return raw.toDataFrame(),raw.meta
 
 
 
@@ -4959,13 +9278,8 @@ class mModeData_df:
         self.title = '%d.  %s sensor array.  n mode analysis' % (shotno,mModeSensor)
 #        self.nModeSensor=nModeSensor    
         
-        data=paData(shotno,tStart=tStart,tStop=tStop)
-        dfPA=data.dfData
-        dfMeta=data.dfMeta
-        
-        dfPA=dfPA.iloc[:,dfPA.columns.str.contains(mModeSensor)]
-        dfMeta=dfMeta.iloc[dfMeta.index.str.contains(mModeSensor)]
-        theta=dfMeta['Theta'].to_numpy()
+        pa=paData(shotno,tStart=tStart,tStop=tStop).data.group(mModeSensor)
+        theta=pa.meta['Theta'].to_numpy()
 #        Lambda=0.1
         
         def thetaStarCalc(theta, L=0):
@@ -4977,10 +9291,10 @@ class mModeData_df:
         
         theta=thetaStarCalc(theta,Lambda)
         
-        b=dfPA.to_numpy()
+        b=pa.data.transpose()
         self._data=b
         
-        time=dfPA.index.to_numpy()
+        time=pa.time
         
         if method=='leastSquares':
             n=len(theta)
@@ -5272,14 +9586,14 @@ class mModeData:
                     correctTheta=correctTheta, smoothingAlgorithm=smoothingAlgorithm);
         if sensor=='PA1':
             #self._data=data.pa1Data # Non pandas
-            self._data=data.dfData.filter(regex="PA1_*").to_numpy().transpose()
+            self._data=data.data.group('PA1').data
             self.time=data.pa1Time
             self._theta=data.thetaPA1
             self._phi=data.phiPA1 # Account for torroidal location, implicitly assume n = 1 dominant structure
             [n,m]=_np.shape(self._data)
         if sensor=='PA2':
             #self._data=data.pa2Data
-            self._data=data.dfData.filter(regex="PA2_*").to_numpy().transpose()
+            self._data=data.data.group('PA2').data
             self.time=data.pa2Time
             self._theta=data.thetaPA2
             self._phi=data.phiPA2
@@ -5990,22 +10304,22 @@ class metadata:
     def __init__(self,shotno=96530, display=False):
         
         self.shotno = shotno
-        try:
-            self.comment = mdsData(shotno=shotno, dataAddress=['\HBTEP2::TOP.METADATA:COMMENT'])[0]
-        except:
-            self.comment = ''
-        try:
-            self.date = mdsData(shotno=shotno, dataAddress=['\HBTEP2::TOP.METADATA:DATE'])[0]
-        except:
-            self.date = ''
-        try:
-            self.operator = mdsData(shotno=shotno, dataAddress=['\HBTEP2::TOP.METADATA:OPERATOR'])[0]
-        except:
-            self.operator = ''
-        try:    
-            self.post_comment = mdsData(shotno=shotno, dataAddress=['\HBTEP2::TOP.METADATA:POST_COMMENT'])[0]
-        except:
-            self.post_comment = ''
+        names=['comment','date','operator','post_comment']
+        dataAddress=['\HBTEP2::TOP.METADATA:COMMENT',
+                     '\HBTEP2::TOP.METADATA:DATE',
+                     '\HBTEP2::TOP.METADATA:OPERATOR',
+                     '\HBTEP2::TOP.METADATA:POST_COMMENT']
+        
+        # empty fields are left as ''.  the rest are fetched together
+        info=probeNodes(shotno,dataAddress,timeBase=False)
+        hasData=list(info['hasData'])
+        for name in names:
+            setattr(self,name,'')
+        found=[i for i in range(0,len(names)) if hasData[i]]
+        if len(found)>0:
+            data=mdsData(shotno=shotno, dataAddress=[dataAddress[i] for i in found])
+            for j in range(0,len(found)):
+                setattr(self,names[found[j]],data[j])
             
         if display == True:
             self.show()
@@ -6141,3 +10455,35 @@ def _debugPlotExamplesOfAll():
     sxrData(plot=True)
     
 
+
+def _debugExport(directory=None):
+    """
+    Runs a default exportShots (every diagnostic of _EXPORT_DIAGNOSTICS) of 
+    two synthetic shots and reads each table back.  Raises an exception if
+    any load or write fails or if a table doesn't read back the same.
+    """
+    import tempfile as _tempfile
+    import shutil as _shutil
+    previous=setBackend(syntheticBackend())
+    cleanUp=directory is None
+    if directory is None:
+        directory=_tempfile.mkdtemp()
+    try:
+        shotnos=[100000,100001]
+        errors=exportShots(shotnos,directory=directory)
+        if len(errors)>0:
+            raise RuntimeError("export failed: %s"%errors)
+        for name in _EXPORT_DIAGNOSTICS:
+            tables=_exportTables(globals()[name](shotnos[0]))
+            for table,df in tables.items():
+                read=readExport(directory,name,table,shotno=shotnos[:1])
+                for column in df.columns:
+                    # NaNs count as equal
+                    if not _pd.Series(read[column].to_numpy()).equals(_pd.Series(df[column].to_numpy())):
+                        raise RuntimeError("%s %s: column %s differs"%(name,table,column))
+        print("export ok: %s"%', '.join(_EXPORT_DIAGNOSTICS))
+    finally:
+        setBackend(previous)
+        if cleanUp:
+            _shutil.rmtree(directory,ignore_errors=True)
+    
@@ -56,6 +56,18 @@ def convertDataToStairstepData(x,y):
     return (xOut,yOut)
     
             
+def _floatDtype(y):
+    """
+    The floating point dtype that a filter should return for y.  Floating 
+    point data keeps its precision (e.g. float32 stays float32).  Anything 
+    else (ints, lists, etc) is promoted to float64.
+    """
+    dtype=getattr(y,'dtype',None)
+    if dtype is not None and dtype.kind=='f':
+        return dtype
+    return _np.dtype(_np.float64)
+    
+    
 def findNearest(array,value):
     """
     search through `array` and returns the `index` of the cell closest to the 
@@ -645,7 +657,7 @@ def convolutionSmoothing(data,numPoints,method='gaussian',plot=False):
     return smoothedData
     
 
-def gaussianFilter(t,y,timeFWHM,filterType='high',plot=False,plotGaussian=False):
+def gaussianFilter(t,y,timeFWHM,filterType='high',plot=False,plotGaussian=False,axis=-1,out=None):
 	"""
 	Low and pass filters using scipy's gaussian convolution filter
 	
@@ -654,7 +666,8 @@ def gaussianFilter(t,y,timeFWHM,filterType='high',plot=False,plotGaussian=False)
 	t : numpy.array
 		time
 	y : numpy.array
-		time dependent data
+		time dependent data.  1D, or 2D (e.g. channels x time) to filter
+		every channel in a single call
 	timeFWHM : float
 		full width at half maximum of the gaussian with units in time.  this
 		effectively sets the corner frequency of the filter
@@ -665,11 +678,17 @@ def gaussianFilter(t,y,timeFWHM,filterType='high',plot=False,plotGaussian=False)
 		plots the results
 	plotGaussian : bool
 		plots the gaussian distribution used for the filter
+	axis : int
+		the time axis of y.  default is the last
+	out : numpy.array
+		optional.  array with the shape of y that the result is written 
+		into (e.g. part of a larger preallocated matrix).  must not overlap y
 		
 	Returns
 	-------
 	yFiltered : numpy.array
-		filtered time dependent data
+		filtered time dependent data.  same precision as y if y is floating 
+		point (e.g. float32), otherwise float64.  out, if it is given
 		
 	References
 	----------
@@ -694,7 +713,8 @@ def gaussianFilter(t,y,timeFWHM,filterType='high',plot=False,plotGaussian=False)
 #	yFiltered=signal.gaussian(len(t), std=std)
 	
 #	if filterType=='low':
-	yFiltered=gaussian_filter1d(y*1.0,std,mode='nearest')
+	y=_np.asarray(y,dtype=_floatDtype(y))	# keeps float32 data in float32
+	yFiltered=gaussian_filter1d(y,std,axis=axis,mode='nearest',output=out)
 #	elif filterType=='high':
 #		yFiltered=y-gaussian_filter1d(y*1.0,std)
 	
@@ -716,16 +736,17 @@ def gaussianFilter(t,y,timeFWHM,filterType='high',plot=False,plotGaussian=False)
 	if filterType=='low':
 		return yFiltered
 	else:
-		return y-yFiltered
+		return _np.subtract(y,yFiltered,out=out)
 
-def gaussianLowPassFilter(y,t,timeWidth=1./20000,plot=False,plotGaussian=False):
+def gaussianLowPassFilter(y,t,timeWidth=1./20000,plot=False,plotGaussian=False,axis=-1):
 	"""
 	Low pass filter using scipy's gaussian filters
 	
 	Parameters
 	----------
 	y : numpy.array
-		time dependent data
+		time dependent data.  1D, or 2D (e.g. channels x time) to filter
+		every channel in a single call
 	t : numpy.array
 		time
 	timeWidth : float
@@ -736,11 +757,14 @@ def gaussianLowPassFilter(y,t,timeWidth=1./20000,plot=False,plotGaussian=False):
 		plots the results
 	plotGaussian : bool
 		plots the gaussian distribution used for the filter
+	axis : int
+		the time axis of y.  default is the last
 		
 	Returns
 	-------
 	yFiltered : numpy.array
-		filtered time dependent data
+		filtered time dependent data.  same precision as y if y is floating 
+		point (e.g. float32), otherwise float64
 		
 	References
 	----------
@@ -765,7 +789,7 @@ def gaussianLowPassFilter(y,t,timeWidth=1./20000,plot=False,plotGaussian=False):
 
 	dt=t[1]-t[0]
 	sigma=2.355*timeWidth/dt  #TODO(John)  This equation is wrong.  Should be dividing by 2.355, not multiplying.  Fix here and with all dependencies
-	yFiltered=gaussian_filter1d(y,sigma)
+	yFiltered=gaussian_filter1d(_np.asarray(y,dtype=_floatDtype(y)),sigma,axis=axis)
 	
 	if plot==True:
 		
@@ -784,14 +808,15 @@ def gaussianLowPassFilter(y,t,timeWidth=1./20000,plot=False,plotGaussian=False):
 	return yFiltered
 
 
-def gaussianHighPassFilter(y,t,timeWidth=1./20000,plot=False,plotGaussian=False):
+def gaussianHighPassFilter(y,t,timeWidth=1./20000,plot=False,plotGaussian=False,axis=-1):
 	"""
 	High pass filter using scipy's gaussian filters
 	
 	Parameters
 	----------
 	y : numpy.array
-		time dependent data
+		time dependent data.  1D, or 2D (e.g. channels x time) to filter
+		every channel in a single call
 	t : numpy.array
 		time
 	timeWidth : float
@@ -802,11 +827,14 @@ def gaussianHighPassFilter(y,t,timeWidth=1./20000,plot=False,plotGaussian=False)
 		plots the results
 	plotGaussian : bool
 		plots the gaussian distribution used for the filter
+	axis : int
+		the time axis of y.  default is the last
 		
 	Returns
 	-------
 	yFiltered : numpy.array
-		filtered time dependent data
+		filtered time dependent data.  same precision as y if y is floating 
+		point (e.g. float32), otherwise float64
 		
 	References
 	----------
@@ -825,7 +853,7 @@ def gaussianHighPassFilter(y,t,timeWidth=1./20000,plot=False,plotGaussian=False)
 	y+=np.sin(2*np.pi*33000+np.pi*2*np.random.rand())
 	gaussianHighPassFilter(y,t,timeWidth=1./20000,plot=True,plotGaussian=True)
 	"""
-	fit=gaussianLowPassFilter(y,t,timeWidth,plot=False,plotGaussian=plotGaussian)
+	fit=gaussianLowPassFilter(y,t,timeWidth,plot=False,plotGaussian=plotGaussian,axis=axis)
 	yFiltered= y-fit
 	
 	if plot==True:
@@ -841,14 +869,15 @@ def gaussianHighPassFilter(y,t,timeWidth=1./20000,plot=False,plotGaussian=False)
 
     
 def butterworthFilter(y, x,filterOrder=2, samplingRate=1/(2*1e-6), 
-                      cutoffFreq=20*1e3, filterType='low',plot=False):
+                      cutoffFreq=20*1e3, filterType='low',plot=False,axis=-1):
     """
     Apply a digital butterworth filter on your data
     
     Parameters
     ----------
     y : numpy.ndarray
-        unfiltered dependent data
+        unfiltered dependent data.  1D, or 2D (e.g. channels x time) to 
+        filter every channel in a single call
     x : numpy.ndarray
         independent data
     filterOrder : int
@@ -862,11 +891,14 @@ def butterworthFilter(y, x,filterOrder=2, samplingRate=1/(2*1e-6),
     plot : bool or str
         - True - plots filter results. 
         - 'all'- plots filter results and filter response (psuedo-BODE plot)
+    axis : int
+        the axis of y along which to filter (i.e. time).  default is the last
         
     Returns
     -------
     filteredData : numpy.ndarray
-        Filtered dependent data
+        Filtered dependent data.  Same precision as y if y is floating 
+        point (e.g. float32), otherwise float64.
         
     References
     ----------
@@ -885,7 +917,9 @@ def butterworthFilter(y, x,filterOrder=2, samplingRate=1/(2*1e-6),
     
     def butter_lowpass_filter(data, cutoff, fs, order=5):
         b, a = butter_lowpass(cutoff, fs, order=order)
-        y = lfilter(b, a, data)
+        # the filter runs in double precision (float32 coefficients are 
+        # unstable at low cutoffs), but the result keeps data's precision
+        y = lfilter(b, a, data, axis=axis).astype(_floatDtype(data),copy=False)
         return y
         
     def plotOfFreqResponse():